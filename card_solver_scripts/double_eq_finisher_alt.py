@@ -6,21 +6,67 @@ from sympy.functions.combinatorial.numbers import nC
 from pathlib import Path
 import csv
 from my_subset_graph_new import BinSubsetGraphSparse
-from my_subset_graph_again import BinSubsetGraphSparseAgain
+from my_subset_graph_again import BinSubsetGraphSparseAgain, \
+    BinSubsetGraphSolvingLayer
+from my_subset_graph_bitset import BinSubsetGraphBitset
+from my_shared_layers import BinSubsetGraphSharedLayers
+from my_layer_files import BinSubsetGraphLayerFiles, solutions_fingerprint
+from my_deck_reduction import DeckReduction
+from my_solution_components import SolutionComponents
+from my_memory_planner import VERSION_ENGINES, choose_method, \
+    read_calibration, PeakMemoryRecorder
 from time import time
 
 '''Put all options at the top for convenience,
 with cross-references as needed.'''
 # deck_type options: 'single', 'sample', 'like_sample', 'full_sample',
 # 'opp', 'three', 'full'
-deck_type = 'opp'  # see line 40
+deck_type = 'opp'  # see line 86
 # short_long_mix options: 'short_short', 'short_long', 'long_short',
 # 'long_long'
-short_long_mix = 'short_long'  # see line 64
+short_long_mix = 'short_long'  # see line 110
 # is_timing options: True, False
-is_timing = True  # see line 114
-# version options: 'Original', 'Again'
-version = 'Again'  # see line 114
+is_timing = True  # see line 190
+# version options: 'Original', 'Again', 'Bitset', 'Compact', 'Shared',
+# 'Files'
+# 'Bitset' holds the whole graph as 2**deck_size bits and counts every layer
+# in one pass; prefer it whenever 2**deck_size / 8 bytes fits in memory.
+# 'Compact' keeps only the solving subsets of one layer, as sorted bitmasks,
+# so memory follows the solving part of a layer instead of 2**deck_size.
+# 'Shared' keeps one bit per subset of one layer in shared memory, and raises
+# each layer with one process per CPU.
+# 'Files' keeps the same bits in a file per layer under layer_directory,
+# deleting each layer once the next is written, for layers beyond RAM.
+version = 'Again'  # see line 190
+# reduce_deck options: True, False
+# True (with 'Bitset') drops the cards in no basic solution and collapses
+# cards lying in exactly the same basic solutions, counts the smaller deck,
+# then expands the counts back exactly.
+reduce_deck = False  # see line 190
+# split_components options: True, False
+# True (with 'Bitset') counts each card-disjoint group of basic solutions
+# with its own, smaller bitset, and multiplies the results.
+split_components = False  # see line 190
+# layer_directory options: any directory path
+# where 'Files' writes its layer files, one subdirectory per deck and mix
+layer_directory = './results/layers'  # see line 190
+# resume_layers options: True, False
+# True lets 'Files' restart from the last complete layer file of a stopped
+# run (and the counts it recorded before it), if that run had the same
+# basic solutions and start layer.
+resume_layers = False  # see line 190
+# memory_budget options: any int (bytes), or None for 80% of the RAM
+# a version whose predicted peak (see my_memory_planner) exceeds it is
+# refused before setup, or replaced by the first of memory_fallbacks that
+# fits; the prediction for 'Bitset' ignores reduce_deck and split_components.
+memory_budget = None  # see line 190
+# memory_fallbacks options: a tuple of versions, tried in order; () refuses
+memory_fallbacks = ('Bitset', 'Compact', 'Files')  # see line 190
+# calibration_path options: any path, or None to record nothing
+# each run appends its predicted and actual peak memory and time here, and
+# later runs rescale their predictions by the records; every finisher
+# shares '../results/memory_calibration.csv' when it is set.
+calibration_path = None  # see line 190
 
 # Initialize deck
 black_suit = [j for j in range(1, 14)]
@@ -111,9 +157,58 @@ else:
     my_denoms.append((my_n, base_denom))
     my_results.append((my_n, Rational(0, base_denom)))
 
-'''is_timing, version relevant here.'''
+
+def bitset_layer_counts(items, valids):
+    '''Count every layer of a (reduced) deck at once with the bitset graph.
+
+    Parameters:
+    items: Iterable[int]
+        The indices of the cards kept
+    valids: Iterable[tuple]
+        The basic solutions, restricted to those cards'''
+    bitset_graph = BinSubsetGraphBitset(items)
+    bitset_graph.fill_in_property(valids)
+    return [count[1] for count in bitset_graph.count_property_all_layers()]
+
+
+def split_bitset_layer_counts(items, valids):
+    '''Count every layer of a (reduced) deck at once, one card-disjoint
+    group of basic solutions at a time when split_components is set.
+
+    Parameters:
+    items: Iterable[int]
+        The indices of the cards kept
+    valids: Iterable[tuple]
+        The basic solutions, restricted to those cards'''
+    if split_components:
+        components = SolutionComponents(items, valids)
+        if not components.is_trivial():
+            return components.layer_counts(bitset_layer_counts)
+    return bitset_layer_counts(items, valids)
+
+
+'''is_timing, version, reduce_deck, split_components, layer_directory,
+resume_layers, memory_budget, memory_fallbacks, calibration_path
+relevant here.'''
 if __name__ == '__main__':
     time_running_total = 0
+    calibration = None
+    if calibration_path is not None:
+        calibration = read_calibration(calibration_path)
+    memory_plan = choose_method(version, deck_size, my_n, last_layer,
+                                len(basic_solutions), memory_budget,
+                                memory_fallbacks, calibration=calibration)
+    if memory_plan["method"] != VERSION_ENGINES[version]:
+        version = next(key for key, engine in VERSION_ENGINES.items()
+                       if engine == memory_plan["method"])
+        print(f"Falling back to version {version} to fit in memory.")
+    print(f'Predicted peak memory: {memory_plan["peak_bytes"] / 2**30:.2f} '
+          + f'GB; predicted time: {memory_plan["seconds"] / 60:.3f} '
+          + 'minutes.')
+    memory_recorder = PeakMemoryRecorder(memory_plan, deck_size, my_n,
+                                         last_layer, len(basic_solutions),
+                                         calibration_path)
+    memory_recorder.start()
     print("Setting up...")
     if is_timing:
         st = time()
@@ -125,6 +220,49 @@ if __name__ == '__main__':
     elif version == 'Again':
         my_subsets_graph = BinSubsetGraphSparseAgain(my_inds, my_n)
         my_subsets_graph.fill_in_property_at_current_layer(basic_solutions)
+    elif version == 'Compact':
+        my_subsets_graph = BinSubsetGraphSolvingLayer(my_inds, my_n)
+        my_subsets_graph.fill_in_property_at_current_layer(basic_solutions)
+    elif version == 'Shared':
+        my_subsets_graph = BinSubsetGraphSharedLayers(my_inds, my_n)
+        my_subsets_graph.fill_in_property_at_current_layer(basic_solutions)
+    elif version == 'Files':
+        my_subsets_graph = BinSubsetGraphLayerFiles(
+            my_inds, my_n,
+            Path(layer_directory) / f'{deck_type}_2eq_{short_long_mix}',
+            resume=resume_layers, status_updates=True,
+            fingerprint=solutions_fingerprint(my_inds, basic_solutions, my_n)
+        )
+        if my_subsets_graph.current_layer == my_n:
+            my_subsets_graph.fill_in_property_at_current_layer(basic_solutions)
+        layer_file_counts = my_subsets_graph.recorded_counts()
+    elif version == 'Bitset':
+        deck_reduction = None
+        solution_components = None
+        if reduce_deck:
+            deck_reduction = DeckReduction(my_inds, basic_solutions)
+        if split_components:
+            solution_components = SolutionComponents(my_inds, basic_solutions)
+        reduced_counts = None
+        if deck_reduction is not None and not deck_reduction.is_trivial():
+            print(f"Counting over {len(deck_reduction.reduced_items)} "
+                  + f"of {deck_size} cards.")
+            reduced_counts = \
+                deck_reduction.layer_counts(split_bitset_layer_counts)
+        elif solution_components is not None \
+                and not solution_components.is_trivial():
+            reduced_counts = split_bitset_layer_counts(my_inds,
+                                                       basic_solutions)
+        if reduced_counts is not None:
+            bitset_counts = []
+            for j, cur_num in enumerate(reduced_counts):
+                cur_denom = nC(deck_size, j)
+                bitset_counts.append((j, cur_num, cur_denom,
+                                      Rational(cur_num, cur_denom)))
+        else:
+            my_subsets_graph = BinSubsetGraphBitset(my_inds)
+            my_subsets_graph.fill_in_property(basic_solutions)
+            bitset_counts = my_subsets_graph.count_property_all_layers()
     else:
         raise ValueError("Invalid version of sparse graph.")
     if is_timing:
@@ -149,6 +287,22 @@ if __name__ == '__main__':
             my_subsets_graph.raise_layer_with_properties()
             cur_num, cur_denom, cur_frac = \
                 my_subsets_graph.count_property_at_current_layer()
+        elif version in ('Compact', 'Shared'):
+            my_subsets_graph.raise_layer_with_properties()
+            cur_num, cur_denom, cur_frac = \
+                my_subsets_graph.count_property_at_current_layer()
+        elif version == 'Files':
+            if j < my_subsets_graph.current_layer:  # done before a restart
+                cur_num = layer_file_counts[j]
+                cur_denom = nC(deck_size, j)
+                cur_frac = Rational(cur_num, cur_denom)
+            else:
+                if j > my_subsets_graph.current_layer:
+                    my_subsets_graph.raise_layer_with_properties()
+                cur_num, cur_denom, cur_frac = \
+                    my_subsets_graph.count_property_at_current_layer()
+        elif version == 'Bitset':
+            cur_num, cur_denom, cur_frac = bitset_counts[j][1:]
         else:
             raise ValueError("Invalid version of sparse graph.")
         my_nums.append((j, cur_num))
@@ -162,6 +316,10 @@ if __name__ == '__main__':
         time_running_total += duration
         if duration > 0:
             print(f'Time elasped for level {j}: {duration:.3f} minutes.')
+    if version in ('Shared', 'Files'):
+        my_subsets_graph.close()
+    memory_record = memory_recorder.stop()
+    print(f'Peak resident memory: {memory_record["rss_peak"] / 2**30:.2f} GB.')
     if is_timing:
         print(f'Total time elapsed: {time_running_total:.3f} minutes.')
     out_path = Path(f'./results/{deck_type}_2eq_{short_long_mix}_alt.txt')
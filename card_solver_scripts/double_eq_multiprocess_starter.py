@@ -8,18 +8,25 @@ import concurrent.futures
 from pathlib import Path
 import csv
 import time
+from my_deck_symmetry import DeckSymmetry
+from my_combinatorial_ranking import colex_combinations, rank_ranges
 
 '''Put all options at the top for convenience,
 with cross-references as needed.'''
 # deck_type options: 'single', 'sample', 'like_sample', 'full_sample',
 # 'opp', 'three', 'full'
-deck_type = 'single'  # see line 41
+deck_type = 'single'  # see line 48
 # short_long_mix options: 'short_short', 'short_long', 'long_short',
 # 'long_long'
 # in practice, long_short has slightly better performance than short_long
-short_long_mix = 'short_short'  # see line 74
+short_long_mix = 'short_short'  # see line 81
 # is_timing options: True, False
-is_timing = True  # see line 232
+is_timing = True  # see line 276
+# orbit_reduction options: True, False
+# True checks one selection per orbit under the symmetries of the deck
+# (swapping equal values, and negating all values if the deck allows it),
+# then lists every selection in each solving orbit.
+orbit_reduction = True  # see line 201
 
 # Initialize deck
 black_suit = [j for j in range(1, 14)]
@@ -191,19 +198,56 @@ def given_list_checker_min_size_only(inds_selection):
     return False
 
 
+'''orbit_reduction relevant here.'''
+
+
+def rank_range_checker(bounds):
+    """
+    Return the selections with colex ranks in a range that solve the
+    equation, as checked by given_list_checker_min_size_only.
+
+    Parameters:
+    -------------
+    bounds: tuple
+        the start and stop ranks
+    """
+    start, stop = bounds
+    return [combo for combo in colex_combinations(my_inds, my_n, start, stop)
+            if given_list_checker_min_size_only(combo)]
+
+
 def basic_solutions_calculator():
     '''Find all basic solutions, using multiprocessing.'''
     base_denom = nC(deck_size, my_n)
     base_num = 0
+    if orbit_reduction:
+        deck_symmetry = DeckSymmetry(my_deck)
+        candidates = [rep for rep, orbit_size
+                      in deck_symmetry.orbit_representatives(my_n)]
+        num_candidates = len(candidates)
+    else:
+        # contiguous ranges of colex ranks, checked by one worker each
+        candidates = rank_ranges(0, base_denom, 10)
+        num_candidates = len(candidates)
     with concurrent.futures.ProcessPoolExecutor() as executor:
-        for result in executor.map(
-            given_list_checker_min_size_only,  # or given_list_checker
-            combinations(my_inds, my_n),
-            chunksize=base_denom//10
-        ):
-            if result:
-                base_num += 1
-                basic_solutions.append(set(result))
+        if orbit_reduction:
+            for result in executor.map(
+                given_list_checker_min_size_only,  # or given_list_checker
+                candidates,
+                chunksize=max(num_candidates//10, 1)
+            ):
+                if result:
+                    for member in deck_symmetry.orbit(result):
+                        base_num += 1
+                        basic_solutions.append(set(member))
+        else:
+            for results in executor.map(rank_range_checker, candidates):
+                for result in results:
+                    base_num += 1
+                    basic_solutions.append(set(result))
+    # orbits and ranges come out in other orders; restore the order of
+    # combinations()
+    basic_solutions.sort(key=sorted)
     return Rational(base_num, base_denom)  # ratio good subsets to all subsets
 
 
@@ -8,15 +8,108 @@ import concurrent.futures
 from time import time
 from pathlib import Path
 import csv
+from my_subset_zdd import SolutionZDD
+from my_independence_polynomial import IndependencePolynomial
+from my_multiplicity_counter import MultiplicityLayerCounter, \
+    multiplicity_classes, MAX_CLASSES
+from my_deck_symmetry import DeckSymmetry
+from my_combinatorial_ranking import colex_combinations, rank_ranges
+from my_failure_frontier import FailureFrontier
+from my_deck_reduction import DeckReduction, enumeration_layer_counts
+from my_solution_components import SolutionComponents
+from my_saturation import SaturationSearch
+from my_layer_estimation import LayerEstimator
+from my_inclusion_exclusion import InclusionExclusionCounter
+from my_revolving_door import RevolvingDoorCounter, \
+    revolving_door_layer_counts
+from my_memory_planner import STRATEGIES, choose_method, \
+    read_calibration, PeakMemoryRecorder
 
 '''All options listed here for convenience.
 Docstrings will note where they come back into play.'''
 # deck_type options: 'single', 'sample', 'like', 'opp', 'three', 'full'
-deck_type = 'single'  # see line 34 and following
+deck_type = 'single'  # see line 127 and following
 # short_or_long options: 'short', 'long'
-short_or_long = 'long'  # see line 58 and following
+short_or_long = 'long'  # see line 151 and following
 # is_timing options: True, False
-is_timing = True  # see line 241 and following
+is_timing = True  # see line 543 and following
+# counting_method options: 'enumerate', 'orbits', 'frontier', 'zdd',
+# 'independence', 'multiplicity', 'estimate', 'revolving'
+# 'orbits' enumerates, but checks one subset per orbit under the deck's
+# symmetries (equal values swapped, all values negated when possible).
+# 'frontier' enumerates layers below frontier_start_layer as usual, then
+# carries only the non-solving subsets from each layer to the next.
+# 'zdd' counts all layers at once from a decision diagram of the basic
+# solutions; worth trying for 39-52 cards, as long as the diagram stays small.
+# 'independence' counts the non-solving sets of every size at once by
+# branching on the cards, an alternative for the same decks.
+# 'multiplicity' counts by vectors of value multiplicities, for decks with
+# repeated values (3**13 vectors for 'like'); decks with more than
+# MAX_CLASSES (10**9) vectors, such as 'three', fall back to 'enumerate'.
+# 'estimate' samples random subsets of each layer instead, giving estimates
+# with confidence intervals (to ../results/..._estimate.txt) for decks too
+# big to count; see estimate_seed and estimate_target_width.  Layers whose
+# share falls below karp_luby_threshold (by the union bound of the basic
+# solutions, or a pilot batch) use the Karp-Luby estimator instead, to
+# within a factor 1 +/- karp_luby_epsilon.
+# The exact results file is not written in this mode; the estimate file
+# lists the exactly known layers too, with no samples.
+# 'revolving' walks each layer swapping one card at a time, tracking how
+# many cards each basic solution lacks, in one process.
+counting_method = 'enumerate'  # see line 543
+# frontier_start_layer options: any int; in effect never below my_n + 1
+# starting higher saves memory, as the non-solving sets peak near my_n.
+frontier_start_layer = 0  # see line 543
+# reduce_deck options: True, False
+# True drops the cards in no basic solution and collapses cards lying in
+# exactly the same basic solutions before counting, then expands the counts
+# back exactly; used with 'enumerate', 'frontier', 'zdd', 'independence'
+# and 'revolving'.  The smaller deck is counted in a single process, every
+# layer from 0 (including 'frontier', whatever frontier_start_layer says),
+# without find_saturation; 'enumerate' then checks every subset of it.
+reduce_deck = False  # see line 543
+# split_components options: True, False
+# True counts each card-disjoint group of basic solutions on its own (in
+# parallel) and multiplies the results; for the same counting methods,
+# and with the same single-process counting of every layer as reduce_deck.
+split_components = False  # see line 543
+# find_saturation options: True, False
+# True first searches for the largest non-solving set, and records every
+# larger layer as full without counting it.
+find_saturation = True  # see line 543
+# estimate_seed options: any int, or None for a fresh seed every run
+estimate_seed = 0  # see line 543
+# estimate_target_width options: any float in (0, 1); sampling a layer
+# stops once its 95% (Wilson) interval is this narrow.
+estimate_target_width = 0.001  # see line 543
+# karp_luby_threshold options: any float in [0, 1]; 0 turns it off
+karp_luby_threshold = 0.05  # see line 543
+# karp_luby_epsilon options: any float in (0, 1), with 95% confidence
+karp_luby_epsilon = 0.01  # see line 543
+# inclusion_exclusion_layers options: any int >= 0; 0 turns it off
+# counts the first layers above my_n exactly by inclusion-exclusion over
+# the unions of basic solutions, for 'enumerate', 'orbits', 'frontier' and
+# 'revolving'; the unions stay few while the layer is below twice my_n.
+inclusion_exclusion_layers = 2  # see line 543
+# reorder_interval options: any int >= 0; 0 keeps the file order
+# the checker scans first the basic solutions found most often so far,
+# re-sorting after this many checks in each process; the hits found by
+# the worker processes are merged after each layer.
+reorder_interval = 10000  # see line 255
+# memory_budget options: any int (bytes), or None for 80% of the RAM
+# a counting method whose predicted peak (see my_memory_planner) exceeds it
+# is refused before counting, or replaced by the first of memory_fallbacks
+# that fits; only 'enumerate', 'orbits', 'revolving' and 'frontier' have
+# models.
+memory_budget = None  # see line 543
+# memory_fallbacks options: a tuple of those methods, tried in order;
+# () refuses
+memory_fallbacks = ('enumerate',)  # see line 543
+# calibration_path options: any path, or None to record nothing
+# each run appends its predicted and actual peak memory and time here, and
+# later runs rescale their predictions by the records; every finisher
+# shares '../results/memory_calibration.csv' when it is set.
+calibration_path = None  # see line 543
 
 # Initialize deck
 black_suit = [j for j in range(1, 14)]
@@ -105,6 +198,10 @@ else:
 no_solutions_flag = False
 if not basic_solutions:
     no_solutions_flag = True
+# hits found per basic solution, and the order the checker scans them in
+solution_hits = [0 for j in range(len(basic_solutions))]
+solution_order = [j for j in range(len(basic_solutions))]
+checks_since_reorder = 0
 # go ahead and add the basic_solutions level
 base_denom = nC(deck_size, my_n)
 if basic_solutions:
@@ -140,35 +237,102 @@ def given_list_checker(inds_selection):
     return False
 
 
-def given_list_checker_basic_solutions(inds_selection):
+def reorder_solutions():
+    '''Sort the scan order of the basic solutions, most hits first.'''
+    global checks_since_reorder
+    solution_order.sort(key=lambda s: -solution_hits[s])
+    checks_since_reorder = 0
+
+
+def set_solution_order(order):
+    '''Start a worker process scanning the basic solutions in the
+    given order, as merged by the parent from the earlier layers.'''
+    global checks_since_reorder
+    solution_order[:] = order
+    checks_since_reorder = 0
+
+
+def solution_hit_finder(inds_selection):
     """
-    Check if the given list has a selection that can be rearranged
-    to solve the equation, by checking against the
-    known solutions.
+    Find a known solution among the given cards, scanning first
+    the basic solutions found most often so far.
+    Returns its index in basic_solutions, or -1 if there is none.
 
     Parameters:
     -------------
     inds_selection: Iterable[int]
         the indices of the cards chosen
     """
+    global checks_since_reorder
     if not basic_solutions:
         raise ValueError("basic_solutions is not propagating to processes!")
     temp_set = set(inds_selection)
     if len(temp_set) != len(inds_selection):
         raise ValueError(f"Duplicates in {inds_selection}")
-    for sol_set in basic_solutions:
-        if sol_set <= temp_set:
-            return inds_selection  # truthy!
+    if reorder_interval:
+        checks_since_reorder += 1
+        if checks_since_reorder >= reorder_interval:
+            reorder_solutions()
+    for s in solution_order:
+        if basic_solutions[s] <= temp_set:
+            solution_hits[s] += 1
+            return s
+    return -1
+
+
+def given_list_checker_basic_solutions(inds_selection):
+    """
+    Check if the given list has a selection that can be rearranged
+    to solve the equation, by checking against the
+    known solutions.
+
+    Parameters:
+    -------------
+    inds_selection: Iterable[int]
+        the indices of the cards chosen
+    """
+    if solution_hit_finder(inds_selection) >= 0:
+        return inds_selection  # truthy!
     return False
 
 
-def subsets_counter(cardinality=my_n+1):
+def rank_range_hit_counter(task):
+    """
+    Count the subsets in a range of colex ranks of a layer that contain
+    a known solution, and how often each basic solution was the one
+    found.
+
+    Parameters:
+    -------------
+    task: tuple
+        the size of the subsets, and the start and stop ranks
+    """
+    cardinality, start, stop = task
+    range_num = 0
+    range_hits = [0 for j in range(len(basic_solutions))]
+    for combo in colex_combinations(my_inds, cardinality, start, stop):
+        s = solution_hit_finder(combo)
+        if s >= 0:
+            range_num += 1
+            range_hits[s] += 1
+    return range_num, range_hits
+
+
+def subsets_counter(cardinality=my_n+1, start_rank=0, stop_rank=None):
     '''Count how many subsets of a given cardinality satisfy the property.
 
     Parameters:
     cardinality: int (positive)
-        The size of subsets to consider'''
-    current_denom = nC(deck_size, cardinality)
+        The size of subsets to consider
+    start_rank: int (nonnegative)
+        The colex rank of the first subset to check
+    stop_rank: int or None
+        The rank past the last subset to check; None goes to the end.
+        Only a whole layer is recorded; a range of it is just counted.'''
+    layer_size = int(nC(deck_size, cardinality))
+    stop_rank = layer_size if stop_rank is None \
+        else min(stop_rank, layer_size)
+    current_denom = max(stop_rank - start_rank, 0)
     current_num = 0
     # check if already done!  If so, no need for more searches.
     # definitely assumes an upward-closed property
@@ -182,28 +346,44 @@ def subsets_counter(cardinality=my_n+1):
     elif no_solutions_flag:  # nothing to do!:
         current_num = 0
     else:
-        with concurrent.futures.ProcessPoolExecutor() as executor:
-            for result in executor.map(
-                given_list_checker_basic_solutions,
-                combinations(my_inds, cardinality),
-                chunksize=max(current_denom//8, 1)
+        with concurrent.futures.ProcessPoolExecutor(
+            initializer=set_solution_order,
+            initargs=(list(solution_order),)
+        ) as executor:
+            for range_num, range_hits in executor.map(
+                rank_range_hit_counter,
+                [(cardinality, start, stop) for start, stop
+                 in rank_ranges(start_rank, stop_rank, 8)]
             ):
-                if result:
-                    current_num += 1
-    my_nums.append((cardinality, current_num))
-    my_denoms.append((cardinality, current_denom))
-    my_results.append((cardinality,
-                       Rational(current_num, current_denom)))
+                current_num += range_num
+                for s, hits in enumerate(range_hits):
+                    solution_hits[s] += hits
+        if reorder_interval:
+            reorder_solutions()
+    if current_denom == layer_size:
+        my_nums.append((cardinality, current_num))
+        my_denoms.append((cardinality, current_denom))
+        my_results.append((cardinality,
+                           Rational(current_num, current_denom)))
     return Rational(current_num, current_denom)
 
 
-def subsets_counter_no_multiprocess(cardinality=my_n+1):
+def subsets_counter_no_multiprocess(cardinality=my_n+1, start_rank=0,
+                                    stop_rank=None):
     '''Count how many subsets of a given cardinality satisfy the property.
 
     Parameters:
     cardinality: int (positive)
-        The size of subsets to consider'''
-    current_denom = nC(deck_size, cardinality)
+        The size of subsets to consider
+    start_rank: int (nonnegative)
+        The colex rank of the first subset to check
+    stop_rank: int or None
+        The rank past the last subset to check; None goes to the end.
+        Only a whole layer is recorded; a range of it is just counted.'''
+    layer_size = int(nC(deck_size, cardinality))
+    stop_rank = layer_size if stop_rank is None \
+        else min(stop_rank, layer_size)
+    current_denom = max(stop_rank - start_rank, 0)
     current_num = 0
     # This option changes whether updates printed to standard output.
     status_updates = True
@@ -222,7 +402,8 @@ def subsets_counter_no_multiprocess(cardinality=my_n+1):
     elif no_solutions_flag:  # nothing to do!:
         current_num = 0
     else:
-        for combo in combinations(my_inds, cardinality):
+        for combo in colex_combinations(my_inds, cardinality,
+                                        start_rank, stop_rank):
             if given_list_checker_basic_solutions(combo):
                 current_num += 1
             if status_updates:
@@ -232,6 +413,66 @@ def subsets_counter_no_multiprocess(cardinality=my_n+1):
                     print(f"Completed {num_groups} groups"
                           + f'of size {group_size}')
                     count = 0
+    if current_denom == layer_size:
+        my_nums.append((cardinality, current_num))
+        my_denoms.append((cardinality, current_denom))
+        my_results.append((cardinality,
+                           Rational(current_num, current_denom)))
+    return Rational(current_num, current_denom)
+
+
+def orbit_checker_basic_solutions(rep_and_size):
+    """
+    Check an orbit representative against the known solutions,
+    giving the size of its orbit if it solves and 0 otherwise.
+
+    Parameters:
+    -------------
+    rep_and_size: tuple
+        the indices of the representative cards chosen,
+        and the number of selections in their orbit
+    """
+    inds_selection, orbit_size = rep_and_size
+    if given_list_checker_basic_solutions(inds_selection):
+        return orbit_size
+    return 0
+
+
+def subsets_counter_orbits(cardinality=my_n+1):
+    '''Count how many subsets of a given cardinality satisfy the property,
+    checking only one subset per orbit under the symmetries of the deck.
+
+    Parameters:
+    cardinality: int (positive)
+        The size of subsets to consider'''
+    current_denom = nC(deck_size, cardinality)
+    current_num = 0
+    # check if already done!  If so, no need for more searches.
+    # definitely assumes an upward-closed property
+    already_done = False
+    for result in my_results:
+        if result[0] < cardinality and result[1] == 1:
+            already_done = True
+    if already_done:
+        print(f'{cardinality} comes for free!')  # debug code
+        current_num = current_denom
+    elif no_solutions_flag:  # nothing to do!:
+        current_num = 0
+    else:
+        deck_symmetry = DeckSymmetry(my_deck)
+        representatives = list(
+            deck_symmetry.orbit_representatives(cardinality)
+        )
+        with concurrent.futures.ProcessPoolExecutor(
+            initializer=set_solution_order,
+            initargs=(list(solution_order),)
+        ) as executor:
+            for result in executor.map(
+                orbit_checker_basic_solutions,
+                representatives,
+                chunksize=max(len(representatives)//8, 1)
+            ):
+                current_num += result
     my_nums.append((cardinality, current_num))
     my_denoms.append((cardinality, current_denom))
     my_results.append((cardinality,
@@ -239,9 +480,164 @@ def subsets_counter_no_multiprocess(cardinality=my_n+1):
     return Rational(current_num, current_denom)
 
 
-'''is_timing takes on importance here.'''
+def layer_recorder(cardinality, current_num):
+    '''Record the count for a layer found without enumerating it.
+
+    Parameters:
+    cardinality: int (positive)
+        The size of subsets considered
+    current_num: int (nonnegative)
+        The number of subsets of that size with the property'''
+    current_denom = nC(deck_size, cardinality)
+    my_nums.append((cardinality, current_num))
+    my_denoms.append((cardinality, current_denom))
+    my_results.append((cardinality,
+                       Rational(current_num, current_denom)))
+    return Rational(current_num, current_denom)
+
+
+def reduced_layer_counts(items, valids):
+    '''Count every layer of a reduced deck at once,
+    with the counting method chosen above.
+
+    Parameters:
+    items: Iterable[int]
+        The indices of the cards kept
+    valids: Iterable[tuple]
+        The basic solutions, restricted to those cards'''
+    if counting_method == 'zdd':
+        return SolutionZDD(items, valids).layer_counts
+    elif counting_method == 'independence':
+        return IndependencePolynomial(items, valids).layer_counts
+    elif counting_method == 'frontier':
+        failure_frontier = FailureFrontier(items, valids)
+        output = [failure_frontier.count_property_at_current_layer()[0]]
+        for j in range(len(items)):
+            failure_frontier.raise_layer_with_properties()
+            output.append(
+                failure_frontier.count_property_at_current_layer()[0]
+            )
+        return output
+    elif counting_method == 'revolving':
+        return revolving_door_layer_counts(items, valids)
+    return enumeration_layer_counts(items, valids)
+
+
+def split_layer_counts(items, valids):
+    '''Count every layer of a (reduced) deck at once, one card-disjoint
+    group of basic solutions at a time when split_components is set.
+
+    Parameters:
+    items: Iterable[int]
+        The indices of the cards kept
+    valids: Iterable[tuple]
+        The basic solutions, restricted to those cards'''
+    if split_components:
+        components = SolutionComponents(items, valids)
+        if not components.is_trivial():
+            return components.layer_counts(reduced_layer_counts,
+                                           parallel=True)
+    return reduced_layer_counts(items, valids)
+
+
+'''is_timing, counting_method, frontier_start_layer, reduce_deck,
+split_components, find_saturation, estimate_seed,
+estimate_target_width, karp_luby_threshold, karp_luby_epsilon,
+inclusion_exclusion_layers, memory_budget, memory_fallbacks,
+calibration_path take on importance here.'''
 if __name__ == '__main__':
+    if counting_method == 'multiplicity' \
+            and multiplicity_classes(my_deck) > MAX_CLASSES:
+        print(f"{multiplicity_classes(my_deck)} multiplicity vectors "
+              + f"exceed the limit of {MAX_CLASSES}; enumerating instead.")
+        counting_method = 'enumerate'
+    memory_recorder = None
+    if basic_solutions and counting_method in STRATEGIES:
+        calibration = None
+        if calibration_path is not None:
+            calibration = read_calibration(calibration_path)
+        memory_plan = choose_method(counting_method, deck_size, my_n,
+                                    deck_size, len(basic_solutions),
+                                    memory_budget, memory_fallbacks,
+                                    calibration=calibration)
+        if memory_plan["method"] != counting_method:
+            counting_method = memory_plan["method"]
+            print(f"Falling back to {counting_method} to fit in memory.")
+        print('Predicted peak memory: '
+              + f'{memory_plan["peak_bytes"] / 2**30:.2f} GB; '
+              + f'predicted time: {memory_plan["seconds"] / 60:.3f} '
+              + 'minutes.')
+        memory_recorder = PeakMemoryRecorder(memory_plan, deck_size, my_n,
+                                             deck_size,
+                                             len(basic_solutions),
+                                             calibration_path)
+        memory_recorder.start()
     time_running_total = 0
+    deck_reduction = None
+    solution_components = None
+    if basic_solutions and counting_method in (
+        'enumerate', 'frontier', 'zdd', 'independence', 'revolving'
+    ):
+        if reduce_deck:
+            deck_reduction = DeckReduction(my_inds, basic_solutions)
+            if deck_reduction.is_trivial():
+                deck_reduction = None
+            else:
+                print(f"Counting over {len(deck_reduction.reduced_items)} "
+                      + f"of {deck_size} cards.")
+        if split_components:
+            solution_components = SolutionComponents(my_inds,
+                                                     basic_solutions)
+            if solution_components.is_trivial():
+                solution_components = None
+            else:
+                print(f"{len(solution_components.components)} "
+                      + "card-disjoint group(s) of basic solutions, and "
+                      + f"{len(solution_components.free_items)} free cards.")
+    precomputed_counts = None
+    if deck_reduction is not None:
+        precomputed_counts = deck_reduction.layer_counts(split_layer_counts)
+    elif solution_components is not None:
+        precomputed_counts = split_layer_counts(my_inds, basic_solutions)
+    elif counting_method == 'zdd':
+        solution_zdd = SolutionZDD(my_inds, basic_solutions,
+                                   status_updates=True)
+        precomputed_counts = solution_zdd.layer_counts
+    elif counting_method == 'independence':
+        independence_poly = IndependencePolynomial(my_inds, basic_solutions,
+                                                   status_updates=True)
+        precomputed_counts = independence_poly.layer_counts
+    elif counting_method == 'multiplicity':
+        multiplicity_counter = MultiplicityLayerCounter(my_deck,
+                                                        basic_solutions)
+        print(f"Counting over {multiplicity_counter.num_classes} "
+              + "multiplicity vectors.")
+        precomputed_counts = multiplicity_counter.layer_counts
+    elif counting_method == 'estimate':
+        layer_estimator = LayerEstimator(my_inds, basic_solutions,
+                                         seed=estimate_seed)
+    elif counting_method == 'revolving':
+        revolving_counter = RevolvingDoorCounter(my_inds, basic_solutions,
+                                                 status_updates=True)
+    elif counting_method not in ('enumerate', 'orbits', 'frontier'):
+        raise ValueError("Invalid counting method.")
+    inclusion_exclusion = None
+    if basic_solutions and precomputed_counts is None \
+            and inclusion_exclusion_layers > 0 \
+            and counting_method in ('enumerate', 'orbits', 'frontier',
+                                    'revolving'):
+        inclusion_exclusion = InclusionExclusionCounter(
+            my_inds, basic_solutions, my_n + inclusion_exclusion_layers,
+            status_updates=True
+        )
+    my_estimates = []
+    saturation_layer = deck_size + 1
+    if find_saturation and basic_solutions:
+        saturation_search = SaturationSearch(my_inds, basic_solutions,
+                                             status_updates=True)
+        saturation_layer = saturation_search.saturation_layer
+        print(f"Only layers below {saturation_layer} need counting.")
+    failure_frontier = None
     for j in range(my_n + 1, deck_size+1):
         print(j)
         if is_timing:
@@ -250,7 +646,42 @@ if __name__ == '__main__':
             st = 0
         # in practice, for 3-4 suits, the memory overhead
         # prevents worthwhile multiprocessing.
-        if deck_size > 26:
+        if j >= saturation_layer:
+            print(f'{j} comes for free!')
+            layer_recorder(j, nC(deck_size, j))
+        elif precomputed_counts is not None:
+            layer_recorder(j, precomputed_counts[j])
+        elif inclusion_exclusion is not None \
+                and j <= inclusion_exclusion.max_layer:
+            layer_recorder(j, inclusion_exclusion.layer_counts[j])
+        elif counting_method == 'frontier' and j >= frontier_start_layer:
+            if failure_frontier is None:
+                failure_frontier = FailureFrontier(my_inds, basic_solutions,
+                                                   j, status_updates=True)
+            else:
+                failure_frontier.raise_layer_with_properties()
+            layer_recorder(
+                j, failure_frontier.count_property_at_current_layer()[0]
+            )
+        elif counting_method == 'estimate':
+            if karp_luby_threshold > 0 and \
+                    layer_estimator.prefers_karp_luby(j, karp_luby_threshold):
+                count, trials, estimate, low, high = \
+                    layer_estimator.karp_luby_layer(j, karp_luby_epsilon,
+                                                    parallel=True)
+                print(f'About {count:.1f} solving sets, by Karp-Luby.')
+            else:
+                hits, trials, estimate, low, high = \
+                    layer_estimator.estimate_layer(j, estimate_target_width,
+                                                   parallel=True)
+            print(f'Estimate {estimate:.6f} in [{low:.6f}, {high:.6f}] '
+                  + f'from {trials} samples.')
+            my_estimates.append((j, estimate, low, high, trials))
+        elif counting_method == 'revolving':
+            layer_recorder(j, revolving_counter.count_layer(j))
+        elif counting_method == 'orbits':
+            subsets_counter_orbits(j)
+        elif deck_size > 26:
             subsets_counter_no_multiprocess(j)
         else:
             subsets_counter(j)
@@ -264,12 +695,33 @@ if __name__ == '__main__':
             print(f'Time elasped for level {j}: {duration:.3f} minutes.')
     if is_timing:
         print(f'Total time elapsed: {time_running_total:.3f} minutes.')
-    out_path = Path(f'../results/{deck_type}_{short_or_long}.txt')
-    out_path.touch()
-    with open(out_path, 'w+') as results_printer:
-        print(deck_type, file=results_printer)
-        print(short_or_long, file=results_printer)
-        for j in range(len(my_nums)):
-            print(f'{my_results[j][0]:>2}, {my_results[j][1]}, '
-                  + f'{my_nums[j][1]}, {my_denoms[j][1]}',
-                  file=results_printer)
+    if memory_recorder is not None:
+        memory_record = memory_recorder.stop()
+        print('Peak resident memory: '
+              + f'{memory_record["rss_peak"] / 2**30:.2f} GB.')
+    # estimates go to their own file only, leaving the exact results alone
+    if counting_method != 'estimate':
+        out_path = Path(f'../results/{deck_type}_{short_or_long}.txt')
+        out_path.touch()
+        with open(out_path, 'w+') as results_printer:
+            print(deck_type, file=results_printer)
+            print(short_or_long, file=results_printer)
+            for j in range(len(my_nums)):
+                print(f'{my_results[j][0]:>2}, {my_results[j][1]}, '
+                      + f'{my_nums[j][1]}, {my_denoms[j][1]}',
+                      file=results_printer)
+    if my_estimates:
+        estimate_path = Path(f'../results/{deck_type}_{short_or_long}'
+                             + '_estimate.txt')
+        estimate_path.touch()
+        with open(estimate_path, 'w+') as estimate_printer:
+            print(deck_type, file=estimate_printer)
+            print(short_or_long, file=estimate_printer)
+            # layers known exactly (below and at my_n, or saturated)
+            # appear with an interval of width 0 and no samples
+            exact_rows = [(j, float(frac), float(frac), float(frac), 0)
+                          for j, frac in my_results]
+            for j, estimate, low, high, trials in sorted(my_estimates
+                                                         + exact_rows):
+                print(f'{j:>2}, {estimate}, {low}, {high}, {trials}',
+                      file=estimate_printer)
@@ -6,13 +6,20 @@ from itertools import combinations
 import concurrent.futures
 from pathlib import Path
 import csv
+from my_deck_symmetry import DeckSymmetry
+from my_combinatorial_ranking import colex_combinations, rank_ranges
 
 '''All options set here, for convenience.
 Will cross-reference with start of their relevance below.'''
 # deck_type options: 'single', 'sample', 'like', 'opp', 'three', 'full'
-deck_type = 'single'  # see line 30 and following
+deck_type = 'single'  # see line 37 and following
 # short_or_long options: 'short', 'long'
-short_or_long = 'long'  # see line 55 and following
+short_or_long = 'long'  # see line 62 and following
+# orbit_reduction options: True, False
+# True checks one selection per orbit under the symmetries of the deck
+# (swapping equal values, and negating all values if the deck allows it),
+# then lists every selection in each solving orbit.
+orbit_reduction = True  # see line 115
 
 # Initialize deck
 black_suit = [j for j in range(1, 14)]
@@ -105,19 +112,56 @@ def given_list_checker(inds_selection):
     return False
 
 
+'''orbit_reduction choice relevant here.'''
+
+
+def rank_range_checker(bounds):
+    """
+    Return the selections with colex ranks in a range that solve the
+    equation, as checked by given_list_checker.
+
+    Parameters:
+    -------------
+    bounds: tuple
+        the start and stop ranks
+    """
+    start, stop = bounds
+    return [combo for combo in colex_combinations(my_inds, my_n, start, stop)
+            if given_list_checker(combo)]
+
+
 def basic_solutions_calculator():
     '''Find all basic solutions, using multiprocessing.'''
     base_denom = nC(deck_size, my_n)
     base_num = 0
+    if orbit_reduction:
+        deck_symmetry = DeckSymmetry(my_deck)
+        candidates = [rep for rep, orbit_size
+                      in deck_symmetry.orbit_representatives(my_n)]
+        num_candidates = len(candidates)
+    else:
+        # contiguous ranges of colex ranks, checked by one worker each
+        candidates = rank_ranges(0, base_denom, 8)
+        num_candidates = len(candidates)
     with concurrent.futures.ProcessPoolExecutor() as executor:
-        for result in executor.map(
-            given_list_checker,
-            combinations(my_inds, my_n),
-            chunksize=base_denom//8
-        ):
-            if result:
-                base_num += 1
-                basic_solutions.append(set(result))
+        if orbit_reduction:
+            for result in executor.map(
+                given_list_checker,
+                candidates,
+                chunksize=max(num_candidates//8, 1)
+            ):
+                if result:
+                    for member in deck_symmetry.orbit(result):
+                        base_num += 1
+                        basic_solutions.append(set(member))
+        else:
+            for results in executor.map(rank_range_checker, candidates):
+                for result in results:
+                    base_num += 1
+                    basic_solutions.append(set(result))
+    # orbits and ranges come out in other orders; restore the order of
+    # combinations()
+    basic_solutions.sort(key=sorted)
     my_nums.append((my_n, base_num))
     my_denoms.append((my_n, base_denom))
     my_results.append((my_n, Rational(base_num, base_denom)))
@@ -1,10 +1,50 @@
-from .my_subsets_graph import DAGNode, MultiSubsetGraph  # noqa F401
+from .my_subsets_graph import DAGNode, MultiSubsetNode,\
+    MultiSubsetGraph  # noqa F401
 from .my_subset_graph_new import BinSubsetGraph, BinSubsetGraphExtras,\
-BinSubsetGraphCpct, BinSubsetGraphSparse  # noqa F401
+BinSubsetGraphCpct, BinSubsetGraphSparse, SubsetListView, SubsetEntry,\
+    SubsetEntryList  # noqa F401
 from .my_subset_graph_again import encode_bin_tuple_as_str,\
     encode_seq_as_bin_tuple, encode_seq_to_str, encode_str_to_int,\
     decode_bin_tuple_as_seq, decode_int_to_str, decode_str_to_bin_tuple,\
-        decode_str_to_seq, BinSubsetGraphSparseAgain  # noqa F401
+        decode_str_to_seq, BinSubsetGraphSparseAgain,\
+    BinSubsetGraphSolvingLayer, upper_shadow, merge_sorted_masks,\
+    item_bit_map, encode_seqs_as_ints, decode_ints_to_bin_array,\
+    decode_ints_to_indices, decode_ints_to_seqs  # noqa F401
+from .my_subset_graph_bitset import BinSubsetGraphBitset, empty_bitset,\
+    set_bits, superset_closure, count_bits_by_popcount  # noqa F401
+from .my_subset_zdd import ZDD, SolutionZDD, heuristic_order  # noqa F401
+from .my_independence_polynomial import IndependencePolynomial,\
+    poly_add, poly_mul, binomial_row  # noqa F401
+from .my_multiplicity_counter import MultiplicityLayerCounter,\
+    value_classes, multiplicity_vector, multiplicity_classes,\
+    MAX_CLASSES  # noqa F401
+from .my_deck_symmetry import DeckSymmetry, bounded_vectors,\
+    orbit_weight  # noqa F401
+from .my_failure_frontier import FailureFrontier  # noqa F401
+from .my_deck_reduction import DeckReduction,\
+    enumeration_layer_counts  # noqa F401
+from .my_solution_components import SolutionComponents,\
+    solution_components  # noqa F401
+from .my_saturation import SaturationSearch  # noqa F401
+from .my_layer_estimation import LayerEstimator, wilson_interval,\
+    clopper_pearson_interval, regularized_beta,\
+    count_sampled_hits, sample_coverage_reciprocals  # noqa F401
+from .my_inclusion_exclusion import InclusionExclusionCounter,\
+    submasks_of_size  # noqa F401
+from .my_revolving_door import RevolvingDoorCounter,\
+    revolving_door_swaps, revolving_door_layer_counts  # noqa F401
+from .my_combinatorial_ranking import rank_combination,\
+    unrank_combination, combination_to_mask, mask_to_combination,\
+    gosper_masks, colex_combinations, rank_ranges, binomial_table,\
+    unrank_batch, unrank_range_batch, rank_batch, combinations_to_masks,\
+    unrank_masks_batch  # noqa F401
+from .my_shared_layers import BinSubsetGraphSharedLayers, layer_words,\
+    child_ranks, read_bits, pack_bits, mark_subsets, raise_into,\
+    raise_rank_range  # noqa F401
+from .my_layer_files import BinSubsetGraphLayerFiles  # noqa F401
+from .my_memory_planner import estimate_run, plan_runs, choose_method,\
+    default_memory_budget, current_rss, peak_rss, read_calibration,\
+    PeakMemoryRecorder, ENGINES, STRATEGIES, VERSION_ENGINES  # noqa F401
 from .quick_transforms_test import test_seq_to_str_compatability,\
 test_seq_to_str_reversibility, test_str_to_int_reversibility,\
-test_str_to_seq_compatibility  # noqa F401
\ No newline at end of file
+test_str_to_seq_compatibility, test_batch_encoding_compatibility  # noqa F401
\ No newline at end of file
@@ -0,0 +1,57 @@
+from my_combinatorial_ranking import rank_combination, unrank_combination, \
+    gosper_masks, colex_combinations, rank_ranges, combination_to_mask, \
+    mask_to_combination, unrank_range_batch, rank_batch
+from itertools import combinations
+from math import comb
+import pytest
+
+
+def colex_order(n, k):
+    return sorted(combinations(range(n), k),
+                  key=lambda combo: sorted(combo, reverse=True))
+
+
+def test_rank_unrank_round_trip():
+    for n in range(8):
+        for k in range(n + 1):
+            for rank, combo in enumerate(colex_order(n, k)):
+                assert rank_combination(combo) == rank
+                assert unrank_combination(rank, k, n) == combo
+                assert mask_to_combination(combination_to_mask(combo)) \
+                    == combo
+
+
+def test_unrank_out_of_range():
+    with pytest.raises(ValueError):
+        unrank_combination(3, 0)
+    with pytest.raises(ValueError):
+        unrank_combination(comb(6, 2), 2, 6)
+    with pytest.raises(ValueError):
+        unrank_combination(-1, 2)
+
+
+def test_enumerators_from_any_rank():
+    for n in range(8):
+        for k in range(n + 1):
+            combos = colex_order(n, k)
+            for start in range(len(combos) + 1):
+                assert list(colex_combinations(range(n), k, start)) \
+                    == combos[start:]
+                assert list(gosper_masks(n, k, start, start + 3)) \
+                    == [combination_to_mask(combo)
+                        for combo in combos[start:start + 3]]
+
+
+def test_rank_ranges_cover_layer():
+    for total in (0, 1, 7, 64, 100):
+        for num_ranges in (1, 3, 10):
+            ranges = rank_ranges(0, total, num_ranges)
+            assert len(ranges) <= num_ranges
+            assert [rank for start, stop in ranges
+                    for rank in range(start, stop)] == list(range(total))
+
+
+def test_batch_rank_unrank():
+    combos = unrank_range_batch(0, comb(10, 4), 10, 4)
+    assert [tuple(row) for row in combos.tolist()] == colex_order(10, 4)
+    assert rank_batch(combos).tolist() == list(range(comb(10, 4)))
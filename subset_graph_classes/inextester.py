@@ -1,4 +1,6 @@
+from collections import Counter
 from itertools import combinations
+from math import comb
 from sympy.functions.combinatorial.numbers import nC
 
 default_terms = [j for j in range(10)]
@@ -21,6 +23,8 @@ class OverlapsCounter():
     def __init__(self, terms=default_terms, subsets_list=default_subsets):
         self.num_terms = len(terms)
         self.terms = set(terms)
+        self.ordered_terms = tuple(terms)
+        self.position = {term: j for j, term in enumerate(self.ordered_terms)}
         if len(self.terms) != self.num_terms:
             raise ValueError("Given set contains repeats!")
         # make sure first subset is good
@@ -42,6 +46,65 @@ class OverlapsCounter():
                 )
             self.subsets.append(subset)
         self.subsets = tuple(self.subsets)
+        # item j of the terms is bit 1 << j
+        self.masks = tuple(self.to_mask(subset) for subset in self.subsets)
+        self.tallies = None
+
+    def to_mask(self, subsubset):
+        """Return the bitmask of a subset of the terms."""
+        mask = 0
+        for term in subsubset:
+            mask |= 1 << self.position[term]
+        return mask
+
+    def from_mask(self, mask):
+        """Return the terms in a bitmask, in the order given."""
+        output = []
+        while mask:
+            low = mask & -mask
+            output.append(self.ordered_terms[low.bit_length() - 1])
+            mask ^= low
+        return tuple(output)
+
+    def overlap_tallies(self):
+        """Return the list whose entry k tallies, by bitmask, how many of
+        the subsets hold each k-subset of the terms held by any.
+
+        Every size comes from one pass over the subsets, enumerating the
+        sub-subsets of each rather than the k-subsets of all the terms;
+        the result is kept for later calls."""
+        if self.tallies is None:
+            tally = Counter()
+            batch = []
+            for mask in self.masks:
+                # the nonzero submasks, down from the mask itself
+                submask = mask
+                while submask:
+                    batch.append(submask)
+                    submask = (submask - 1) & mask
+                if len(batch) >= 2**16:
+                    tally.update(batch)
+                    batch = []
+            tally.update(batch)
+            self.tallies = [Counter() for k in range(self.subset_size + 1)]
+            for submask, count in tally.items():
+                self.tallies[submask.bit_count()][submask] = count
+        return self.tallies
+
+    def count_all_overlap_sizes(self):
+        """Return the dict taking each overlap size to the total number of
+        pairs of subsets sharing each sub-subset of that size, and the list
+        of the sub-subsets held by any subset with their counts (those held
+        by none add nothing and are left out)."""
+        output = {}
+        for small_size, tally in enumerate(self.overlap_tallies()):
+            if small_size == 0:
+                continue
+            overlap_counts = [(self.from_mask(mask), count, comb(count, 2))
+                              for mask, count in tally.items()]
+            total_count = sum(pair[2] for pair in overlap_counts)
+            output[small_size] = (total_count, overlap_counts)
+        return output
 
     def count_overlap_size(self, small_size=1):
         if small_size < 1 or small_size > self.subset_size:
@@ -49,13 +112,10 @@ class OverlapsCounter():
                 f"Invalid overlap size {small_size} detected.\n"
                 + f"Maximum size is {self.subset_size}."
             )
+        tally = self.overlap_tallies()[small_size]
         overlap_counts = []
         for subsubset in combinations(self.terms, small_size):
-            subsubset_as_set = set(subsubset)
-            count = 0
-            for subset in self.subsets:
-                if subsubset_as_set <= subset:
-                    count += 1
+            count = tally[self.to_mask(subsubset)]
             # if m uses of a subsubset, m-choose-two pairs
             overlap_counts.append((subsubset, count, nC(count, 2)))
         total_count = 0
@@ -0,0 +1,142 @@
+from my_subset_graph_bitset import BinSubsetGraphBitset
+from my_subset_zdd import SolutionZDD
+from my_independence_polynomial import IndependencePolynomial
+from my_deck_symmetry import DeckSymmetry
+from my_failure_frontier import FailureFrontier
+from my_deck_reduction import DeckReduction, enumeration_layer_counts
+from my_solution_components import SolutionComponents
+from my_saturation import SaturationSearch
+from my_layer_estimation import LayerEstimator
+from my_inclusion_exclusion import InclusionExclusionCounter
+from my_revolving_door import RevolvingDoorCounter
+from my_shared_layers import BinSubsetGraphSharedLayers
+from itertools import combinations
+from math import comb
+from pathlib import Path
+import csv
+
+test_items = tuple(range(12))
+# two components, the twins 9 and 10, and 11 in no basic subset
+test_solutions = [(0, 1, 2), (1, 3), (2, 3, 4), (4, 9, 10), (5, 6, 7),
+                  (5, 6, 8)]
+sample_results = Path(__file__).resolve().parent.parent / 'sample_results'
+
+
+def brute_force_counts(items, solutions):
+    return [sum(any(set(solution) <= set(combo) for solution in solutions)
+                for combo in combinations(items, layer))
+            for layer in range(len(items) + 1)]
+
+
+expected = brute_force_counts(test_items, test_solutions)
+
+
+def test_whole_graph_counters():
+    bitset = BinSubsetGraphBitset(test_items)
+    bitset.fill_in_property(test_solutions)
+    for counter in (bitset, SolutionZDD(test_items, test_solutions),
+                    IndependencePolynomial(test_items, test_solutions)):
+        assert [row[1] for row in counter.count_property_all_layers()] \
+            == expected
+
+
+def test_enumeration_counters():
+    assert enumeration_layer_counts(test_items, test_solutions) == expected
+    assert RevolvingDoorCounter(test_items, test_solutions).layer_counts() \
+        == expected
+    counter = InclusionExclusionCounter(test_items, test_solutions, 7)
+    assert counter.layer_counts == expected[:8]
+
+
+def test_layer_by_layer_counters():
+    frontier = FailureFrontier(test_items, test_solutions)
+    shared = BinSubsetGraphSharedLayers(test_items, 2, max_workers=2)
+    shared.fill_in_property_at_current_layer([(1, 3)])
+    for layer in range(len(test_items) + 1):
+        assert frontier.count_property_at_current_layer()[0] \
+            == expected[layer]
+        if layer >= 2:
+            assert shared.count_property_at_current_layer()[0] \
+                == expected[layer]
+        if layer < len(test_items):
+            frontier.raise_layer_with_properties()
+        if 2 <= layer < len(test_items):
+            shared.raise_layer_with_properties(
+                [solution for solution in test_solutions
+                 if len(solution) == layer + 1])
+    shared.close()
+
+
+def test_splitting_counters():
+    reduction = DeckReduction(test_items, test_solutions)
+    assert not reduction.is_trivial()
+    assert reduction.irrelevant == (11,)
+    assert reduction.layer_counts(enumeration_layer_counts) == expected
+    components = SolutionComponents(test_items, test_solutions)
+    assert not components.is_trivial()
+    assert len(components.components) == 2
+    assert components.layer_counts(enumeration_layer_counts) == expected
+    assert components.layer_counts(enumeration_layer_counts,
+                                   parallel=True) == expected
+
+
+def test_saturation():
+    search = SaturationSearch(test_items, test_solutions)
+    full = [layer for layer in range(len(test_items) + 1)
+            if expected[layer] == comb(len(test_items), layer)]
+    assert search.saturation_layer == full[0]
+    assert len(search.largest_failure) == full[0] - 1
+    assert not any(set(solution) <= set(search.largest_failure)
+                   for solution in test_solutions)
+
+
+def test_orbits():
+    deck = (-3, -2, -2, -1, 1, 2, 2, 3)
+    # x + y = z among the values, as index triples
+    solutions = [combo for combo in combinations(range(len(deck)), 3)
+                 if any(deck[a] + deck[b] == deck[c]
+                        for a, b, c in ((combo[0], combo[1], combo[2]),
+                                        (combo[0], combo[2], combo[1]),
+                                        (combo[1], combo[2], combo[0])))]
+    counts = brute_force_counts(range(len(deck)), solutions)
+    symmetry = DeckSymmetry(deck)
+    assert symmetry.negation
+    for layer in range(len(deck) + 1):
+        total = 0
+        num_selections = 0
+        for selection, orbit_size in symmetry.orbit_representatives(layer):
+            assert len(set(symmetry.orbit(selection))) == orbit_size
+            num_selections += orbit_size
+            if any(set(solution) <= set(selection)
+                   for solution in solutions):
+                total += orbit_size
+        assert num_selections == comb(len(deck), layer)
+        assert total == counts[layer]
+
+
+def test_estimation():
+    estimator = LayerEstimator(test_items, test_solutions, seed=2)
+    for layer in (3, 5, 7):
+        share = expected[layer] / comb(len(test_items), layer)
+        hits, trials, estimate, low, high = \
+            estimator.estimate_layer(layer, target_width=0.05)
+        assert low <= share <= high
+        assert estimator.union_bound(layer) >= share
+        count, samples, estimate, low, high = \
+            estimator.karp_luby_layer(layer, epsilon=0.05)
+        assert abs(count - expected[layer]) <= 0.05 * expected[layer]
+
+
+def test_sample_results():
+    '''The like short_short results, from its basic solutions.'''
+    with open(sample_results / 'like_2eq_short_short_baseline.csv') as f:
+        solutions = [tuple(int(ind) for ind in row)
+                     for row in list(csv.reader(f))[2:]]
+    with open(sample_results / 'like_2eq_short_short.txt') as f:
+        counts = [int(line.split(',')[2]) for line in f.readlines()[2:]]
+    bitset = BinSubsetGraphBitset(range(26))
+    bitset.fill_in_property(solutions)
+    zdd = SolutionZDD(range(26), solutions)
+    for counter in (bitset, zdd):
+        assert [row[1] for row in counter.count_property_all_layers()] \
+            == counts
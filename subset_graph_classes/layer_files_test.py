@@ -0,0 +1,61 @@
+from my_layer_files import BinSubsetGraphLayerFiles, solutions_fingerprint
+from itertools import combinations
+
+test_items = tuple(range(9))
+test_solutions = [(0, 1, 2), (2, 5, 7), (3, 4, 8)]
+other_solutions = [(0, 1, 3), (6, 7, 8)]
+
+
+def brute_force_count(solutions, layer):
+    return sum(any(set(solution) <= set(combo) for solution in solutions)
+               for combo in combinations(test_items, layer))
+
+
+def start_run(directory, solutions, resume):
+    graph = BinSubsetGraphLayerFiles(
+        test_items, 3, directory, resume=resume,
+        fingerprint=solutions_fingerprint(test_items, solutions, 3))
+    if graph.current_layer == 3:
+        graph.fill_in_property_at_current_layer(solutions)
+    return graph
+
+
+def test_layer_files_counts(tmp_path):
+    graph = start_run(tmp_path, test_solutions, False)
+    for layer in range(3, len(test_items) + 1):
+        assert graph.count_property_at_current_layer()[0] \
+            == brute_force_count(test_solutions, layer)
+        if layer < len(test_items):
+            graph.raise_layer_with_properties()
+    graph.close()
+
+
+def test_layer_files_resume(tmp_path):
+    graph = start_run(tmp_path, test_solutions, False)
+    graph.raise_layer_with_properties()
+    graph.raise_layer_with_properties()
+    graph.close()
+    # a leftover of a layer being written when the run stopped
+    (tmp_path / 'layer_9_6.bits.partial').write_bytes(b'\0' * 8)
+    graph = start_run(tmp_path, test_solutions, True)
+    assert graph.current_layer == 5
+    assert not list(tmp_path.glob('*.partial'))
+    assert graph.recorded_counts() == {
+        layer: brute_force_count(test_solutions, layer) for layer in (3, 4)}
+    assert graph.count_property_at_current_layer()[0] \
+        == brute_force_count(test_solutions, 5)
+    graph.close()
+
+
+def test_layer_files_refuse_stale_resume(tmp_path):
+    graph = start_run(tmp_path, test_solutions, False)
+    graph.raise_layer_with_properties()
+    graph.close()
+    graph = start_run(tmp_path, other_solutions, True)
+    assert graph.current_layer == 3
+    assert graph.recorded_counts() == {}
+    for layer in range(3, 6):
+        assert graph.count_property_at_current_layer()[0] \
+            == brute_force_count(other_solutions, layer)
+        graph.raise_layer_with_properties()
+    graph.close()
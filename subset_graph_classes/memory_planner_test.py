@@ -0,0 +1,60 @@
+from my_memory_planner import estimate_run, read_calibration, \
+    PeakMemoryRecorder, MIN_CALIBRATION_BYTES, MIN_CALIBRATION_SECONDS
+import csv
+
+run = (26, 4, 26, 30)  # num_terms, first_layer, last_layer, num_solutions
+
+
+def append_record(path, record):
+    is_new = not path.exists()
+    with open(path, 'a', newline='') as record_printer:
+        writer = csv.DictWriter(record_printer, fieldnames=list(record))
+        if is_new:
+            writer.writeheader()
+        writer.writerow(record)
+
+
+def recorded_run(calibration):
+    '''The record of a run whose actual peak and time are twice the
+    model's, predicted with the given calibration.'''
+    estimate = estimate_run('BinSubsetGraphBitset', *run,
+                            calibration=calibration)
+    recorder = PeakMemoryRecorder(estimate, *run)
+    recorder.start()
+    record = recorder.stop()
+    record.update(rss_start=0, traced_peak=0, worker_rss_peak=0,
+                  rss_peak=2 * record["predicted_bytes"]
+                  + MIN_CALIBRATION_BYTES,
+                  seconds=2 * record["predicted_seconds"]
+                  + MIN_CALIBRATION_SECONDS)
+    return record
+
+
+def test_calibration_does_not_compound(tmp_path):
+    path = tmp_path / 'calibration.csv'
+    factors = []
+    for j in range(4):
+        calibration = read_calibration(path)
+        append_record(path, recorded_run(calibration))
+        factors.append(read_calibration(path)['BinSubsetGraphBitset'])
+    # the same run recorded again leaves the factors where they were
+    assert factors[1:] == factors[:-1]
+
+
+def test_calibration_records_model_prediction():
+    estimate = estimate_run('BinSubsetGraphBitset', *run,
+                            calibration={'BinSubsetGraphBitset': (5, 7)})
+    assert estimate["peak_bytes"] == 5 * estimate["model_bytes"]
+    record = recorded_run({'BinSubsetGraphBitset': (5, 7)})
+    assert record["predicted_bytes"] == estimate["model_bytes"]
+    assert record["predicted_seconds"] == estimate["model_seconds"]
+
+
+def test_calibration_skips_tiny_runs(tmp_path):
+    path = tmp_path / 'calibration.csv'
+    record = recorded_run(None)
+    # interpreter overhead on a run the model puts at a few kilobytes
+    record.update(predicted_bytes=4096, rss_peak=40 * 2**20,
+                  predicted_seconds=1e-4, seconds=0.5)
+    append_record(path, record)
+    assert read_calibration(path) == {}
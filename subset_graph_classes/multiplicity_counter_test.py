@@ -0,0 +1,33 @@
+from my_multiplicity_counter import MultiplicityLayerCounter, \
+    multiplicity_classes, MAX_CLASSES
+from itertools import combinations
+import pytest
+
+test_deck = (1, 1, 2, 2, 3, 3, 4, 4, 5, 5)
+
+
+def solves(combo):
+    x, y, z = sorted(test_deck[j] for j in combo)
+    return x + y == z
+
+
+# x + y = z among the values, as index triples
+test_solutions = [combo for combo in combinations(range(len(test_deck)), 3)
+                  if solves(combo)]
+
+
+def test_multiplicity_counts():
+    counter = MultiplicityLayerCounter(test_deck, test_solutions)
+    for layer, num, denom, fraction in counter.count_property_all_layers():
+        assert num == sum(
+            any(set(solution) <= set(combo) for solution in test_solutions)
+            for combo in combinations(range(len(test_deck)), layer))
+
+
+def test_multiplicity_limit():
+    black = list(range(1, 14))
+    three_suits = black + black + [-j for j in black]
+    assert multiplicity_classes(black + black) == 3**13
+    assert multiplicity_classes(three_suits) == 3**13 * 2**13 > MAX_CLASSES
+    with pytest.raises(ValueError):
+        MultiplicityLayerCounter(test_deck, test_solutions, max_classes=100)
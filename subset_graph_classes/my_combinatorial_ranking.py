@@ -0,0 +1,301 @@
+"""Rank and unrank k-subsets in colex order, so that an enumeration can
+start (or be split, or resume) at any rank.
+
+In colex order the k-subset c_1 < c_2 < ... < c_k of range(n) has rank
+C(c_1, 1) + C(c_2, 2) + ... + C(c_k, k) (the combinatorial number
+system), and unranking takes, from c_k down to c_1, the largest c_i with
+C(c_i, i) no more than what is left of the rank.  Colex order is also the
+numerical order of the bitmasks, so Gosper's hack steps from one mask to
+the next with a few word operations.  The batch versions unrank whole
+ranges of ranks at once with NumPy, one column of Pascal's triangle per
+position, for n up to 64."""
+from math import comb
+import numpy as np
+
+
+def rank_combination(combo):
+    """Return the colex rank of a subset of range(n).
+
+    Parameters:
+    -----------
+    combo: Iterable[int]
+        The members of the subset, each a nonnegative int.
+    """
+    return sum(comb(c, i + 1) for i, c in enumerate(sorted(combo)))
+
+
+def unrank_combination(rank, k, n=None):
+    """Return the k-subset with the given colex rank, as a sorted tuple.
+
+    Parameters:
+    -----------
+    rank: int (nonnegative)
+        The rank.
+    k: int (nonnegative)
+        The size of the subset.
+    n: int or None
+        The number of items, if the rank should be checked against
+        C(n, k); None allows subsets of any range.
+    """
+    if rank < 0:
+        raise ValueError("Ranks are nonnegative!")
+    # only the empty set has no elements, and it has rank 0
+    if (k == 0 and rank > 0) or (n is not None and rank >= comb(n, k)):
+        raise ValueError("Rank out of range!")
+    output = []
+    c = k - 1
+    # find the largest c with C(c, k) <= rank, growing from below
+    while comb(c + 1, k) <= rank:
+        c += 1
+    for i in range(k, 0, -1):
+        while comb(c, i) > rank:
+            c -= 1
+        output.append(c)
+        rank -= comb(c, i)
+        c -= 1
+    return tuple(reversed(output))
+
+
+def combination_to_mask(combo):
+    """Return the bitmask of a subset of range(n).
+
+    Parameters:
+    -----------
+    combo: Iterable[int]
+        The members of the subset.
+    """
+    mask = 0
+    for c in combo:
+        mask |= 1 << c
+    return mask
+
+
+def mask_to_combination(mask):
+    """Return the members of a bitmask's subset, as a sorted tuple.
+
+    Parameters:
+    -----------
+    mask: int (nonnegative)
+        The bitmask.
+    """
+    output = []
+    j = 0
+    while mask:
+        if mask & 1:
+            output.append(j)
+        mask >>= 1
+        j += 1
+    return tuple(output)
+
+
+def gosper_masks(n, k, start=0, stop=None):
+    """Yield the bitmasks of the k-subsets of range(n) in increasing
+    (that is, colex) order, from rank start up to rank stop.
+
+    Parameters:
+    -----------
+    n: int (nonnegative)
+        The number of items.
+    k: int (nonnegative)
+        The number of bits in each mask.
+    start: int (nonnegative)
+        The rank of the first mask.
+    stop: int or None
+        The rank past the last mask; None goes to the end, C(n, k).
+    """
+    total = comb(n, k)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    mask = combination_to_mask(unrank_combination(start, k, n))
+    for rank in range(start, stop):
+        yield mask
+        if mask == 0:
+            return
+        low = mask & -mask
+        ripple = mask + low
+        mask = (((ripple ^ mask) >> 2) // low) | ripple
+
+
+def colex_combinations(my_list, k, start=0, stop=None):
+    """Yield the k-subsets of a list in colex order, as tuples in list
+    order, from rank start up to rank stop; a stand-in for
+    itertools.combinations that can start anywhere.
+
+    Parameters:
+    -----------
+    my_list: Iterable
+        The list constaining all items in your set.
+    k: int (nonnegative)
+        The size of the subsets.
+    start: int (nonnegative)
+        The rank of the first subset.
+    stop: int or None
+        The rank past the last subset; None goes to the end.
+    """
+    items = tuple(my_list)
+    n = len(items)
+    total = comb(n, k)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    c = list(unrank_combination(start, k, n))
+    for rank in range(start, stop):
+        yield tuple(items[j] for j in c)
+        # raise the lowest entry that has room, reset the ones below it
+        i = 0
+        while i < k and c[i] + 1 == (c[i + 1] if i + 1 < k else n):
+            i += 1
+        if i == k:
+            return
+        c[i] += 1
+        for j in range(i):
+            c[j] = j
+
+
+def rank_ranges(start, stop, num_ranges):
+    """Split the ranks from start up to stop into at most num_ranges
+    contiguous (start, stop) ranges of nearly equal size, to hand out to
+    worker processes.
+
+    Parameters:
+    -----------
+    start: int (nonnegative)
+        The first rank.
+    stop: int
+        The rank past the last one.
+    num_ranges: int (positive)
+        The number of ranges wanted.
+    """
+    step = max(-(-(stop - start) // num_ranges), 1)
+    return [(low, min(low + step, stop)) for low in range(start, stop, step)]
+
+
+def binomial_table(n, k):
+    """Return the (n + 1) by (k + 1) int64 array of C(c, i), for c up to
+    n and i up to k.
+
+    Parameters:
+    -----------
+    n: int (nonnegative)
+        The largest top entry.
+    k: int (nonnegative)
+        The largest bottom entry.
+    """
+    if comb(n, min(k, n // 2)) >= 2**63:
+        raise ValueError("Binomial coefficients overflow int64!")
+    table = np.zeros((n + 1, k + 1), dtype=np.int64)
+    for c in range(n + 1):
+        for i in range(min(c, k) + 1):
+            table[c, i] = comb(c, i)
+    return table
+
+
+def unrank_batch(ranks, n, k, table=None):
+    """Return the k-subsets of range(n) with the given colex ranks, as an
+    int64 array with one sorted row per rank.
+
+    Parameters:
+    -----------
+    ranks: array_like[int]
+        The ranks, each below C(n, k).
+    n: int (nonnegative)
+        The number of items.
+    k: int (nonnegative)
+        The size of the subsets.
+    table: np.ndarray or None
+        A binomial_table(n, k), to reuse across calls.
+    """
+    if table is None:
+        table = binomial_table(n, k)
+    left = np.array(ranks, dtype=np.int64)
+    if left.size and (left.min() < 0 or left.max() >= comb(n, k)):
+        raise ValueError("Ranks out of range!")
+    output = np.empty((left.size, k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        # C(c, i) is nondecreasing in c, so the largest c with
+        # C(c, i) <= rank comes from one binary search per rank
+        column = table[:, i]
+        c = np.searchsorted(column, left, side='right') - 1
+        output[:, i - 1] = c
+        left -= column[c]
+    return output
+
+
+def unrank_range_batch(start, stop, n, k, table=None):
+    """Return the k-subsets of range(n) with colex ranks from start up to
+    stop, as an int64 array with one sorted row per rank.
+
+    Parameters:
+    -----------
+    start: int (nonnegative)
+        The first rank.
+    stop: int
+        The rank past the last one.
+    n: int (nonnegative)
+        The number of items.
+    k: int (nonnegative)
+        The size of the subsets.
+    table: np.ndarray or None
+        A binomial_table(n, k), to reuse across calls.
+    """
+    return unrank_batch(np.arange(start, min(stop, comb(n, k)),
+                                  dtype=np.int64), n, k, table)
+
+
+def rank_batch(combos, table=None):
+    """Return the colex ranks of the rows of an array of sorted subsets.
+
+    Parameters:
+    -----------
+    combos: array_like[int]
+        The subsets, one sorted row each.
+    table: np.ndarray or None
+        A binomial_table(n, k) with n past every entry, to reuse across
+        calls.
+    """
+    combos = np.asarray(combos, dtype=np.int64)
+    k = combos.shape[1]
+    if table is None:
+        table = binomial_table(int(combos.max(initial=0)) + 1, k)
+    output = np.zeros(combos.shape[0], dtype=np.int64)
+    for i in range(k):
+        output += table[combos[:, i], i + 1]
+    return output
+
+
+def combinations_to_masks(combos):
+    """Return the uint64 bitmasks of the rows of an array of subsets of
+    range(n), for n up to 64.
+
+    Parameters:
+    -----------
+    combos: array_like[int]
+        The subsets, one row each.
+    """
+    combos = np.asarray(combos, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), combos),
+                                axis=1, initial=np.uint64(0))
+
+
+def unrank_masks_batch(start, stop, n, k, table=None):
+    """Return the uint64 bitmasks of the k-subsets of range(n) with colex
+    ranks from start up to stop, for n up to 64.
+
+    Parameters:
+    -----------
+    start: int (nonnegative)
+        The first rank.
+    stop: int
+        The rank past the last one.
+    n: int (at most 64)
+        The number of items.
+    k: int (nonnegative)
+        The size of the subsets.
+    table: np.ndarray or None
+        A binomial_table(n, k), to reuse across calls.
+    """
+    if n > 64:
+        raise ValueError("Masks only hold 64 items!")
+    return combinations_to_masks(unrank_range_batch(start, stop, n, k,
+                                                    table))
@@ -0,0 +1,138 @@
+"""Shrink the set of items before counting an upward-closed property,
+then expand the layer counts back to the full set exactly.
+
+Two reductions are safe for any counting method:
+
+* An item in no basic subset never matters, so with r such items the
+  counts over the full set are the counts over the rest convolved with
+  the binomial row (1 + y)**r.
+* Items in exactly the same basic subsets (identical incidence) are
+  either all needed or all useless.  A group of g of them is replaced by
+  one representative; a subset holding all g counts like one holding the
+  representative (g - 1 more items), and a subset holding fewer counts
+  like one holding none of them, in (1 + y)**g - y**g ways.  This needs
+  the counts with and without the representative, so each collapsed
+  group doubles the number of reduced instances counted.
+
+Weaker forms of domination (an item whose solutions all survive swapping
+it for another) do not re-expand exactly this way, so are left alone."""
+from itertools import combinations
+from my_independence_polynomial import poly_add, poly_mul, binomial_row
+
+
+def enumeration_layer_counts(my_list, valids):
+    """Count the subsets with an upward-closed property in every layer,
+    by checking every subset against the basic subsets as bitmasks.
+
+    Parameters:
+    -----------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    """
+    items = tuple(my_list)
+    position = {item: j for j, item in enumerate(items)}
+    solutions = set()
+    for valid in valids:
+        mask = 0
+        for item in valid:
+            mask |= 1 << position[item]
+        solutions.add(mask)
+    output = []
+    for size in range(len(items) + 1):
+        count = 0
+        for combo in combinations(range(len(items)), size):
+            mask = 0
+            for j in combo:
+                mask |= 1 << j
+            if any(sol & mask == sol for sol in solutions):
+                count += 1
+        output.append(count)
+    return output
+
+
+class DeckReduction():
+    """
+    Remove the items in no basic subset, and collapse groups of items
+    with identical incidence, for counting an upward-closed property.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    max_collapsed_groups: int (nonnegative)
+        The most groups to collapse (largest first); counting takes
+        2**(number collapsed) reduced instances.
+    """
+
+    def __init__(self, my_list, valids, max_collapsed_groups=4):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if len(set(self.items)) != self.n:
+            raise ValueError("Given list contains repeats!")
+        valids = [tuple(valid) for valid in valids]
+        incidence = {item: [] for item in self.items}
+        for j, valid in enumerate(valids):
+            for item in valid:
+                incidence[item].append(j)
+        self.irrelevant = tuple(item for item in self.items
+                                if not incidence[item])
+        by_incidence = {}
+        for item in self.items:
+            if incidence[item]:
+                by_incidence.setdefault(tuple(incidence[item]),
+                                        []).append(item)
+        groups = [group for group in by_incidence.values() if len(group) > 1]
+        groups.sort(key=lambda group: -len(group))
+        groups = groups[:max_collapsed_groups]
+        # the first item of each group represents the rest
+        self.groups = tuple((group[0], len(group)) for group in groups)
+        dropped = set(self.irrelevant)
+        for group in groups:
+            dropped.update(group[1:])
+        self.reduced_items = tuple(item for item in self.items
+                                   if item not in dropped)
+        self.reduced_valids = [tuple(item for item in valid
+                                     if item not in dropped)
+                               for valid in valids]
+
+    def is_trivial(self):
+        '''Report whether the reduction leaves the set unchanged.'''
+        return len(self.reduced_items) == self.n
+
+    def layer_counts(self, counter):
+        '''Return the list whose k-th entry is the number of k-subsets
+        of the full set with the property.
+
+        Parameters
+        -----------
+        counter: Callable
+            Takes (items, valids) and returns the list of the counts
+            with the property by layer, as for enumeration_layer_counts.
+        '''
+        output = self._expand(self.reduced_items, self.reduced_valids,
+                              self.groups, counter)
+        output = poly_mul(output, binomial_row(len(self.irrelevant)))
+        return output[:self.n + 1]
+
+    def _expand(self, items, valids, groups, counter):
+        '''Counts over items, with the given groups re-expanded.'''
+        if not groups:
+            output = list(counter(items, valids))
+            return output + [0 for j in range(len(items) + 1 - len(output))]
+        (representative, size), rest = groups[0], groups[1:]
+        with_all = self._expand(items, valids, rest, counter)
+        others = [item for item in items if item != representative]
+        without = self._expand(
+            others, [valid for valid in valids if representative not in valid],
+            rest, counter
+        )
+        holding = poly_add(with_all, [-c for c in without])
+        partial = binomial_row(size)[:-1]  # fewer than all of the group
+        return poly_add([0 for j in range(size - 1)] + holding,
+                        poly_mul(without, partial))
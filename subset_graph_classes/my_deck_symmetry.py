@@ -0,0 +1,196 @@
+"""Give the symmetries of a deck under which solving is preserved,
+and enumerate subsets of the deck up to those symmetries.
+
+For equations of the form x_0 + ... + x_{m-1} = x_m, a selection of
+cards solves exactly when any relabeling of equal-valued cards does,
+and (as the equations are homogeneous) exactly when its negation does.
+So the automorphisms of (deck, equations) include every permutation of
+the indices within each value class, and, when the deck is closed under
+negation, the map sending each card to a card of the opposite value.
+We enumerate one representative per orbit of k-subsets, and weight
+counts by orbit sizes."""
+from itertools import combinations, product
+from math import comb, factorial
+from my_multiplicity_counter import value_classes, multiplicity_vector
+
+
+def bounded_vectors(caps, total):
+    """Yield every vector m with 0 <= m[j] <= caps[j] summing to total,
+    in lexicographic order.
+
+    Parameters:
+    -----------
+    caps: Iterable[int]
+        The upper bound for each entry.
+    total: int (nonnegative)
+        The desired sum.
+    """
+    caps = tuple(caps)
+    r = len(caps)
+    room = [0 for j in range(r + 1)]  # room[j]: most that fits from j on
+    for j in range(r - 1, -1, -1):
+        room[j] = room[j + 1] + caps[j]
+    if total < 0 or total > room[0]:
+        return
+    if r == 0:
+        yield ()
+        return
+    vector = [0 for j in range(r)]
+    remaining = [0 for j in range(r)]  # total less the entries before j
+    remaining[0] = total
+    vector[0] = max(0, total - room[1]) - 1
+    j = 0
+    while j >= 0:
+        vector[j] += 1
+        if vector[j] > min(caps[j], remaining[j]):
+            j -= 1
+        elif j == r - 1:  # only one choice fits at the end
+            yield tuple(vector)
+        else:
+            j += 1
+            remaining[j] = remaining[j - 1] - vector[j - 1]
+            vector[j] = max(0, remaining[j] - room[j + 1]) - 1
+
+
+def orbit_weight(vector, caps):
+    """Return the number of index subsets with the given
+    multiplicity vector.
+
+    Parameters:
+    -----------
+    vector: Iterable[int]
+        The multiplicity of each value.
+    caps: Iterable[int]
+        The number of copies of each value in the deck.
+    """
+    weight = 1
+    for m, c in zip(vector, caps):
+        weight *= comb(c, m)
+    return weight
+
+
+class DeckSymmetry():
+    """
+    The automorphism group of a deck for homogeneous sum equations:
+    permutations within value classes, times negation if the deck
+    (as a multiset) is closed under it.
+
+    Parameters
+    ------------
+    my_deck: Iterable
+        The values of the cards, repeats allowed.
+    use_negation: bool
+        Whether to include negation, when the deck allows it.
+        (Only valid for homogeneous equations, as all of ours are.)
+    """
+
+    def __init__(self, my_deck, use_negation=True):
+        self.deck = tuple(my_deck)
+        self.n = len(self.deck)
+        self.values, self.index_groups = value_classes(self.deck)
+        self.caps = tuple(len(group) for group in self.index_groups)
+        self.negation = use_negation and \
+            sorted(-v for v in self.deck) == sorted(self.deck)
+        self.group_order = 2 if self.negation else 1
+        for c in self.caps:
+            self.group_order *= factorial(c)
+
+    def mirror(self, vector):
+        '''Return the multiplicity vector of the negated selection.
+        (Values are sorted, so negation reverses them.)
+
+        Parameters
+        -----------
+        vector: tuple[int]
+            The multiplicity of each value.
+        '''
+        return tuple(reversed(vector))
+
+    def vector_orbit(self, vector):
+        '''Return the multiplicity vectors in the orbit of a vector.
+
+        Parameters
+        -----------
+        vector: tuple[int]
+            The multiplicity of each value.
+        '''
+        if self.negation:
+            return sorted(set((vector, self.mirror(vector))))
+        return [vector]
+
+    def representative(self, vector):
+        '''Return the canonical index selection with a given
+        multiplicity vector: the first copies of each value.
+
+        Parameters
+        -----------
+        vector: tuple[int]
+            The multiplicity of each value.
+        '''
+        output = []
+        for m, group in zip(vector, self.index_groups):
+            output.extend(group[:m])
+        return tuple(sorted(output))
+
+    def orbit_representatives(self, size):
+        '''Yield (inds_selection, orbit_size) for one selection
+        from each orbit of size-element index subsets.
+
+        Parameters
+        -----------
+        size: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if max(self.caps, default=0) == 1:
+            yield from self._distinct_representatives(size)
+            return
+        for vector in bounded_vectors(self.caps, size):
+            orbit = self.vector_orbit(vector)
+            if orbit[0] != vector:
+                continue  # the orbit is represented by its first vector
+            orbit_size = len(orbit) * orbit_weight(vector, self.caps)
+            yield self.representative(vector), orbit_size
+
+    def _distinct_representatives(self, size):
+        '''Do the same as orbit_representatives, faster,
+        when no value repeats.'''
+        r = len(self.values)
+        firsts = [group[0] for group in self.index_groups]
+        for positions in combinations(range(r), size):
+            orbit_size = 1
+            if self.negation:
+                mirrored = tuple(r - 1 - p for p in reversed(positions))
+                if mirrored < positions:
+                    continue
+                if mirrored != positions:
+                    orbit_size = 2
+            yield tuple(firsts[p] for p in positions), orbit_size
+
+    def orbit(self, inds_selection):
+        '''Yield every index selection in the orbit of the given one.
+
+        Parameters
+        -----------
+        inds_selection: Iterable[int]
+            the indices of the cards chosen
+        '''
+        vector = multiplicity_vector(inds_selection, self.deck, self.values)
+        for image in self.vector_orbit(vector):
+            choices = [combinations(group, m)
+                       for m, group in zip(image, self.index_groups)]
+            for parts in product(*choices):
+                yield tuple(sorted(ind for part in parts for ind in part))
+
+    def num_orbits(self, size):
+        '''Count the orbits of size-element index subsets.
+
+        Parameters
+        -----------
+        size: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        count = 0
+        for vector in bounded_vectors(self.caps, size):
+            if self.vector_orbit(vector)[0] == vector:
+                count += 1
+        return count
@@ -0,0 +1,117 @@
+"""Carry only the subsets lacking an upward-closed property
+from one layer to the next.
+
+A (k+1)-subset lacks the property exactly when all of its k-subsets
+lack it and it is not itself one of the basic (minimal) subsets with
+the property.  So the failures at each layer determine the failures at
+the next, and the count with the property is C(n, k) less the number of
+failures.  Near saturation the failures are few, and so is the work."""
+from itertools import combinations
+from math import comb
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+
+
+class FailureFrontier():
+    """
+    Track the subsets of a single layer without the property, as
+    bitmasks over item positions.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    start_layer: int (nonnegative)
+        The layer at which we begin; its failures are found by
+        enumerating the whole layer once.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, start_layer=0, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if start_layer < 0 or start_layer > self.n:
+            raise ValueError(f"No layer {start_layer} "
+                             + f"in a {self.n}-element set.")
+        self.status_updates = status_updates
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        self.solutions = set()
+        for valid in valids:
+            mask = 0
+            for item in valid:
+                mask |= 1 << position[item]
+            self.solutions.add(mask)
+        self.solution_sizes = sorted(set(s.bit_count()
+                                         for s in self.solutions))
+        self.current_layer = start_layer
+        self.frontier = set()
+        for combo in combinations(range(self.n), start_layer):
+            mask = 0
+            for j in combo:
+                mask |= 1 << j
+            if not self.contains_solution(mask):
+                self.frontier.add(mask)
+        if status_updates:
+            print(f"Starting at {start_layer}-element subsets "
+                  + f"with {len(self.frontier)} failures.")
+
+    def contains_solution(self, mask):
+        '''Report whether a subset contains one of the basic subsets,
+        checking whichever is fewer: the basic subsets, or the
+        sub-subsets of the right sizes.
+
+        Parameters
+        -----------
+        mask: int
+            The subset, as a bitmask over item positions.
+        '''
+        bits = [1 << j for j in range(self.n) if (mask >> j) & 1]
+        num_subsubsets = sum(comb(len(bits), s)
+                             for s in self.solution_sizes)
+        if len(self.solutions) <= num_subsubsets:
+            return any(sol & mask == sol for sol in self.solutions)
+        for s in self.solution_sizes:
+            for combo in combinations(bits, s):
+                if sum(combo) in self.solutions:
+                    return True
+        return False
+
+    def raise_layer_with_properties(self):
+        '''Assuming an upward-closed property,
+        increase the subset-size by one, keeping only the failures.
+        Each new subset is built once, from the failure missing its
+        last item.'''
+        if self.current_layer == self.n:
+            raise ValueError("No more layers to go!")
+        new_frontier = set()
+        for mask in self.frontier:
+            for i in range(mask.bit_length(), self.n):
+                bigger = mask | (1 << i)
+                if bigger in self.solutions:
+                    continue
+                rest = mask
+                while rest:
+                    low = rest & -rest
+                    if bigger ^ low not in self.frontier:
+                        break
+                    rest ^= low
+                else:
+                    new_frontier.add(bigger)
+        self.frontier = new_frontier
+        self.current_layer += 1
+        if self.status_updates:
+            print(f"We are now considering {self.current_layer}-element "
+                  + f"subsets, with {len(self.frontier)} failures.")
+
+    def count_property_at_current_layer(self):
+        '''Count the number of subsets in the current layer
+        with the desired upward-closed property.'''
+        our_denom = nC(self.n, self.current_layer)
+        our_num = int(our_denom) - len(self.frontier)
+        return (our_num, our_denom, Rational(our_num, our_denom))
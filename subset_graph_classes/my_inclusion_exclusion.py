@@ -0,0 +1,134 @@
+"""Count the first layers above the basic subsets exactly by
+inclusion-exclusion, truncated where the terms vanish.
+
+By inclusion-exclusion, the k-subsets containing a basic subset number
+the sum, over nonempty families F of basic subsets, of
+(-1)**(|F| + 1) * C(n - |U|, k - |U|), with U the union of F.  A family
+whose union has more than k items contributes nothing, so grouping the
+families by their union U leaves a sum over the unions of at most k items:
+g(U) * C(n - |U|, k - |U|), where g(U) is the alternating count of the
+families with union exactly U.  Since every family inside U sums to 1,
+g(U) = 1 - (sum of g(V) over the unions V strictly inside U).
+
+Just above the size s of the basic subsets, the unions are few: a basic
+subset can only join a union of u items if it meets it in at least
+s - (k - u) of them.  So the unions are grown one basic subset at a time
+through an overlap index, from each t-subset of the basic subsets
+(t = 2s - k) to the basic subsets holding it (in the spirit of
+OverlapsCounter in inextester.py)."""
+from itertools import combinations
+from math import comb
+
+
+def submasks_of_size(mask, sizes):
+    """Yield the submasks of a bitmask with the given numbers of bits.
+
+    Parameters:
+    -----------
+    mask: int
+        The bitmask.
+    sizes: Iterable[int]
+        The numbers of bits wanted.
+    """
+    bits = []
+    rest = mask
+    while rest:
+        low = rest & -rest
+        bits.append(low)
+        rest ^= low
+    for size in sizes:
+        for combo in combinations(bits, size):
+            yield sum(combo)
+
+
+class InclusionExclusionCounter():
+    """
+    Count, exactly, the subsets with an upward-closed property in the
+    layers from the smallest basic subset up to max_layer.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    max_layer: int (nonnegative)
+        The largest layer to count.  Less than twice the size of the
+        smallest basic subset keeps the overlap index selective.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, max_layer, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        solutions = set()
+        for valid in valids:
+            mask = 0
+            for item in valid:
+                mask |= 1 << position[item]
+            solutions.add(mask)
+        self.max_layer = min(max_layer, self.n)
+        # solutions too big for any counted layer never enter a union
+        self.solutions = sorted(s for s in solutions
+                                if s.bit_count() <= self.max_layer)
+        self.min_size = min((s.bit_count() for s in self.solutions),
+                            default=0)
+        self.unions = self._grow_unions()
+        if status_updates:
+            print(f"{len(self.unions)} unions of basic subsets "
+                  + f"with at most {self.max_layer} items.")
+        self.weights = self._union_weights()
+        self.layer_counts = [0 for j in range(self.max_layer + 1)]
+        for union, weight in self.weights.items():
+            u = union.bit_count()
+            for k in range(u, self.max_layer + 1):
+                self.layer_counts[k] += weight * comb(self.n - u, k - u)
+
+    def _grow_unions(self):
+        '''Return the set of unions of basic subsets with at most
+        max_layer items, adding one basic subset at a time.'''
+        k = self.max_layer
+        overlap = max(0, 2 * self.min_size - k)
+        index = {}
+        for solution in self.solutions:
+            for sub in submasks_of_size(solution, [overlap]):
+                index.setdefault(sub, []).append(solution)
+        unions = set(self.solutions)
+        pending = list(self.solutions)
+        while pending:
+            union = pending.pop()
+            size = union.bit_count()
+            if size == k:
+                continue
+            # a basic subset of s items joining a union of u items must
+            # share at least s - (k - u) >= overlap of them
+            seen = set()
+            for sub in submasks_of_size(union, [overlap]):
+                for solution in index.get(sub, ()):
+                    if solution in seen:
+                        continue
+                    seen.add(solution)
+                    bigger = union | solution
+                    if bigger != union and bigger.bit_count() <= k \
+                            and bigger not in unions:
+                        unions.add(bigger)
+                        pending.append(bigger)
+        return unions
+
+    def _union_weights(self):
+        '''Return the dict from each union U to g(U), the alternating
+        count of the families of basic subsets with union exactly U.'''
+        weights = {}
+        for union in sorted(self.unions, key=int.bit_count):
+            size = union.bit_count()
+            inside = 0
+            for sub in submasks_of_size(union,
+                                        range(self.min_size, size)):
+                inside += weights.get(sub, 0)
+            weights[union] = 1 - inside
+        return {union: w for union, w in weights.items() if w}
@@ -0,0 +1,284 @@
+"""Count the subsets lacking an upward-closed property
+through the independence polynomial of a hypergraph.
+
+A subset lacks the property exactly when it contains none of the
+given (basic) subsets, i.e., when it is an independent set of the
+hypergraph whose edges are those subsets.  The k-th coefficient of
+the independence polynomial counts the independent k-sets, so the
+number of k-sets with the property is C(n, k) minus that coefficient.
+
+Edges are kept as bitmasks over item positions, and minimal: no edge
+contains another, since the larger one could never be the first edge
+an independent set runs into."""
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+
+
+def poly_add(p, q):
+    """Add two polynomials given as coefficient lists.
+
+    Parameters:
+    -----------
+    p, q: list[int]
+        The coefficients, constant term first.
+    """
+    if len(p) < len(q):
+        p, q = q, p
+    output = list(p)
+    for k, c in enumerate(q):
+        output[k] += c
+    return output
+
+
+def poly_mul(p, q):
+    """Multiply two polynomials given as coefficient lists.
+
+    Parameters:
+    -----------
+    p, q: list[int]
+        The coefficients, constant term first.
+    """
+    output = [0 for j in range(len(p) + len(q) - 1)]
+    for j, a in enumerate(p):
+        if a:
+            for k, b in enumerate(q):
+                output[j + k] += a * b
+    return output
+
+
+def binomial_row(m):
+    """Return the coefficients of (1 + x)**m.
+
+    Parameters:
+    -----------
+    m: int (nonnegative)
+        The exponent.
+    """
+    output = [1]
+    for j in range(m):
+        output = poly_add(output, [0] + output)
+    return output
+
+
+def minimal_edges(edges):
+    """Drop every edge containing another edge.
+
+    Parameters:
+    -----------
+    edges: Iterable[int]
+        The edges, as bitmasks.
+    """
+    minimal = set()
+    for edge in sorted(set(edges), key=int.bit_count):
+        if not contains_any(edge, minimal):
+            minimal.add(edge)
+    return frozenset(minimal)
+
+
+def contains_any(edge, others):
+    """Report whether an edge contains any edge from a set of others,
+    testing whichever is fewer: the others, or the subsets of the edge.
+
+    Parameters:
+    -----------
+    edge: int
+        The edge, as a bitmask.
+    others: set[int]
+        The other edges, as bitmasks.
+    """
+    if len(others) < (1 << edge.bit_count()):
+        return any(sub & edge == sub for sub in others)
+    sub = edge
+    while sub:
+        if sub in others:
+            return True
+        sub = (sub - 1) & edge
+    return False
+
+
+def connected_components(edges):
+    """Split edges into groups covering disjoint sets of items.
+
+    Returns a list of (vertex_mask, edges) pairs.
+
+    Parameters:
+    -----------
+    edges: Iterable[int]
+        The edges, as bitmasks.
+    """
+    components = []
+    for edge in edges:
+        merged_mask = edge
+        merged_edges = [edge]
+        remaining = []
+        for comp_mask, comp_edges in components:
+            if comp_mask & edge:
+                merged_mask |= comp_mask
+                merged_edges.extend(comp_edges)
+            else:
+                remaining.append((comp_mask, comp_edges))
+        remaining.append((merged_mask, merged_edges))
+        components = remaining
+    return components
+
+
+def canonical_form(edges):
+    """Relabel the items of a hypergraph so that isomorphic residual
+    problems arising in different branches tend to share a cache key.
+
+    Items are renumbered by decreasing degree, then by the sorted sizes of
+    their edges, then by old position; the independence polynomial does
+    not depend on the labels, so any relabeling gives a valid key.
+
+    Parameters:
+    -----------
+    edges: Iterable[int]
+        The edges, as bitmasks.
+    """
+    profiles = {}
+    for edge in edges:
+        size = edge.bit_count()
+        rest = edge
+        while rest:
+            low = rest & -rest
+            profiles.setdefault(low.bit_length() - 1, []).append(size)
+            rest ^= low
+    ranking = sorted(profiles, key=lambda v: (-len(profiles[v]),
+                                              sorted(profiles[v]), v))
+    new_bit = {v: 1 << j for j, v in enumerate(ranking)}
+    output = []
+    for edge in edges:
+        new_edge = 0
+        rest = edge
+        while rest:
+            low = rest & -rest
+            new_edge |= new_bit[low.bit_length() - 1]
+            rest ^= low
+        output.append(new_edge)
+    return frozenset(output)
+
+
+class IndependencePolynomial():
+    """
+    Count, layer by layer, the subsets of a set containing at least one
+    of the given (basic) subsets, via the independence polynomial of the
+    hypergraph they form.
+
+    Branches on an item of highest degree (leave it out: drop its edges;
+    put it in: remove it from its edges), splits into connected components
+    whenever possible, and caches residual problems by canonical form.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the subsets
+        with the desired property.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        edges = []
+        for valid in valids:
+            edge = 0
+            for item in valid:
+                edge |= 1 << position[item]
+            edges.append(edge)
+        self.cache = {}
+        self.coefficients = self._solve((1 << self.n) - 1,
+                                        minimal_edges(edges))
+        if status_updates:
+            print("Independence polynomial done; "
+                  + f"{len(self.cache)} residual problems cached.")
+        self.coefficients += [0 for j in
+                              range(self.n + 1 - len(self.coefficients))]
+        self.layer_counts = [nC(self.n, k) - self.coefficients[k]
+                             for k in range(self.n + 1)]
+        self.layer_counts = [int(c) for c in self.layer_counts]
+
+    def _solve(self, vertex_mask, edges):
+        '''Independence polynomial on the given items,
+        for minimal edges inside them.'''
+        if 0 in edges:  # the empty set already has the property
+            return [0]
+        # an edge of one item bans that item outright
+        singles = 0
+        for edge in edges:
+            if edge & (edge - 1) == 0:
+                singles |= edge
+        if singles:
+            vertex_mask &= ~singles
+            edges = frozenset(e for e in edges if not e & singles)
+        covered = 0
+        for edge in edges:
+            covered |= edge
+        output = binomial_row((vertex_mask & ~covered).bit_count())
+        if edges:
+            output = poly_mul(output, self._solve_covered(edges))
+        return output
+
+    def _solve_covered(self, edges):
+        '''Independence polynomial on exactly the items the (minimal,
+        non-singleton) edges cover.'''
+        components = connected_components(edges)
+        if len(components) > 1:
+            output = [1]
+            for comp_mask, comp_edges in components:
+                output = poly_mul(output,
+                                  self._solve_covered(frozenset(comp_edges)))
+            return output
+        covered = components[0][0]
+        key = canonical_form(edges)
+        if key in self.cache:
+            return self.cache[key]
+        degree = {}
+        for edge in edges:
+            rest = edge
+            while rest:
+                low = rest & -rest
+                degree[low] = degree.get(low, 0) + 1
+                rest ^= low
+        bit = max(degree, key=lambda b: (degree[b], -b))
+        with_item = [e & ~bit for e in edges if e & bit]
+        without_item = [e for e in edges if not e & bit]
+        # leave the item out: its edges can no longer be completed
+        left_out = self._solve(covered & ~bit, frozenset(without_item))
+        # put the item in: what remains of its edges are new, minimal edges
+        # (by minimality of the old ones), and absorb any edge containing them
+        shrunk = frozenset(with_item)
+        kept = [f for f in without_item if not contains_any(f, shrunk)]
+        put_in = self._solve(covered & ~bit, frozenset(kept) | shrunk)
+        output = poly_add(left_out, [0] + put_in)
+        self.cache[key] = output
+        return output
+
+    def count_property_all_layers(self):
+        '''Count the subsets with the property in every layer at once.
+
+        Returns the list of (layer, num, denom, fraction) tuples.'''
+        output = []
+        for layer, our_num in enumerate(self.layer_counts):
+            our_denom = nC(self.n, layer)
+            output.append((layer, our_num, our_denom,
+                           Rational(our_num, our_denom)))
+        return output
+
+    def count_property_by_layer(self, layer):
+        '''Count the number of subsets in a given layer
+        with the desired upward-closed property.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        return self.count_property_all_layers()[layer][1:]
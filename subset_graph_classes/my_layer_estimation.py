@@ -0,0 +1,437 @@
+"""Estimate the share of k-subsets with an upward-closed property by
+sampling, for layers too large to count.
+
+Uniform random k-subsets are drawn in batches as bitmasks (so at most 64
+items), and each is tested against all basic subsets at once with NumPy.
+The share of hits comes with a Wilson score or Clopper-Pearson (exact)
+confidence interval, and sampling stops once the interval is narrow
+enough.  Batches are drawn in rounds of fixed size, each batch with its own
+seed spawned from one seed, so a run is reproducible however many
+processes share the work.
+
+Where the share is tiny (the first layers past the basic subsets), plain
+sampling needs too many samples for a useful relative error.  There the
+Karp-Luby-Madras estimator (chosen up front, from the union bound or a
+pilot batch) draws a basic subset with probability in
+proportion to its number of k-supersets, then one of those supersets
+uniformly, and averages the reciprocal of the number of basic subsets
+inside it: times the total number of supersets drawn from, that is the
+size of their union.  Sampling stops by the rule of Dagum, Karp, Luby
+and Ross, for a relative error epsilon with probability 1 - delta."""
+import concurrent.futures
+from math import comb, e, exp, log, lgamma, sqrt
+from statistics import NormalDist
+import numpy as np
+
+
+def wilson_interval(hits, trials, confidence=0.95):
+    """Return the Wilson score interval (low, high) for a proportion.
+
+    Parameters:
+    -----------
+    hits: int (nonnegative)
+        The number of successes.
+    trials: int (positive)
+        The number of samples.
+    confidence: float
+        The coverage wanted, strictly between 0 and 1.
+    """
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p_hat = hits / trials
+    denom = 1 + z * z / trials
+    center = (p_hat + z * z / (2 * trials)) / denom
+    half = z * sqrt(p_hat * (1 - p_hat) / trials
+                    + z * z / (4 * trials * trials)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _beta_fraction(a, b, x):
+    '''The continued fraction for the incomplete beta function
+    (modified Lentz's method).'''
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    output = d
+    for m in range(1, 10000):
+        for numer in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                      -(a + m) * (a + b + m) * x
+                      / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numer * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numer / c
+            c = c if abs(c) > tiny else tiny
+            output *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+    return output
+
+
+def regularized_beta(a, b, x):
+    """Return the regularized incomplete beta function I_x(a, b).
+
+    Parameters:
+    -----------
+    a, b: float (positive)
+        The shape parameters.
+    x: float
+        The point, between 0 and 1.
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = exp(lgamma(a + b) - lgamma(a) - lgamma(b)
+                + a * log(x) + b * log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1.0 - front * _beta_fraction(b, a, 1 - x) / b
+
+
+def clopper_pearson_interval(hits, trials, confidence=0.95):
+    """Return the Clopper-Pearson (exact) interval (low, high)
+    for a proportion, by bisection on the binomial tails.
+
+    Parameters:
+    -----------
+    hits: int (nonnegative)
+        The number of successes.
+    trials: int (positive)
+        The number of samples.
+    confidence: float
+        The coverage wanted, strictly between 0 and 1.
+    """
+    alpha = (1 - confidence) / 2
+
+    def solve(tail, target):
+        # tail(p) increases with p
+        low, high = 0.0, 1.0
+        for j in range(60):
+            mid = (low + high) / 2
+            if tail(mid) < target:
+                low = mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+    lower, upper = 0.0, 1.0
+    if hits > 0:  # P(X >= hits) = I_p(hits, trials - hits + 1)
+        lower = solve(lambda p: regularized_beta(hits, trials - hits + 1, p),
+                      alpha)
+    if hits < trials:  # P(X > hits) = I_p(hits + 1, trials - hits)
+        upper = solve(lambda p: regularized_beta(hits + 1, trials - hits, p),
+                      1 - alpha)
+    return lower, upper
+
+
+def count_sampled_hits(solutions, num_items, layer, num_samples, seed):
+    """Draw uniform random layer-subsets and count those containing
+    a basic subset.
+
+    Parameters:
+    -----------
+    solutions: numpy.ndarray
+        The basic subsets, as uint64 bitmasks.
+    num_items: int (at most 64)
+        The number of items.
+    layer: int (nonnegative)
+        The size of the subsets to draw.
+    num_samples: int (positive)
+        How many subsets to draw.
+    seed: numpy.random.SeedSequence or int
+        The seed for this batch.
+    """
+    rng = np.random.default_rng(seed)
+    bits = np.left_shift(np.uint64(1), np.arange(num_items, dtype=np.uint64))
+    hits = 0
+    # keep each comparison block to a few million entries
+    block = max(1, 4_000_000 // max(len(solutions), 1))
+    for start in range(0, num_samples, block):
+        size = min(block, num_samples - start)
+        picks = np.argsort(rng.random((size, num_items)), axis=1)[:, :layer]
+        masks = np.bitwise_or.reduce(bits[picks], axis=1) if layer \
+            else np.zeros(size, dtype=np.uint64)
+        missing = solutions[None, :] & ~masks[:, None]
+        hits += int(np.count_nonzero((missing == 0).any(axis=1)))
+    return hits
+
+
+def sample_coverage_reciprocals(solutions, probabilities, num_items, layer,
+                                num_samples, seed):
+    """Draw basic subsets with the given probabilities, then a uniform
+    layer-superset of each, and return the array of the reciprocals of
+    the numbers of basic subsets inside those supersets.
+
+    Parameters:
+    -----------
+    solutions: numpy.ndarray
+        The basic subsets, as uint64 bitmasks.
+    probabilities: numpy.ndarray
+        The chance of drawing each basic subset.
+    num_items: int (at most 64)
+        The number of items.
+    layer: int (nonnegative)
+        The size of the supersets to draw.
+    num_samples: int (positive)
+        How many supersets to draw.
+    seed: numpy.random.SeedSequence or int
+        The seed for this batch.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.arange(num_items, dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), positions)
+    output = np.empty(num_samples)
+    block = max(1, 4_000_000 // max(len(solutions), 1))
+    for start in range(0, num_samples, block):
+        size = min(block, num_samples - start)
+        bases = solutions[rng.choice(len(solutions), size=size,
+                                     p=probabilities)]
+        # the items of the basic subset sort first, the rest at random
+        keys = rng.random((size, num_items))
+        keys[((bases[:, None] >> positions) & np.uint64(1)) == 1] = -1.0
+        picks = np.argsort(keys, axis=1)[:, :layer]
+        masks = np.bitwise_or.reduce(bits[picks], axis=1)
+        missing = solutions[None, :] & ~masks[:, None]
+        output[start:start + size] = 1.0 / np.count_nonzero(missing == 0,
+                                                            axis=1)
+    return output
+
+
+class LayerEstimator():
+    """
+    Estimate, layer by layer, the share of subsets with an
+    upward-closed property, by sampling.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set (at most 64).
+        No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    seed: int or None
+        The seed for the whole run.
+    batch_size: int (positive)
+        The number of samples per batch.
+    batches_per_round: int (positive)
+        The number of batches drawn between checks of the interval
+        (shared out among processes when parallel).
+    """
+
+    def __init__(self, my_list, valids, seed=None, batch_size=10000,
+                 batches_per_round=8):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if self.n > 64:
+            raise ValueError("Sampling handles at most 64 items.")
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        masks = set()
+        for valid in valids:
+            mask = 0
+            for item in valid:
+                mask |= 1 << position[item]
+            masks.add(mask)
+        self.solutions = np.array(sorted(masks), dtype=np.uint64)
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.batch_size = batch_size
+        self.batches_per_round = batches_per_round
+
+    def estimate_layer(self, layer, target_width=0.01, max_samples=10**7,
+                       interval='wilson', confidence=0.95, parallel=False):
+        '''Sample the given layer until the confidence interval is no
+        wider than target_width (or max_samples are used).
+
+        Returns (hits, trials, estimate, low, high).
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        target_width: float (positive)
+            The widest interval we accept.
+        max_samples: int (positive)
+            The most samples to draw.
+        interval: str
+            'wilson' or 'clopper_pearson'.
+        confidence: float
+            The coverage wanted, strictly between 0 and 1.
+        parallel: bool
+            Whether to draw batches in separate processes.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        if interval == 'wilson':
+            interval_function = wilson_interval
+        elif interval == 'clopper_pearson':
+            interval_function = clopper_pearson_interval
+        else:
+            raise ValueError("Invalid interval.")
+        layer_seed = self._layer_seed(layer, 0)
+        hits, trials = 0, 0
+        executor = concurrent.futures.ProcessPoolExecutor() if parallel \
+            else None
+        try:
+            while trials < max_samples:
+                sizes = []
+                for j in range(self.batches_per_round):
+                    size = min(self.batch_size,
+                               max_samples - trials - sum(sizes))
+                    if size > 0:
+                        sizes.append(size)
+                seeds = layer_seed.spawn(len(sizes))
+                if parallel:
+                    results = executor.map(count_sampled_hits,
+                                           [self.solutions] * len(sizes),
+                                           [self.n] * len(sizes),
+                                           [layer] * len(sizes),
+                                           sizes, seeds)
+                else:
+                    results = map(count_sampled_hits,
+                                  [self.solutions] * len(sizes),
+                                  [self.n] * len(sizes),
+                                  [layer] * len(sizes), sizes, seeds)
+                hits += sum(results)
+                trials += sum(sizes)
+                low, high = interval_function(hits, trials, confidence)
+                if high - low <= target_width:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return hits, trials, hits / trials, low, high
+
+    def union_bound(self, layer):
+        '''Return the sum, over the basic subsets, of their shares of
+        supersets in the layer: a bound above the share with the property.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        total = sum(comb(self.n - int(s), layer - int(s))
+                    for s in np.bitwise_count(self.solutions) if s <= layer)
+        return total / comb(self.n, layer)
+
+    def prefers_karp_luby(self, layer, threshold, pilot_samples=None,
+                          confidence=0.95):
+        '''Decide, before the main sampling, whether the layer's share is
+        below threshold, so that karp_luby_layer should replace
+        estimate_layer: yes if the union bound is, else if the Wilson
+        interval of a pilot batch lies below it.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        threshold: float
+            The share below which Karp-Luby is preferred.
+        pilot_samples: int (positive) or None
+            The size of the pilot batch; None for one batch_size.
+        confidence: float
+            The coverage wanted, strictly between 0 and 1.
+        '''
+        if self.union_bound(layer) < threshold:
+            return True
+        pilot_samples = pilot_samples or self.batch_size
+        hits = count_sampled_hits(self.solutions, self.n, layer,
+                                  pilot_samples, self._layer_seed(layer, 2))
+        return wilson_interval(hits, pilot_samples, confidence)[1] \
+            < threshold
+
+    def karp_luby_layer(self, layer, epsilon=0.01, delta=0.05,
+                        max_samples=10**8, parallel=False):
+        '''Estimate the number of layer-subsets with the property to
+        within a factor 1 +/- epsilon, with probability 1 - delta.
+
+        Returns (count, samples, estimate, low, high): the estimated
+        number of subsets, the samples used, and the estimated share with
+        the interval it implies.  If max_samples run out first, the
+        guarantee is lost, and the interval is given as (0, 1).
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        epsilon: float (positive)
+            The relative error allowed.
+        delta: float
+            The chance of failure allowed, strictly between 0 and 1.
+        max_samples: int (positive)
+            The most samples to draw.
+        parallel: bool
+            Whether to draw batches in separate processes.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        denom = comb(self.n, layer)
+        sizes = np.bitwise_count(self.solutions)
+        weights = [comb(self.n - int(s), layer - int(s)) if s <= layer else 0
+                   for s in sizes]
+        total = sum(weights)
+        if total == 0:
+            return 0, 0, 0.0, 0.0, 0.0
+        probabilities = np.array([w / total for w in weights])
+        probabilities /= probabilities.sum()
+        # the stopping rule of Dagum, Karp, Luby and Ross
+        threshold = 1 + 4 * (e - 2) * (1 + epsilon) * log(2 / delta) \
+            / (epsilon * epsilon)
+        layer_seed = self._layer_seed(layer, 1)
+        running_sum, samples, stopped = 0.0, 0, False
+        executor = concurrent.futures.ProcessPoolExecutor() if parallel \
+            else None
+        try:
+            while samples < max_samples and not stopped:
+                batch_sizes = []
+                for j in range(self.batches_per_round):
+                    size = min(self.batch_size,
+                               max_samples - samples - sum(batch_sizes))
+                    if size > 0:
+                        batch_sizes.append(size)
+                seeds = layer_seed.spawn(len(batch_sizes))
+                args = ([self.solutions] * len(batch_sizes),
+                        [probabilities] * len(batch_sizes),
+                        [self.n] * len(batch_sizes),
+                        [layer] * len(batch_sizes), batch_sizes, seeds)
+                if parallel:
+                    results = executor.map(sample_coverage_reciprocals, *args)
+                else:
+                    results = map(sample_coverage_reciprocals, *args)
+                for values in results:  # in order, for reproducibility
+                    if stopped:
+                        continue
+                    partial = running_sum + np.cumsum(values)
+                    reached = np.flatnonzero(partial >= threshold)
+                    if len(reached):
+                        samples += int(reached[0]) + 1
+                        stopped = True
+                    else:
+                        samples += len(values)
+                        running_sum = float(partial[-1])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        if stopped:
+            mean = threshold / samples
+        else:
+            mean = running_sum / samples
+        count = total * mean
+        estimate = count / denom
+        if stopped:
+            low = estimate / (1 + epsilon)
+            high = min(1.0, estimate / (1 - epsilon))
+        else:
+            low, high = 0.0, 1.0
+        return count, samples, estimate, low, high
+
+    def _layer_seed(self, layer, method):
+        '''One seed per layer and method, so that any layer can be
+        redone on its own.'''
+        return np.random.SeedSequence(
+            self.seed_sequence.entropy,
+            spawn_key=self.seed_sequence.spawn_key + (layer, method)
+        )
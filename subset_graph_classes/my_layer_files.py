@@ -0,0 +1,297 @@
+"""Keep the layers of the subset graph in files rather than in memory,
+for sets whose layers outgrow RAM.
+
+Each layer is a memory-mapped file holding one bit per subset, at its
+colex rank, in the layout of my_shared_layers.  The current file is read
+front to back in fixed-size blocks of words, each subset with the property
+setting the bits of its supersets in the next file, so the reads stream
+through the file in order; the current file is deleted as soon as the next
+one is complete.  A layer is written under a temporary name and renamed once
+finished, so the one complete layer file left in the directory (with the
+counts of the layers before it) is also a snapshot: a run stopped at any
+point can resume from the last complete layer.  A fingerprint of the basic
+solutions and the start layer is kept beside the layers, and a run only
+resumes from layers with the same fingerprint."""
+import hashlib
+from math import comb
+import os
+from pathlib import Path
+import numpy as np
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+from my_combinatorial_ranking import binomial_table, rank_batch, \
+    unrank_batch
+from my_shared_layers import BATCH_SIZE, WORD_BITS, layer_words, \
+    mark_subsets
+
+CHUNK_WORDS = 2**20  # words popcounted at once
+STREAM_WORDS = BATCH_SIZE // WORD_BITS  # words of a layer read at once
+
+
+def stream_into(current, upcoming, num_terms, layer):
+    """Set the bits of the next layer's bitset for every superset of a
+    subset with the property in the current layer's, reading the current
+    one front to back in blocks of STREAM_WORDS words.
+
+    Parameters:
+    -----------
+    current: np.ndarray[uint64]
+        The packed bitset of the current layer.
+    upcoming: np.ndarray[uint64]
+        The packed bitset of the next layer, with any basic subsets of
+        that layer already marked.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    layer: int (nonnegative)
+        The current layer.
+    """
+    table = binomial_table(num_terms, layer + 1)
+    total = comb(num_terms, layer)
+    shifts = np.arange(WORD_BITS, dtype=np.uint64)
+    for low in range(0, current.size, STREAM_WORDS):
+        # one contiguous read of the file per block
+        block = np.array(current[low:low + STREAM_WORDS])
+        bits = ((block[:, np.newaxis] >> shifts) & np.uint64(1)).ravel()
+        ranks = np.flatnonzero(bits) + low * WORD_BITS
+        combos = unrank_batch(ranks[ranks < total], num_terms, layer, table)
+        for j in range(num_terms):
+            # the supersets with j added, among the subsets missing j
+            missing = combos[~(combos == j).any(axis=1)]
+            if not missing.shape[0]:
+                continue
+            supersets = np.sort(
+                np.hstack([missing, np.full((missing.shape[0], 1), j)]),
+                axis=1)
+            targets = np.unique(rank_batch(supersets, table)
+                                ).astype(np.uint64)
+            # combine the bits landing in the same word before writing
+            indices = (targets >> np.uint64(6)).astype(np.intp)
+            starts = np.flatnonzero(np.diff(indices, prepend=-1))
+            words = np.bitwise_or.reduceat(
+                np.uint64(1) << (targets & np.uint64(WORD_BITS - 1)), starts)
+            upcoming[indices[starts]] |= words
+
+
+def solutions_fingerprint(my_list, valids, start_layer):
+    """Return a hex digest identifying a run of BinSubsetGraphLayerFiles
+    by its items, basic solutions and start layer.
+
+    Parameters:
+    -----------
+    my_list: Iterable
+        The list constaining all items in your set.
+    valids: Iterable[tuple]
+        The basic subsets with the property.
+    start_layer: int (nonnegative)
+        The layer at which the run begins.
+    """
+    position = {item: j for j, item in enumerate(my_list)}
+    masks = sorted(sum(1 << position[item] for item in set(valid))
+                   for valid in valids)
+    digest = hashlib.sha256(
+        f'{len(position)};{start_layer};{masks}'.encode())
+    return digest.hexdigest()
+
+
+class BinSubsetGraphLayerFiles():
+    """
+    Keep one layer of the subset graph at a time, as a memory-mapped bit
+    file indexed by colex rank, deleting each layer once the next one is
+    written.  The same interface as BinSubsetGraphSparseAgain; call
+    close() when done to flush the current layer.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    start_layer: int (nonnegative)
+        The layer at which we begin studying the subset graph.
+        Cannot exceed len(my_list)
+    directory: str or Path
+        Where the layer files (and the counts of finished layers) go.
+    resume: bool
+        Pick up from the last complete layer file in directory, if any,
+        instead of starting over at start_layer.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    fingerprint: str or None
+        A solutions_fingerprint(...) of the run, kept beside the layers;
+        resume only picks up layers written with the same fingerprint.
+    """
+
+    def __init__(self, my_list, start_layer=0, directory='.', resume=False,
+                 status_updates=False, fingerprint=None):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if start_layer < 0 or start_layer > self.n:
+            raise ValueError(f"No layer {start_layer} "
+                             + f"in a {self.n}-element set.")
+        self.position = {item: j for j, item in enumerate(self.items)}
+        if len(self.position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.status_updates = status_updates
+        self.counts_path = self.directory / f'counts_{self.n}.txt'
+        self.fingerprint_path = self.directory / f'fingerprint_{self.n}.txt'
+        # layers left half-written by a stopped run are of no use
+        for layer in range(self.n + 1):
+            self.layer_path(layer, partial=True).unlink(missing_ok=True)
+        complete = []
+        if resume:
+            if self.recorded_fingerprint() == fingerprint:
+                complete = self.complete_layers()
+            elif status_updates:
+                print("Layer files are from another run; starting over.")
+        if complete:
+            # a run stopped between writing one layer and deleting the
+            # last leaves two complete files; the later one wins
+            for layer in complete[:-1]:
+                self.layer_path(layer).unlink()
+            self.current_layer = complete[-1]
+            self.words = self._open_layer(self.current_layer, 'r+')
+            if status_updates:
+                print(f"Resuming at layer {self.current_layer}.")
+        else:
+            for layer in self.complete_layers():
+                self.layer_path(layer).unlink()
+            self.counts_path.unlink(missing_ok=True)
+            self._record_fingerprint(fingerprint)
+            self.current_layer = start_layer
+            self.words = self._open_layer(start_layer, 'w+')
+
+    def layer_path(self, layer, partial=False):
+        '''Return the path of a layer's file.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            The layer.
+        partial: bool
+            Give the name used while the layer is still being written.
+        '''
+        suffix = '.partial' if partial else ''
+        return self.directory / f'layer_{self.n}_{layer}.bits{suffix}'
+
+    def complete_layers(self):
+        '''Return the sorted list of layers with complete files.'''
+        output = []
+        for layer in range(self.n + 1):
+            path = self.layer_path(layer)
+            if path.exists() and \
+                    path.stat().st_size == 8 * layer_words(self.n, layer):
+                output.append(layer)
+        return output
+
+    def recorded_fingerprint(self):
+        '''Return the fingerprint kept beside the layers, or None.'''
+        if not self.fingerprint_path.exists():
+            return None
+        return self.fingerprint_path.read_text().strip() or None
+
+    def _record_fingerprint(self, fingerprint):
+        '''Keep the fingerprint of a new run beside its layers.'''
+        if fingerprint is None:
+            self.fingerprint_path.unlink(missing_ok=True)
+        else:
+            self.fingerprint_path.write_text(f'{fingerprint}\n')
+
+    def recorded_counts(self):
+        '''Return the dict of the counts recorded for finished layers.'''
+        output = {}
+        if self.counts_path.exists():
+            with open(self.counts_path, 'r') as counts_reader:
+                for line in counts_reader:
+                    layer, our_num = line.split(',')
+                    output[int(layer)] = int(our_num)
+        return output
+
+    def _open_layer(self, layer, mode, partial=False):
+        '''Memory-map a layer's file ('w+' creates it zeroed).'''
+        return np.memmap(self.layer_path(layer, partial), dtype=np.uint64,
+                         mode=mode, shape=(layer_words(self.n, layer),))
+
+    def _record_count(self):
+        '''Append the current layer's count to the counts file.'''
+        with open(self.counts_path, 'a') as counts_printer:
+            print(f'{self.current_layer}, '
+                  + f'{self.count_property_at_current_layer()[0]}',
+                  file=counts_printer)
+
+    def count_property_at_current_layer(self):
+        '''Count the number of subsets in the current layer
+        with the desired upward-closed property.'''
+        our_denom = nC(self.n, self.current_layer)
+        our_num = 0
+        for low in range(0, self.words.size, CHUNK_WORDS):
+            our_num += int(np.bitwise_count(
+                self.words[low:low + CHUNK_WORDS]
+            ).sum())
+        return (our_num, our_denom, Rational(our_num, our_denom))
+
+    def fill_in_property_at_current_layer(self, valids):
+        '''Fill in the property with valid elements at the current layer.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            The iterable whose tuples list the members of the subsets
+            of the current cardinality with the desired property.
+        '''
+        mark_subsets(self.words, self.position, self.current_layer, valids)
+        self.words.flush()
+        return True
+
+    def raise_layer_with_properties(self, valids=()):
+        '''Assuming an upward-closed property,
+        increase the subset-size by one, filling in the property
+        as relevant, and delete the old layer's file.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            Any further (basic) subsets with the property in the new
+            layer, beyond the supersets of the current ones.
+        '''
+        if self.current_layer == self.n:
+            raise ValueError("No more layers to go!")
+        layer = self.current_layer
+        if layer not in self.recorded_counts():
+            self._record_count()
+        upcoming = self._open_layer(layer + 1, 'w+', partial=True)
+        mark_subsets(upcoming, self.position, layer + 1, valids)
+        stream_into(self.words, upcoming, self.n, layer)
+        upcoming.flush()
+        del upcoming
+        os.replace(self.layer_path(layer + 1, partial=True),
+                   self.layer_path(layer + 1))
+        del self.words
+        self.layer_path(layer).unlink()
+        self.current_layer += 1
+        self.words = self._open_layer(self.current_layer, 'r+')
+        if self.status_updates:
+            print(f"Wrote {self.layer_path(self.current_layer)}.")
+        print(f"We are now considering {self.current_layer}-element subsets.")
+
+    def clear_property_and_reset_layer(self, cur_layer):
+        '''Keep the set the same, but clear all data and restart anew.
+
+        Parameters
+        -------------
+        cur_layer: int (nonnegative)
+           The new starting cardinality for subsets to be considered.
+        '''
+        if cur_layer < 0 or cur_layer > self.n:
+            raise ValueError(f"No layer {cur_layer} "
+                             + f"in a {self.n}-element set.")
+        del self.words
+        self.layer_path(self.current_layer).unlink()
+        self.counts_path.unlink(missing_ok=True)
+        # the new data belongs to no known run
+        self._record_fingerprint(None)
+        self.current_layer = cur_layer
+        self.words = self._open_layer(cur_layer, 'w+')
+
+    def close(self):
+        '''Flush the current layer's file, keeping it as a snapshot.'''
+        self.words.flush()
@@ -0,0 +1,441 @@
+"""Predict the peak memory and rough running time of counting the layers
+of a subset graph, before a run starts, and record the actual peaks to
+calibrate the predictions.
+
+Each engine (and each enumerating strategy of the finishers) gets a model
+in terms of the number n of items, the layers first to last counted, and
+the number of basic solutions: its peak memory is dominated by a handful
+of arrays or per-subset objects of known size (2**n bits for the bitset,
+two layers of dicts for the sparse graphs, and so on), and its running
+time by a count of basic steps times a rate measured once on a 2024
+laptop.  Runs recorded with PeakMemoryRecorder rescale both by the median
+ratio of actual to predicted, method by method."""
+import csv
+from math import comb
+import os
+from pathlib import Path
+import sys
+import threading
+from time import sleep, time
+import tracemalloc
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+BATCH_SIZE = 2**16  # as in my_shared_layers
+WORKER_BYTES = 40 * 2**20  # a Python process with numpy loaded
+# runs smaller than these are mostly interpreter and numpy overhead, and
+# are left out of the calibration
+MIN_CALIBRATION_BYTES = 2**28
+MIN_CALIBRATION_SECONDS = 10.0
+
+ENGINES = ('BinSubsetGraph', 'BinSubsetGraphSparse',
+           'BinSubsetGraphSparseAgain', 'BinSubsetGraphBitset',
+           'BinSubsetGraphSolvingLayer', 'BinSubsetGraphSharedLayers',
+           'BinSubsetGraphLayerFiles')
+STRATEGIES = ('enumerate', 'orbits', 'revolving', 'frontier')
+# the engine behind each version of double_eq_finisher_alt
+VERSION_ENGINES = {
+    'Original': 'BinSubsetGraphSparse',
+    'Again': 'BinSubsetGraphSparseAgain',
+    'Bitset': 'BinSubsetGraphBitset',
+    'Compact': 'BinSubsetGraphSolvingLayer',
+    'Shared': 'BinSubsetGraphSharedLayers',
+    'Files': 'BinSubsetGraphLayerFiles'
+}
+# seconds per basic step of each model, measured without tracemalloc
+SECONDS_PER_STEP = {
+    'BinSubsetGraph': 5.3e-9,
+    'BinSubsetGraphSparse': 1.1e-6,
+    'BinSubsetGraphSparseAgain': 7.5e-7,
+    'BinSubsetGraphBitset': 5.3e-9,
+    'BinSubsetGraphSolvingLayer': 2.5e-7,
+    'BinSubsetGraphSharedLayers': 2e-7,
+    'BinSubsetGraphLayerFiles': 1.3e-7,
+    'enumerate': 1.7e-8,
+    'orbits': 1.7e-8,
+    'revolving': 6.5e-8,
+    'frontier': 1.5e-7
+}
+
+
+def _layer_sizes(num_terms, first_layer, last_layer):
+    '''The largest layer, and the largest pair of consecutive layers,
+    held while counting layers first_layer to last_layer.'''
+    layers = range(first_layer, last_layer + 1)
+    top = max(comb(num_terms, k) for k in layers)
+    pair = max([comb(num_terms, k) + comb(num_terms, k + 1)
+                for k in range(first_layer, last_layer)], default=top)
+    return top, pair
+
+
+def _batch_bytes(num_terms, first_layer, last_layer):
+    '''The temporaries of one batch of ranks, as in raise_into or
+    stream_into.'''
+    return max([56 * min(BATCH_SIZE, comb(num_terms, k + 1)) * (k + 1)
+                for k in range(first_layer, last_layer)], default=0)
+
+
+def estimate_run(method, num_terms, first_layer, last_layer, num_solutions,
+                 max_workers=None, calibration=None):
+    """Return the dict of the predicted peak memory ("peak_bytes", in this
+    process and its workers), disk space ("disk_bytes") and running time
+    ("seconds") of counting the layers first_layer to last_layer, along
+    with the model's own predictions before calibration ("model_bytes"
+    and "model_seconds").
+
+    Parameters:
+    -----------
+    method: str
+        An entry of ENGINES or STRATEGIES (or a key of VERSION_ENGINES).
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    first_layer: int (nonnegative)
+        The first layer counted, usually the size of the basic solutions.
+    last_layer: int
+        The last layer counted, at least first_layer.
+    num_solutions: int (nonnegative)
+        The number of basic solutions.
+    max_workers: int or None
+        The number of worker processes; None for one per CPU.
+    calibration: dict or None
+        A read_calibration(...), rescaling the predictions.
+    """
+    method = VERSION_ENGINES.get(method, method)
+    if method not in SECONDS_PER_STEP:
+        raise ValueError(f"No model for {method}.")
+    if first_layer < 0 or last_layer < first_layer \
+            or last_layer > num_terms:
+        raise ValueError(f"No layers {first_layer} to {last_layer} "
+                         + f"in a {num_terms}-element set.")
+    n = num_terms
+    workers = max_workers or os.cpu_count() or 1
+    top, pair = _layer_sizes(n, first_layer, last_layer)
+    counted = sum(comb(n, k) for k in range(first_layer, last_layer + 1))
+    raised = range(first_layer, last_layer)
+    # the basic solutions, as tuples of small ints
+    solutions = num_solutions * (64 + 8 * first_layer)
+    disk_bytes = 0
+    if method in ('BinSubsetGraph', 'BinSubsetGraphBitset'):
+        # the words, and the temporaries of closing and counting them
+        peak = 5 * 2**n // 8 + 8 * num_solutions + solutions
+        steps = n * 2**n // 64
+    elif method == 'BinSubsetGraphSparse':
+        peak = 8 * 2**n + 270 * pair + solutions
+        steps = sum(comb(n, k) * (n - k) for k in raised)
+    elif method == 'BinSubsetGraphSparseAgain':
+        peak = 8 * 2**n + 185 * pair + solutions
+        steps = sum(comb(n, k) * (n - k) for k in raised)
+    elif method == 'BinSubsetGraphSolvingLayer':
+        # at worst every subset of a layer solves
+        peak = 80 * top + solutions
+        steps = n * counted
+    elif method == 'BinSubsetGraphSharedLayers':
+        peak = pair // 8 + workers * (_batch_bytes(n, first_layer,
+                                                   last_layer)
+                                      + WORKER_BYTES) + solutions
+        steps = sum(comb(n, k + 1) * (k + 1) for k in raised) / workers
+    elif method == 'BinSubsetGraphLayerFiles':
+        peak = _batch_bytes(n, first_layer, last_layer) + solutions
+        disk_bytes = pair // 8
+        steps = sum(comb(n, k + 1) * (k + 1) for k in raised)
+    elif method in ('enumerate', 'orbits'):
+        # every worker gets its own copy of the basic solutions
+        peak = (workers + 1) * solutions + workers * WORKER_BYTES
+        steps = counted * num_solutions / workers
+    elif method == 'revolving':
+        peak = num_solutions * (216 + 16 * first_layer) + solutions
+        steps = counted * (1 + 2 * num_solutions * first_layer / max(n, 1))
+    else:  # 'frontier', at worst every subset of a layer fails
+        peak = 80 * pair + solutions
+        steps = sum(comb(n, k + 1) * (k + 1) for k in raised)
+    seconds = steps * SECONDS_PER_STEP[method]
+    memory_factor, time_factor = (calibration or {}).get(method, (1, 1))
+    return {
+        "method": method,
+        "peak_bytes": int(peak * memory_factor),
+        "disk_bytes": disk_bytes,
+        "seconds": seconds * time_factor,
+        "model_bytes": int(peak),
+        "model_seconds": seconds
+    }
+
+
+def plan_runs(num_terms, first_layer, last_layer, num_solutions,
+              methods=ENGINES + STRATEGIES, max_workers=None,
+              calibration=None):
+    """Return the estimate_run(...) of each method, leanest first.
+
+    Parameters:
+    -----------
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    first_layer: int (nonnegative)
+        The first layer counted.
+    last_layer: int
+        The last layer counted.
+    num_solutions: int (nonnegative)
+        The number of basic solutions.
+    methods: Iterable[str]
+        The methods to compare.
+    max_workers: int or None
+        The number of worker processes; None for one per CPU.
+    calibration: dict or None
+        A read_calibration(...), rescaling the predictions.
+    """
+    estimates = [estimate_run(method, num_terms, first_layer, last_layer,
+                              num_solutions, max_workers, calibration)
+                 for method in methods]
+    return sorted(estimates, key=lambda estimate: estimate["peak_bytes"])
+
+
+def default_memory_budget(fraction=0.8):
+    """Return the given fraction of the physical memory, in bytes, or None
+    where the system does not say.
+
+    Parameters:
+    -----------
+    fraction: float
+        The share of the memory a run may use.
+    """
+    try:
+        return int(fraction * PAGE_SIZE * os.sysconf('SC_PHYS_PAGES'))
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def choose_method(preferred, num_terms, first_layer, last_layer,
+                  num_solutions, budget=None, fallbacks=(), max_workers=None,
+                  calibration=None):
+    """Return the estimate_run(...) of the preferred method if its peak fits
+    in the budget, or else of the first fallback that fits; raise a
+    MemoryError, before anything is allocated, if none does.
+
+    Parameters:
+    -----------
+    preferred: str
+        The method asked for.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    first_layer: int (nonnegative)
+        The first layer counted.
+    last_layer: int
+        The last layer counted.
+    num_solutions: int (nonnegative)
+        The number of basic solutions.
+    budget: int or None
+        The memory allowed, in bytes; None for default_memory_budget().
+    fallbacks: Iterable[str]
+        The methods to try next, in order; empty to refuse outright.
+    max_workers: int or None
+        The number of worker processes; None for one per CPU.
+    calibration: dict or None
+        A read_calibration(...), rescaling the predictions.
+    """
+    if budget is None:
+        budget = default_memory_budget()
+    estimates = []
+    for method in (preferred,) + tuple(fallbacks):
+        estimate = estimate_run(method, num_terms, first_layer, last_layer,
+                                num_solutions, max_workers, calibration)
+        if budget is None or estimate["peak_bytes"] <= budget:
+            return estimate
+        estimates.append(estimate)
+    raise MemoryError(
+        f"Predicted peaks exceed the budget of {budget} bytes:\n"
+        + "\n".join(f'{estimate["method"]}: {estimate["peak_bytes"]}'
+                    for estimate in estimates)
+    )
+
+
+def current_rss():
+    '''Return the resident memory of this process in bytes, or None
+    where /proc is missing.'''
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+
+
+def peak_rss(children=False):
+    '''Return the peak resident memory in bytes of this process, or of
+    its finished worker processes, or None where the system does not
+    say.  Without the Unix-only resource module, the peak of this process
+    falls back to its current resident memory.
+
+    Parameters:
+    -----------
+    children: bool
+        Give the largest peak of the finished worker processes instead.
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None if children else current_rss()
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(who).ru_maxrss * scale
+
+
+class PeakMemoryRecorder():
+    """
+    Record the peak memory and the running time of a run, for calibrating
+    estimate_run: the resident memory of this process, sampled in a
+    background thread, the largest peak of its finished worker processes,
+    and (with trace) the peak of Python allocations from tracemalloc,
+    which slows pure-Python code down noticeably.  The worker peak is the
+    largest of any worker this process has waited for so far, not only
+    in this run.  Use as a context
+    manager, or call start() and stop().
+
+    Parameters
+    ------------
+    estimate: dict
+        The estimate_run(...) of the run, recorded beside the actuals.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    first_layer: int (nonnegative)
+        The first layer counted.
+    last_layer: int
+        The last layer counted.
+    num_solutions: int (nonnegative)
+        The number of basic solutions.
+    path: str or Path or None
+        The CSV file the record is appended to on stop(); None keeps it
+        in memory only.
+    trace: bool
+        Also track Python allocations with tracemalloc.
+    interval: float
+        The seconds between samples of the resident memory.
+    """
+
+    def __init__(self, estimate, num_terms, first_layer, last_layer,
+                 num_solutions, path=None, trace=False, interval=0.1):
+        self.estimate = estimate
+        self.run = (num_terms, first_layer, last_layer, num_solutions)
+        self.path = None if path is None else Path(path)
+        self.trace = trace
+        self.interval = interval
+        self.rss_start = 0
+        self.rss_peak = 0
+        self.record = None
+        self._running = False
+        self._sampler = None
+
+    def _sample(self):
+        '''Keep the largest resident memory seen until stopped.'''
+        while self._running:
+            self.rss_peak = max(self.rss_peak, current_rss() or 0)
+            sleep(self.interval)
+
+    def start(self):
+        '''Start the clock and the sampling.'''
+        self.rss_start = current_rss() or 0
+        self.rss_peak = self.rss_start
+        if self.trace:
+            tracemalloc.start()
+        self._running = True
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self.start_time = time()
+
+    def stop(self):
+        '''Stop, and return (and append to path) the dict of the record.'''
+        seconds = time() - self.start_time
+        self._running = False
+        self._sampler.join()
+        traced_peak = 0
+        if self.trace:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        own_peak = peak_rss()
+        worker_peak = peak_rss(children=True) or 0
+        if current_rss() is None and own_peak is not None:
+            self.rss_start, self.rss_peak = 0, own_peak
+        num_terms, first_layer, last_layer, num_solutions = self.run
+        self.record = {
+            "method": self.estimate["method"],
+            "num_terms": num_terms,
+            "first_layer": first_layer,
+            "last_layer": last_layer,
+            "num_solutions": num_solutions,
+            # uncalibrated, so that factors don't compound across runs
+            "predicted_bytes": self.estimate["model_bytes"],
+            "rss_start": self.rss_start,
+            "rss_peak": self.rss_peak,
+            "worker_rss_peak": worker_peak,
+            "traced_peak": traced_peak,
+            "predicted_seconds": self.estimate["model_seconds"],
+            "seconds": seconds
+        }
+        if self.path is not None:
+            is_new = not self.path.exists()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', newline='') as record_printer:
+                writer = csv.DictWriter(record_printer,
+                                        fieldnames=list(self.record))
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(self.record)
+        return self.record
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+def read_calibration(path):
+    """Return the dict taking each recorded method to its memory and time
+    factors: the medians of actual over predicted in the records at path.
+    The actual memory is the growth of the resident memory (or the traced
+    peak, if larger) plus the peak of the largest worker.  Runs whose
+    actual and predicted memory (or time) are both below
+    MIN_CALIBRATION_BYTES (or MIN_CALIBRATION_SECONDS) are skipped for
+    that factor, which stays 1 without other runs.  Empty if there is no
+    such file.
+
+    Parameters:
+    -----------
+    path: str or Path
+        The CSV file written by PeakMemoryRecorder.
+    """
+    ratios = {}
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, 'r', newline='') as record_reader:
+        for row in csv.DictReader(record_reader):
+            predicted_bytes = int(row["predicted_bytes"])
+            predicted_seconds = float(row["predicted_seconds"])
+            if predicted_bytes <= 0 or predicted_seconds <= 0:
+                continue
+            actual_bytes = max(int(row["rss_peak"]) - int(row["rss_start"]),
+                               int(row["traced_peak"])) \
+                + int(row["worker_rss_peak"])
+            actual_seconds = float(row["seconds"])
+            memory_ratios, time_ratios = ratios.setdefault(row["method"],
+                                                           ([], []))
+            if max(actual_bytes, predicted_bytes) >= MIN_CALIBRATION_BYTES:
+                memory_ratios.append(actual_bytes / predicted_bytes)
+            if max(actual_seconds,
+                   predicted_seconds) >= MIN_CALIBRATION_SECONDS:
+                time_ratios.append(actual_seconds / predicted_seconds)
+    output = {}
+    for method, (memory_ratios, time_ratios) in ratios.items():
+        if memory_ratios or time_ratios:
+            output[method] = (_median(memory_ratios or [1]),
+                              _median(time_ratios or [1]))
+    return output
+
+
+def _median(values):
+    '''The median of a nonempty list.'''
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
@@ -0,0 +1,146 @@
+"""Count subsets of a deck with repeated values by their
+value-multiplicity vectors.
+
+When the property only depends on the values drawn (as for sums of
+cards), every subset of indices is equivalent to its vector of value
+multiplicities m, with 0 <= m[v] <= c[v] for c[v] the copies of value v.
+There are prod(c[v] + 1) such vectors (3**13 for two like suits, against
+2**26 subsets), and the vector m stands for prod(C(c[v], m[v])) subsets."""
+import numpy as np
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+
+MAX_CLASSES = 10**9  # the largest grid of vectors built by default
+
+
+def value_classes(deck):
+    """Group the indices of a deck by value.
+
+    Returns (values, index_groups): the distinct values in increasing
+    order, and for each the tuple of indices holding it.
+
+    Parameters:
+    -----------
+    deck: Iterable
+        The values of the cards, repeats allowed.
+    """
+    groups = {}
+    for ind, value in enumerate(deck):
+        groups.setdefault(value, []).append(ind)
+    values = tuple(sorted(groups))
+    return values, tuple(tuple(groups[v]) for v in values)
+
+
+def multiplicity_classes(deck):
+    """Return the number of value-multiplicity vectors of a deck, the
+    size of the grid MultiplicityLayerCounter builds.
+
+    Parameters:
+    -----------
+    deck: Iterable
+        The values of the cards, repeats allowed.
+    """
+    output = 1
+    for group in value_classes(deck)[1]:
+        output *= len(group) + 1
+    return output
+
+
+def multiplicity_vector(inds_selection, deck, values):
+    """Return the value-multiplicity vector of a selection of indices.
+
+    Parameters:
+    -----------
+    inds_selection: Iterable[int]
+        the indices of the cards chosen
+    deck: Iterable
+        The values of the cards, repeats allowed.
+    values: tuple
+        The distinct values, as from value_classes.
+    """
+    position = {value: j for j, value in enumerate(values)}
+    output = [0 for j in values]
+    for ind in inds_selection:
+        output[position[deck[ind]]] += 1
+    return tuple(output)
+
+
+class MultiplicityLayerCounter():
+    """
+    Count the index subsets of a deck with an upward-closed property
+    depending only on values, through the grid of multiplicity vectors.
+
+    Marks the vectors of the basic solutions, closes the grid upward
+    one value (axis) at a time, then weights each vector by its number of
+    index subsets.  The grid takes one byte per vector, and the weighting
+    eight more at its peak; decks with more than max_classes vectors are
+    refused with a ValueError (three suits would need 3**13 * 2**13
+    vectors, for instance), so check multiplicity_classes first.
+
+    Parameters
+    ------------
+    my_deck: Iterable
+        The values of the cards, repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the indices (into my_deck) of the
+        subsets with the desired property.
+    max_classes: int (positive)
+        The largest grid we agree to build.
+    """
+
+    def __init__(self, my_deck, valids, max_classes=MAX_CLASSES):
+        self.deck = tuple(my_deck)
+        self.n = len(self.deck)
+        self.values, index_groups = value_classes(self.deck)
+        self.caps = tuple(len(group) for group in index_groups)
+        self.num_classes = multiplicity_classes(self.deck)
+        if self.num_classes > max_classes:
+            raise ValueError(
+                f"{self.num_classes} multiplicity vectors exceed the "
+                + f"limit of {max_classes}."
+            )
+        self.vectors = set(multiplicity_vector(valid, self.deck, self.values)
+                           for valid in valids)
+        grid = np.zeros(tuple(c + 1 for c in self.caps), dtype=bool)
+        for vector in self.vectors:
+            grid[vector] = True
+        for axis in range(len(self.caps)):
+            np.logical_or.accumulate(grid, axis=axis, out=grid)
+        self.layer_counts = self._weighted_counts(grid)
+
+    def _weighted_counts(self, grid):
+        '''Sum the weights of the marked vectors by total size, folding
+        the grid one value (axis) at a time into a polynomial in the size.'''
+        folded = grid.reshape(grid.shape + (1,))
+        for c in reversed(self.caps):
+            blocks = folded.reshape(-1, c + 1, folded.shape[-1])
+            degree = blocks.shape[-1]
+            poly = np.zeros((blocks.shape[0], degree + c), dtype=np.int64)
+            for m in range(c + 1):
+                poly[:, m:m + degree] += blocks[:, m, :] * int(nC(c, m))
+            folded = poly
+        return [int(x) for x in folded.reshape(-1)]
+
+    def count_property_all_layers(self):
+        '''Count the subsets with the property in every layer at once.
+
+        Returns the list of (layer, num, denom, fraction) tuples.'''
+        output = []
+        for layer, our_num in enumerate(self.layer_counts):
+            our_denom = nC(self.n, layer)
+            output.append((layer, our_num, our_denom,
+                           Rational(our_num, our_denom)))
+        return output
+
+    def count_property_by_layer(self, layer):
+        '''Count the number of subsets in a given layer
+        with the desired upward-closed property.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        return self.count_property_all_layers()[layer][1:]
@@ -0,0 +1,168 @@
+"""Count the subsets with an upward-closed property in a layer by walking
+its combinations in revolving-door order.
+
+In revolving-door order (Knuth, Algorithm 7.2.1.3R) each combination
+differs from the one before by a single swap: one item out, one item in.
+So rather than check every combination against every basic subset from
+scratch, we keep, for each basic subset, how many of its items are
+missing from the current combination, along with how many basic subsets
+have none missing.  A swap only touches the basic subsets through the two
+items swapped, and the combination has the property exactly when that
+last tally is nonzero."""
+from math import comb
+
+
+def revolving_door_swaps(n, k):
+    """Yield the first k-subset of range(n) in revolving-door order, as a
+    tuple, then the (item out, item in) swap leading to each next one.
+
+    Parameters:
+    -----------
+    n: int (nonnegative)
+        The number of items.
+    k: int (nonnegative)
+        The size of the subsets.
+    """
+    if k < 0 or k > n:
+        return
+    yield tuple(range(k))
+    if k == 0 or k == n:
+        return
+    if k == 1:
+        for j in range(1, n):
+            yield (j - 1, j)
+        return
+    # c[1..k] as in Algorithm R, with the sentinel c[k + 1] = n
+    c = [None] + [j for j in range(k)] + [n]
+    while True:
+        if k % 2:
+            if c[1] + 1 < c[2]:
+                c[1] += 1
+                yield (c[1] - 1, c[1])
+                continue
+            j = 2
+            step = 'decrease'
+        else:
+            if c[1] > 0:
+                c[1] -= 1
+                yield (c[1] + 1, c[1])
+                continue
+            j = 2
+            step = 'increase'
+        while j <= k:
+            if step == 'decrease':
+                if c[j] >= j:
+                    out = c[j]
+                    c[j] = c[j - 1]
+                    c[j - 1] = j - 2
+                    yield (out, j - 2)
+                    break
+                j += 1
+                step = 'increase'
+            else:
+                if c[j] + 1 < c[j + 1]:
+                    out = c[j - 1]
+                    c[j - 1] = c[j]
+                    c[j] += 1
+                    yield (out, c[j])
+                    break
+                j += 1
+                step = 'decrease'
+        else:
+            return
+
+
+class RevolvingDoorCounter():
+    """
+    Count the subsets with an upward-closed property, layer by layer,
+    updating per-basic-subset tallies of missing items along a
+    revolving-door walk of each layer.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        solutions = set()
+        for valid in valids:
+            solutions.add(frozenset(position[item] for item in valid))
+        self.solutions = tuple(solutions)
+        self.sizes = tuple(len(solution) for solution in self.solutions)
+        # touching[j] lists the basic subsets through item j
+        self.touching = [[] for j in range(self.n)]
+        for s, solution in enumerate(self.solutions):
+            for j in solution:
+                self.touching[j].append(s)
+        self.status_updates = status_updates
+
+    def count_layer(self, cardinality):
+        '''Return the number of subsets of the given size with the
+        property.
+
+        Parameters
+        -----------
+        cardinality: int (nonnegative)
+            The size of subsets to consider
+        '''
+        touching = self.touching
+        swaps = revolving_door_swaps(self.n, cardinality)
+        first = next(swaps, None)
+        if first is None:
+            return 0
+        missing = list(self.sizes)
+        for j in first:
+            for s in touching[j]:
+                missing[s] -= 1
+        num_solved = missing.count(0)
+        count = 1 if num_solved else 0
+        group_size = max(comb(self.n, cardinality) // 50, 1000)
+        done = 1
+        for out, into in swaps:
+            for s in touching[out]:
+                if not missing[s]:
+                    num_solved -= 1
+                missing[s] += 1
+            for s in touching[into]:
+                missing[s] -= 1
+                if not missing[s]:
+                    num_solved += 1
+            if num_solved:
+                count += 1
+            if self.status_updates:
+                done += 1
+                if done % group_size == 0:
+                    print(f"Completed {done // group_size} groups "
+                          + f"of size {group_size}")
+        return count
+
+    def layer_counts(self):
+        '''Return the list whose k-th entry is the number of k-subsets
+        with the property.'''
+        return [self.count_layer(k) for k in range(self.n + 1)]
+
+
+def revolving_door_layer_counts(my_list, valids):
+    """Count the subsets with an upward-closed property in every layer,
+    along revolving-door walks (a drop-in for enumeration_layer_counts).
+
+    Parameters:
+    -----------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    """
+    return RevolvingDoorCounter(my_list, valids).layer_counts()
@@ -0,0 +1,90 @@
+"""Find the size of the largest subset lacking an upward-closed property,
+before counting anything.
+
+The subsets lacking the property are the independent sets of the
+hypergraph whose edges are the basic subsets with it.  Past the size of
+the largest independent set, every subset has the property, so those
+layers need no counting at all.  We search by branch and bound: take an
+item or leave it out, where taking it shrinks the edges through it (an
+edge shrunk to one item bans that item), and abandon any branch that
+cannot beat the best set found so far even by taking every item left."""
+
+
+class SaturationSearch():
+    """
+    Find a largest subset containing none of the given (basic) subsets.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        position = {item: j for j, item in enumerate(self.items)}
+        if len(position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        edges = set()
+        for valid in valids:
+            edge = 0
+            for item in valid:
+                edge |= 1 << position[item]
+            edges.add(edge)
+        self.best_mask = 0
+        self.best_size = -1  # no subset at all lacks the property
+        self.num_branches = 0
+        if 0 not in edges:
+            self._search(0, (1 << self.n) - 1, frozenset(edges))
+        self.largest_failure = tuple(self.items[j] for j in range(self.n)
+                                     if (self.best_mask >> j) & 1)
+        # every layer from here on has the property throughout
+        self.saturation_layer = self.best_size + 1
+        if status_updates:
+            print(f"Largest subset without the property has {self.best_size}"
+                  + f" items ({self.num_branches} branches searched).")
+
+    def _search(self, chosen, free, edges):
+        '''Extend the chosen items (none of the edges inside them) by
+        items from free; edges are the basic subsets less chosen items,
+        lying inside chosen | free.'''
+        self.num_branches += 1
+        # one-item edges ban their items
+        banned = 0
+        for edge in edges:
+            if edge & (edge - 1) == 0:
+                banned |= edge
+        if banned:
+            free &= ~banned
+            edges = [edge for edge in edges if not edge & banned]
+        # items in no edge can always be taken
+        covered = 0
+        for edge in edges:
+            covered |= edge
+        chosen |= free & ~covered
+        free &= covered
+        size = chosen.bit_count()
+        if size + free.bit_count() <= self.best_size:
+            return
+        if not free:
+            self.best_size, self.best_mask = size, chosen
+            return
+        degree = {}
+        for edge in edges:
+            rest = edge
+            while rest:
+                low = rest & -rest
+                degree[low] = degree.get(low, 0) + 1
+                rest ^= low
+        bit = max(degree, key=lambda b: (degree[b], -b))
+        # take the item first, as big sets are what we are after
+        self._search(chosen | bit, free & ~bit,
+                     frozenset(edge & ~bit for edge in edges))
+        self._search(chosen, free & ~bit,
+                     frozenset(edge for edge in edges if not edge & bit))
@@ -0,0 +1,312 @@
+"""Raise the layers of the subset graph in parallel, with the property of
+each layer kept as a packed bitset in shared memory.
+
+Layer k is stored as one bit per k-subset, at its colex rank (see
+my_combinatorial_ranking), so a 26-element set needs at most C(26, 13)
+bits, about 1.3 MB, per layer.  A (k+1)-subset has the property exactly
+when one of its k-subsets does (or it is a basic subset itself), so each
+worker takes a word-aligned range of ranks in the next layer, unranks it
+with NumPy, looks up the ranks of the children in the current layer and
+writes its own words of the next one.  Only the names of the shared
+blocks and the rank ranges pass between processes."""
+import concurrent.futures
+from math import comb
+import os
+from multiprocessing import shared_memory
+import numpy as np
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+from my_combinatorial_ranking import binomial_table, rank_combination, \
+    unrank_range_batch
+
+WORD_BITS = 64
+BATCH_SIZE = 2**16  # ranks unranked at once by a worker; a multiple of 64
+
+
+def layer_words(num_terms, layer):
+    """Return the number of 64-bit words holding one bit per subset of a
+    layer.
+
+    Parameters:
+    -----------
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    layer: int (nonnegative)
+        the cardinality of the subsets
+    """
+    return max(-(-comb(num_terms, layer) // WORD_BITS), 1)
+
+
+def child_ranks(combos, table):
+    """Return, for each row of sorted (k+1)-subsets, the colex ranks of
+    its k-subsets, the one without the p-th member in column p.
+
+    Parameters:
+    -----------
+    combos: np.ndarray[int64]
+        The subsets, one sorted row each.
+    table: np.ndarray
+        A binomial_table(n, k + 1).
+    """
+    size = combos.shape[1]
+    positions = np.arange(size)
+    # member i counts C(c_i, i + 1) before the removed one, C(c_i, i) after
+    before = table[combos, positions + 1]
+    after = table[combos, positions]
+    zeros = np.zeros((combos.shape[0], 1), dtype=np.int64)
+    prefix = np.cumsum(np.hstack([zeros, before]), axis=1)[:, :size]
+    suffix = np.cumsum(np.hstack([after, zeros])[:, ::-1],
+                       axis=1)[:, ::-1][:, 1:]
+    return prefix + suffix
+
+
+def read_bits(words, ranks):
+    """Return the bits of a packed bitset at the given ranks, as a bool
+    array of the same shape.
+
+    Parameters:
+    -----------
+    words: np.ndarray[uint64]
+        The packed bitset.
+    ranks: np.ndarray[int64]
+        The positions to read.
+    """
+    ranks = ranks.astype(np.uint64)
+    gathered = words[(ranks >> np.uint64(6)).astype(np.intp)]
+    return ((gathered >> (ranks & np.uint64(WORD_BITS - 1)))
+            & np.uint64(1)).astype(bool)
+
+
+def pack_bits(bits):
+    """Return the uint64 words packing a bool array, bit j of the array
+    at bit j % 64 of word j // 64.
+
+    Parameters:
+    -----------
+    bits: np.ndarray[bool]
+        The bits.
+    """
+    padded = np.zeros(-(-bits.size // WORD_BITS) * WORD_BITS, dtype=np.uint64)
+    padded[:bits.size] = bits
+    shifts = np.arange(WORD_BITS, dtype=np.uint64)
+    return (padded.reshape(-1, WORD_BITS) << shifts).sum(axis=1,
+                                                         dtype=np.uint64)
+
+
+def mark_subsets(words, position, layer, valids):
+    """Set the bits of the given subsets in a layer's packed bitset.
+
+    Parameters:
+    -----------
+    words: np.ndarray[uint64]
+        The packed bitset of the layer, by colex rank.
+    position: dict
+        The position of each item in your set.
+    layer: int (nonnegative)
+        The layer of the bitset.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the subsets
+        to mark, each of size layer.
+    """
+    for valid in valids:
+        combo = [position[item] for item in valid]
+        if len(set(combo)) != layer:
+            raise ValueError(f"Entry {valid} is not in layer {layer}!")
+        rank = rank_combination(combo)
+        words[rank // WORD_BITS] |= np.uint64(1 << (rank % WORD_BITS))
+
+
+def raise_into(current, upcoming, num_terms, layer, start, stop):
+    """Fill in a range of ranks of the next layer's bitset from the
+    current layer's, batch by batch; return the number of those ranks
+    with the property.
+
+    Parameters:
+    -----------
+    current: np.ndarray[uint64]
+        The packed bitset of the current layer.
+    upcoming: np.ndarray[uint64]
+        The packed bitset of the next layer, with any basic subsets of
+        that layer already marked.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    layer: int (nonnegative)
+        The current layer.
+    start: int (a multiple of 64)
+        The first rank to fill in.
+    stop: int
+        The rank past the last one.
+    """
+    table = binomial_table(num_terms, layer + 1)
+    count = 0
+    for low in range(start, stop, BATCH_SIZE):
+        high = min(low + BATCH_SIZE, stop)
+        combos = unrank_range_batch(low, high, num_terms, layer + 1, table)
+        bits = read_bits(current, child_ranks(combos, table)).any(axis=1)
+        # keep basic subsets already marked in the next layer
+        bits |= read_bits(upcoming, np.arange(low, high, dtype=np.int64))
+        words = pack_bits(bits)
+        upcoming[low // WORD_BITS:low // WORD_BITS + words.size] = words
+        count += int(bits.sum())
+    return count
+
+
+def raise_rank_range(task):
+    """Fill in a range of ranks of the next layer from the current one,
+    both in shared memory; return the number of those ranks with the
+    property.
+
+    Parameters:
+    -----------
+    task: tuple
+        The names of the shared blocks of the current and next layers,
+        the number of items, the current layer, and the (word-aligned)
+        start and stop ranks in the next layer.
+    """
+    current_name, next_name, num_terms, layer, start, stop = task
+    current_block = shared_memory.SharedMemory(name=current_name)
+    next_block = shared_memory.SharedMemory(name=next_name)
+    try:
+        current = np.ndarray((layer_words(num_terms, layer),),
+                             dtype=np.uint64, buffer=current_block.buf)
+        upcoming = np.ndarray((layer_words(num_terms, layer + 1),),
+                              dtype=np.uint64, buffer=next_block.buf)
+        count = raise_into(current, upcoming, num_terms, layer, start, stop)
+        del current, upcoming
+        return count
+    finally:
+        current_block.close()
+        next_block.close()
+
+
+class BinSubsetGraphSharedLayers():
+    """
+    Keep one layer of the subset graph at a time, as a packed bitset in
+    shared memory indexed by colex rank, and raise it with several
+    processes at once.  The same interface as BinSubsetGraphSparseAgain;
+    call close() when done to free the shared memory.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    start_layer: int (nonnegative)
+        The layer at which we begin studying the subset graph.
+        Cannot exceed len(my_list)
+    status_updates: bool
+        Determine whether standard output gives status updates
+    max_workers: int or None
+        The number of processes raising a layer; None for one per CPU.
+    """
+
+    def __init__(self, my_list, start_layer=0, status_updates=False,
+                 max_workers=None):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if start_layer < 0 or start_layer > self.n:
+            raise ValueError(f"No layer {start_layer} "
+                             + f"in a {self.n}-element set.")
+        self.position = {item: j for j, item in enumerate(self.items)}
+        if len(self.position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        self.status_updates = status_updates
+        self.max_workers = max_workers
+        self.current_layer = start_layer
+        self.block, self.words = self._new_layer(start_layer)
+        self.num_solving = 0
+
+    def _new_layer(self, layer):
+        '''Return a zeroed shared block for a layer, and its words.'''
+        num_words = layer_words(self.n, layer)
+        block = shared_memory.SharedMemory(create=True,
+                                           size=num_words * 8)
+        words = np.ndarray((num_words,), dtype=np.uint64, buffer=block.buf)
+        words[:] = 0
+        return block, words
+
+    def count_property_at_current_layer(self):
+        '''Count the number of subsets in the current layer
+        with the desired upward-closed property.'''
+        our_denom = nC(self.n, self.current_layer)
+        our_num = int(np.bitwise_count(self.words).sum())
+        return (our_num, our_denom, Rational(our_num, our_denom))
+
+    def fill_in_property_at_current_layer(self, valids):
+        '''Fill in the property with valid elements at the current layer.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            The iterable whose tuples list the members of the subsets
+            of the current cardinality with the desired property.
+        '''
+        mark_subsets(self.words, self.position, self.current_layer, valids)
+        return True
+
+    def raise_layer_with_properties(self, valids=()):
+        '''Assuming an upward-closed property,
+        increase the subset-size by one, filling in the property
+        as relevant, in parallel.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            Any further (basic) subsets with the property in the new
+            layer, beyond the supersets of the current ones.
+        '''
+        if self.current_layer == self.n:
+            raise ValueError("No more layers to go!")
+        layer = self.current_layer
+        next_block, next_words = self._new_layer(layer + 1)
+        try:
+            mark_subsets(next_words, self.position, layer + 1, valids)
+            total = comb(self.n, layer + 1)
+            # word-aligned ranges, a few per worker to even out the load
+            num_ranges = 4 * (self.max_workers or os.cpu_count() or 1)
+            step = -(-total // (num_ranges * WORD_BITS)) * WORD_BITS
+            tasks = [(self.block.name, next_block.name, self.n, layer,
+                      start, min(start + step, total))
+                     for start in range(0, total, step)]
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers
+            ) as executor:
+                num_solving = sum(executor.map(raise_rank_range, tasks))
+        except BaseException:
+            # don't leave the new layer's shared memory behind
+            next_words = None
+            next_block.close()
+            next_block.unlink()
+            raise
+        self.num_solving = num_solving
+        del self.words
+        self.block.close()
+        self.block.unlink()
+        self.block, self.words = next_block, next_words
+        self.current_layer += 1
+        if self.status_updates:
+            print(f"{self.num_solving} solving subsets "
+                  + f"of size {self.current_layer}.")
+        print(f"We are now considering {self.current_layer}-element subsets.")
+
+    def clear_property_and_reset_layer(self, cur_layer):
+        '''Keep the set the same, but clear all data and restart anew.
+
+        Parameters
+        -------------
+        cur_layer: int (nonnegative)
+           The new starting cardinality for subsets to be considered.
+        '''
+        if cur_layer < 0 or cur_layer > self.n:
+            raise ValueError(f"No layer {cur_layer} "
+                             + f"in a {self.n}-element set.")
+        self.close()
+        self.current_layer = cur_layer
+        self.block, self.words = self._new_layer(cur_layer)
+
+    def close(self):
+        '''Free the shared memory of the current layer.'''
+        if self.block is not None:
+            del self.words
+            self.block.close()
+            self.block.unlink()
+            self.block = None
@@ -0,0 +1,124 @@
+"""Split the basic subsets of an upward-closed property into groups
+on disjoint sets of items, and count each group on its own.
+
+A subset lacks the property exactly when its part in each group lacks
+it, so the polynomial counting the failures by size is the product of
+the failure polynomials of the groups (items in no basic subset each
+contribute a factor 1 + y).  One count over 2**n subsets becomes several
+over 2**(size of a group)."""
+import concurrent.futures
+from my_independence_polynomial import poly_mul, binomial_row
+
+
+def solution_components(my_list, valids):
+    """Split the basic subsets into groups sharing no items.
+
+    Returns (components, free_items): a list of (items, valids) pairs,
+    one per group, and the tuple of items in no basic subset.
+
+    Parameters:
+    -----------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    """
+    items = tuple(my_list)
+    parent = {item: item for item in items}
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    valids = [tuple(valid) for valid in valids]
+    touched = set()
+    for valid in valids:
+        touched.update(valid)
+        for item in valid[1:]:
+            root_a, root_b = find(valid[0]), find(item)
+            if root_a != root_b:
+                parent[root_b] = root_a
+    groups = {}
+    for item in items:
+        if item in touched:
+            groups.setdefault(find(item), ([], []))[0].append(item)
+    for valid in valids:
+        if valid:
+            groups[find(valid[0])][1].append(valid)
+    components = [(tuple(group_items), group_valids)
+                  for group_items, group_valids in groups.values()]
+    free_items = tuple(item for item in items if item not in touched)
+    return components, free_items
+
+
+def _failure_counts(counter, items, valids):
+    '''Failures by size for one component, from its counts by size.'''
+    counts = list(counter(items, valids))
+    counts += [0 for j in range(len(items) + 1 - len(counts))]
+    row = binomial_row(len(items))
+    return [row[k] - counts[k] for k in range(len(items) + 1)]
+
+
+class SolutionComponents():
+    """
+    Count the subsets with an upward-closed property component by
+    component of the hypergraph of basic subsets.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the (basic) subsets
+        with the desired property.
+    """
+
+    def __init__(self, my_list, valids):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if len(set(self.items)) != self.n:
+            raise ValueError("Given list contains repeats!")
+        valids = [tuple(valid) for valid in valids]
+        # the empty set having the property leaves nothing to split
+        self.has_empty = any(not valid for valid in valids)
+        self.components, self.free_items = \
+            solution_components(self.items, valids)
+
+    def is_trivial(self):
+        '''Report whether splitting leaves a single problem
+        on the whole set.'''
+        return self.has_empty or \
+            (len(self.components) <= 1 and not self.free_items)
+
+    def layer_counts(self, counter, parallel=False):
+        '''Return the list whose k-th entry is the number of k-subsets
+        of the full set with the property.
+
+        Parameters
+        -----------
+        counter: Callable
+            Takes (items, valids) and returns the list of the counts
+            with the property by layer, as for enumeration_layer_counts.
+            Must be picklable (defined at module level) if parallel.
+        parallel: bool
+            Whether to count the components in separate processes.
+        '''
+        row = binomial_row(self.n)
+        if self.has_empty:
+            return row
+        failures = binomial_row(len(self.free_items))
+        if parallel and len(self.components) > 1:
+            with concurrent.futures.ProcessPoolExecutor() as executor:
+                futures = [executor.submit(_failure_counts, counter,
+                                           items, valids)
+                           for items, valids in self.components]
+                for future in futures:
+                    failures = poly_mul(failures, future.result())
+        else:
+            for items, valids in self.components:
+                failures = poly_mul(failures,
+                                    _failure_counts(counter, items, valids))
+        return [row[k] - failures[k] for k in range(self.n + 1)]
@@ -1,5 +1,7 @@
+import numpy as np
 from sympy import Rational
 from sympy.functions.combinatorial.numbers import nC
+from my_combinatorial_ranking import gosper_masks
 
 
 def encode_seq_as_bin_tuple(short_list, items):
@@ -142,9 +144,137 @@ def decode_str_to_seq(my_str, items):
     return tuple(output)
 
 
+def item_bit_map(items, msb_first=False):
+    """Return the dict taking each item to its bit in the integer codes:
+    bit j for the j-th item, or bit len(items) - 1 - j with msb_first (the
+    codes of encode_str_to_int(encode_seq_to_str(...))).
+
+    Parameters:
+    -----------
+    items: Iterable
+        the iterable giving you the items.  No repeats allowed.
+    msb_first: bool
+        Give the first item the highest bit.
+    """
+    num_terms = len(items)
+    item_bits = {}
+    for j, item in enumerate(items):
+        if item in item_bits:
+            raise ValueError("Given list contains repeats!")
+        item_bits[item] = num_terms - 1 - j if msb_first else j
+    return item_bits
+
+
+def encode_seqs_as_ints(short_lists, items, msb_first=False,
+                        item_bits=None):
+    """Encode many subsets at once as an array of integer codes, looking
+    each member up in an item-to-bit dict instead of scanning items.
+
+    Parameters:
+    -----------
+    short_lists: Iterable[Iterable]
+        The subsets, each given by its items.
+    items: Iterable
+        the iterable giving you the items (at most 64).
+    msb_first: bool
+        Give the first item the highest bit, as encode_seq_to_str does.
+    item_bits: dict or None
+        An item_bit_map(items, msb_first), to reuse across calls.
+    """
+    if len(items) > 64:
+        raise ValueError("Masks only hold 64 items!")
+    if item_bits is None:
+        item_bits = item_bit_map(items, msb_first)
+    flat = []
+    lengths = []
+    for short_list in short_lists:
+        before = len(flat)
+        try:
+            flat.extend(map(item_bits.__getitem__, short_list))
+        except KeyError:
+            raise ValueError(f"Subset {short_list} is not in set:\n"
+                             + f"{items}")
+        lengths.append(len(flat) - before)
+    lengths = np.array(lengths, dtype=np.int64)
+    output = np.zeros(lengths.size, dtype=np.uint64)
+    nonempty = lengths > 0
+    if flat:
+        shifted = np.left_shift(np.uint64(1),
+                                np.array(flat, dtype=np.uint64))
+        starts = (np.cumsum(lengths) - lengths)[nonempty]
+        output[nonempty] = np.bitwise_or.reduceat(shifted, starts)
+    return output
+
+
+def decode_ints_to_bin_array(codes, num_terms, msb_first=False):
+    """Decode an array of integer codes as 0-1 rows, one per code, in the
+    order of the items.
+
+    Parameters:
+    -----------
+    codes: array_like[int]
+        The codes of the subsets.
+    num_terms: int (at most 64)
+        the number of terms in your set of items
+    msb_first: bool
+        Read the first item from the highest bit.
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    shifts = np.arange(num_terms, dtype=np.uint64)
+    if msb_first:
+        shifts = shifts[::-1]
+    return ((codes[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def decode_ints_to_indices(codes, num_terms, msb_first=False):
+    """Decode an array of integer codes of subsets of one size as an int64
+    array with one row per code, listing the positions of its items.
+
+    Parameters:
+    -----------
+    codes: array_like[int]
+        The codes of the subsets, all with the same number of items.
+    num_terms: int (at most 64)
+        the number of terms in your set of items
+    msb_first: bool
+        Read the first item from the highest bit.
+    """
+    rows = decode_ints_to_bin_array(codes, num_terms, msb_first)
+    sizes = rows.sum(axis=1, dtype=np.int64)
+    if sizes.size and (sizes != sizes[0]).any():
+        raise ValueError("Subsets of different sizes!")
+    size = int(sizes[0]) if sizes.size else 0
+    return np.nonzero(rows)[1].reshape(sizes.size, size).astype(np.int64)
+
+
+def decode_ints_to_seqs(codes, items, msb_first=False):
+    """Decode an array of integer codes as the list of the sequences of
+    elements they represent.
+
+    Parameters:
+    -----------
+    codes: array_like[int]
+        The codes of the subsets.
+    items: Iterable
+        the iterable giving you the items.
+    msb_first: bool
+        Read the first item from the highest bit.
+    """
+    rows = decode_ints_to_bin_array(codes, len(items), msb_first)
+    positions = np.nonzero(rows)[1].tolist()
+    ends = np.cumsum(rows.sum(axis=1, dtype=np.int64)).tolist()
+    output = []
+    start = 0
+    for end in ends:
+        output.append(tuple(items[j] for j in positions[start:end]))
+        start = end
+    return output
+
+
 def dict_constructor_again(bin_str, prop=False):
     '''Given the binary string encoding a subset,
-    make the dictionary for storage.
+    make the dictionary for storage.  Its parents are not stored:
+    they are the indices with one more bit set.
 
     Parameters
     -----------
@@ -153,22 +283,10 @@ def dict_constructor_again(bin_str, prop=False):
     prop: bool
        The indicator of whether or not the subset has the property.
     '''
-    num_terms = len(bin_str)
     num_elts = bin_str.count('1')
-    parents = []
-    temp_tuple = decode_str_to_bin_tuple(bin_str, num_terms)
-    for numbered_pair in enumerate(temp_tuple):
-        if not numbered_pair[1]:  # missing term
-            temp_list = list(temp_tuple)
-            temp_list[numbered_pair[0]] = 1
-            parents.append(encode_str_to_int(
-                encode_bin_tuple_as_str(temp_list, num_terms),
-                num_terms)
-                )
     return {
             "bin_str": bin_str,
             "num_elts": num_elts,
-            "parents": parents,
             "property": prop
     }
 
@@ -196,20 +314,22 @@ class BinSubsetGraphSparseAgain():
                  group_size=10**4):
         self.items = tuple(my_list)
         self.n = len(my_list)
+        self.item_bits = item_bit_map(self.items, msb_first=True)
         self.current_layer = start_layer
+        # the entries of the current layer (and the next, while raising),
+        # by index
+        self.subset_list = {}
+        self._build_layer(start_layer, status_updates, group_size)
+
+    def _build_layer(self, layer, status_updates=False, group_size=10**4):
+        '''Create the entries of one layer, visiting only the indices
+        with that many bits set.'''
         count = 0
         num_groups = 0
-        self.subset_list = []
-        for j in range(2**self.n):
-            my_str = decode_int_to_str(j, self.n)
-            num_elts = my_str.count('1')
-            # build only current layer and connections
-            if num_elts == start_layer:
-                self.subset_list.append(dict_constructor_again(
-                    my_str, False
-                    ))
-            else:  # still need a (falsy) entry to keep the counting straight
-                self.subset_list.append(False)
+        for j in gosper_masks(self.n, layer):
+            self.subset_list[j] = dict_constructor_again(
+                decode_int_to_str(j, self.n), False
+            )
             if status_updates:
                 count += 1
                 if count >= group_size:
@@ -223,11 +343,9 @@ class BinSubsetGraphSparseAgain():
         with the desired upward-closed property.'''
         our_denom = nC(len(self.items), self.current_layer)
         our_num = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]:  # otherwise, skip
-                if self.subset_list[j]["num_elts"] == self.current_layer:
-                    if self.subset_list[j]["property"]:
-                        our_num += 1
+        for j in gosper_masks(self.n, self.current_layer):
+            if self.subset_list[j]["property"]:
+                our_num += 1
         return (our_num, our_denom, Rational(our_num, our_denom))
 
     def fill_in_property_at_current_layer(self, valids):
@@ -241,16 +359,14 @@ class BinSubsetGraphSparseAgain():
             The iterable whose tuples list the members of the subsets
             of the current cardinality with the desired property.
         '''
-        for valid in valids:
-            my_ind = encode_str_to_int(
-                encode_seq_to_str(valid, self.items),
-                self.n
-            )
+        codes = encode_seqs_as_ints(valids, self.items, msb_first=True,
+                                    item_bits=self.item_bits)
+        for my_ind in codes.tolist():
             try:
                 self.subset_list[my_ind]["property"] = True
-            except TypeError as e:
-                my_string = f'Entry {valid},\n'
-                + f'indexed by {my_ind}, is not instantiated!'
+            except KeyError as e:
+                my_string = f'Entry {decode_int_to_str(my_ind, self.n)}'\
+                    + ' is not instantiated!'
                 print(my_string)
                 raise e
         return True
@@ -275,26 +391,25 @@ class BinSubsetGraphSparseAgain():
         # add new terms
         count = 0
         num_groups = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]:  # if nothing there, nothing to do
-                if self.subset_list[j]["num_elts"] == self.current_layer:
-                    # Aside: this is the only time that num_elts matters.
-                    # otherwise, will need to make a temp list to not
-                    # delete new terms.
-                    for parent in self.subset_list[j]["parents"]:
-                        # if someone else created it already,
-                        # only need to update a positive property
-                        if self.subset_list[parent]:
-                            if self.subset_list[j]["property"]:
-                                self.subset_list[parent]["property"] = True
-                        else:  # create element
-                            self.subset_list[parent] = dict_constructor_again(
-                                decode_int_to_str(parent, self.n),
-                                self.subset_list[j]["property"]
-                            )
-                    # delete current-layer term when done with updating its
-                    # parents
-                    self.subset_list[j] = False
+        for j in gosper_masks(self.n, self.current_layer):
+            # the parents are the indices with one more bit set
+            for bit in range(self.n):
+                parent = j | (1 << bit)
+                if parent == j:
+                    continue
+                # if someone else created it already,
+                # only need to update a positive property
+                if parent in self.subset_list:
+                    if self.subset_list[j]["property"]:
+                        self.subset_list[parent]["property"] = True
+                else:  # create element
+                    self.subset_list[parent] = dict_constructor_again(
+                        decode_int_to_str(parent, self.n),
+                        self.subset_list[j]["property"]
+                    )
+            # delete current-layer term when done with updating its
+            # parents
+            del self.subset_list[j]
             if status_updates:
                 count += 1
                 if count >= group_size:
@@ -324,20 +439,142 @@ class BinSubsetGraphSparseAgain():
             Determines the interval at which status updates given.
         '''
         self.current_layer = cur_layer
-        count = 0
-        num_groups = 0
-        for j in range(2**self.n):
-            my_str = decode_int_to_str(j, self.n)
-            num_terms = my_str.count('1')
-            # build only current layer and connections
-            if num_terms == cur_layer:
-                self.subset_list.append(dict_constructor_again(my_str, False))
-            else:  # still need a (falsy) entry to keep the counting straight
-                self.subset_list.append(False)
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Finished {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
+        self.subset_list = {}
+        self._build_layer(cur_layer, status_updates, group_size)
+
+
+def merge_sorted_masks(first, second):
+    """Return the sorted union of two sorted arrays of distinct masks, in
+    one linear pass rather than a sort.
+
+    Parameters:
+    -----------
+    first: np.ndarray[uint64]
+        Sorted distinct masks.
+    second: np.ndarray[uint64]
+        Sorted distinct masks.
+    """
+    places = np.searchsorted(first, second)
+    present = np.zeros(second.size, dtype=bool)
+    inside = places < first.size
+    present[inside] = first[places[inside]] == second[inside]
+    return np.insert(first, places[~present], second[~present])
+
+
+def upper_shadow(masks, num_terms):
+    """Return the sorted uint64 array of the masks with one more bit than
+    some mask in the given sorted array.
+
+    Parameters:
+    -----------
+    masks: np.ndarray[uint64]
+        The sorted masks of one layer.
+    num_terms: int (positive)
+        the number of terms in your set of items
+    """
+    output = np.empty(0, dtype=np.uint64)
+    for j in range(num_terms):
+        bit = np.uint64(1 << j)
+        # setting the same missing bit keeps the masks in order, so each
+        # part is sorted and merges in without a sort, one at a time
+        output = merge_sorted_masks(output,
+                                    masks[(masks & bit) == 0] | bit)
+    return output
+
+
+class BinSubsetGraphSolvingLayer():
+    """
+    Keep only the subsets of the current layer with the property, as a
+    sorted array of uint64 bitmasks, so memory follows the solving part of
+    a single layer rather than 2**n.  A drop-in for
+    BinSubsetGraphSparseAgain for sets of up to 64 items.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    start_layer: int (nonnegative)
+        The layer at which we begin studying the subset graph.
+        Cannot exceed len(my_list)
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, start_layer=0, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        if self.n > 64:
+            raise ValueError("Masks only hold 64 items!")
+        if start_layer < 0 or start_layer > self.n:
+            raise ValueError(f"No layer {start_layer} "
+                             + f"in a {self.n}-element set.")
+        self.position = {item: j for j, item in enumerate(self.items)}
+        if len(self.position) != self.n:
+            raise ValueError("Given list contains repeats!")
+        self.current_layer = start_layer
+        self.status_updates = status_updates
+        self.solving = np.empty(0, dtype=np.uint64)
+
+    def _masks_of(self, valids):
+        '''The sorted uint64 array of the masks of the given subsets.'''
+        return np.unique(encode_seqs_as_ints(valids, self.items,
+                                             item_bits=self.position))
+
+    def count_property_at_current_layer(self):
+        '''Count the number of subsets in the current layer
+        with the desired upward-closed property.'''
+        our_denom = nC(self.n, self.current_layer)
+        our_num = len(self.solving)
+        return (our_num, our_denom, Rational(our_num, our_denom))
+
+    def fill_in_property_at_current_layer(self, valids):
+        '''Fill in the property with valid elements at the current layer.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            The iterable whose tuples list the members of the subsets
+            of the current cardinality with the desired property.
+        '''
+        masks = self._masks_of(valids)
+        for mask in masks.tolist():
+            if mask.bit_count() != self.current_layer:
+                raise ValueError(f"Entry with mask {mask} is not in "
+                                 + f"layer {self.current_layer}!")
+        self.solving = np.union1d(self.solving, masks)
+        return True
+
+    def raise_layer_with_properties(self, valids=()):
+        '''Assuming an upward-closed property,
+        increase the subset-size by one, filling in the property
+        as relevant.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            Any further (basic) subsets with the property in the new
+            layer, beyond the supersets of the current ones.
+        '''
+        if self.current_layer == self.n:
+            raise ValueError("No more layers to go!")
+        self.solving = upper_shadow(self.solving, self.n)
+        self.current_layer += 1
+        self.fill_in_property_at_current_layer(valids)
+        if self.status_updates:
+            print(f"{len(self.solving)} solving subsets "
+                  + f"of size {self.current_layer}.")
+        print(f"We are now considering {self.current_layer}-element subsets.")
+
+    def clear_property_and_reset_layer(self, cur_layer):
+        '''Keep the set the same, but clear all data and restart anew.
+
+        Parameters
+        -------------
+        cur_layer: int (nonnegative)
+           The new starting cardinality for subsets to be considered.
+        '''
+        if cur_layer < 0 or cur_layer > self.n:
+            raise ValueError(f"No layer {cur_layer} "
+                             + f"in a {self.n}-element set.")
+        self.current_layer = cur_layer
+        self.solving = np.empty(0, dtype=np.uint64)
@@ -0,0 +1,250 @@
+"""Give the full subset graph as a packed bitset, and close
+upward-closed properties with a superset-sum (zeta) transform.
+
+Subset j (in the usual encoding, item i <-> bit 2**i) is stored as
+bit (j % 64) of word (j // 64), so a 26-element set takes 2**20 words,
+i.e., 8 MB, rather than a list of 2**26 dictionaries."""
+import numpy as np
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+
+WORD_BITS = 64
+WORD_SHIFT = 6
+
+
+def _low_bit_masks():
+    '''Build the in-word masks used by the transforms.
+
+    zero_masks[i] marks the positions p (0 <= p < 64) whose bit i is 0;
+    popcount_masks[r] marks the positions p with exactly r bits set.'''
+    zero_masks = []
+    for i in range(WORD_SHIFT):
+        mask = 0
+        for p in range(WORD_BITS):
+            if not (p >> i) & 1:
+                mask |= 1 << p
+        zero_masks.append(np.uint64(mask))
+    popcount_masks = []
+    for r in range(WORD_SHIFT + 1):
+        mask = 0
+        for p in range(WORD_BITS):
+            if p.bit_count() == r:
+                mask |= 1 << p
+        popcount_masks.append(np.uint64(mask))
+    return tuple(zero_masks), tuple(popcount_masks)
+
+
+ZERO_MASKS, POPCOUNT_MASKS = _low_bit_masks()
+
+
+def empty_bitset(num_terms):
+    """Return an all-zero packed bitset with 2**num_terms bits.
+
+    Parameters:
+    -----------
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    """
+    num_words = max(2**num_terms >> WORD_SHIFT, 1)
+    return np.zeros(num_words, dtype=np.uint64)
+
+
+def set_bits(words, codes):
+    """Turn on the bits indexed by the given subset codes, in place.
+
+    Parameters:
+    -----------
+    words: np.ndarray[uint64]
+        The packed bitset.
+    codes: Iterable[int]
+        The integer codes of the subsets to mark.
+    """
+    codes = np.asarray(codes, dtype=np.uint64)
+    if codes.size == 0:
+        return words
+    word_inds = (codes >> np.uint64(WORD_SHIFT)).astype(np.intp)
+    bits = np.left_shift(np.uint64(1), codes & np.uint64(WORD_BITS - 1))
+    np.bitwise_or.at(words, word_inds, bits)
+    return words
+
+
+def superset_closure(words, num_terms):
+    """Close a packed bitset upward under inclusion, in place.
+
+    One vectorized pass per item: every subset missing item i passes
+    its bit on to the subset with item i added (the zeta transform
+    over the boolean semiring).
+
+    Parameters:
+    -----------
+    words: np.ndarray[uint64]
+        The packed bitset, as from empty_bitset.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    """
+    for i in range(num_terms):
+        if i < WORD_SHIFT:
+            shift = np.uint64(1 << i)
+            words |= (words & ZERO_MASKS[i]) << shift
+        else:
+            stride = 1 << (i - WORD_SHIFT)
+            blocks = words.reshape(-1, 2, stride)
+            blocks[:, 1, :] |= blocks[:, 0, :]
+    return words
+
+
+def count_bits_by_popcount(words, num_terms):
+    """Count the set bits of a packed bitset by the popcount of their index,
+    i.e., count the marked subsets of each cardinality.
+
+    Parameters:
+    -----------
+    words: np.ndarray[uint64]
+        The packed bitset, as from empty_bitset.
+    num_terms: int (nonnegative)
+        the number of terms in your set of items
+    """
+    word_pops = np.bitwise_count(
+        np.arange(words.size, dtype=np.uint64)
+    ).astype(np.intp)
+    counts = np.zeros(num_terms + 1 + WORD_SHIFT, dtype=np.int64)
+    for r in range(WORD_SHIFT + 1):
+        hits = np.bitwise_count(words & POPCOUNT_MASKS[r])
+        counts += np.bincount(word_pops + r, weights=hits,
+                              minlength=counts.size).astype(np.int64)
+    return [int(c) for c in counts[:num_terms + 1]]
+
+
+class BinSubsetGraphBitset():
+    """
+    Get the full subset system as a packed bitset of the property,
+    with no per-subset storage beyond a single bit.
+    A 26-element set takes 8 MB.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(my_list)
+        self.status_updates = status_updates
+        self.item_bits = {item: j for j, item in enumerate(self.items)}
+        if len(self.item_bits) != self.n:
+            raise ValueError("Given list contains repeats!")
+        self.words = empty_bitset(self.n)
+        self.layer_counts = None
+
+    def encode_members(self, members):
+        '''Return the integer code of a subset given by its members.
+
+        Parameters
+        -----------
+        members: Iterable
+            The items in the subset of choice.
+        '''
+        code = 0
+        for item in members:
+            code |= 1 << self.item_bits[item]
+        return code
+
+    def has_property(self, members):
+        '''Report whether the given subset has the property.
+
+        Parameters
+        -----------
+        members: Iterable
+            The items in the subset of choice.
+        '''
+        return self.has_code(self.encode_members(members))
+
+    def has_code(self, code):
+        '''Report whether the subset with the given code has the property.
+
+        Parameters
+        -----------
+        code: int (nonnegative)
+            The integer code of the subset.
+        '''
+        word = int(self.words[code >> WORD_SHIFT])
+        return bool((word >> (code & (WORD_BITS - 1))) & 1)
+
+    def set_code(self, code, value=True):
+        '''Mark or unmark the subset with the given code, without
+        closing upward.
+
+        Parameters
+        -----------
+        code: int (nonnegative)
+            The integer code of the subset.
+        value: bool
+            Whether the subset has the property.
+        '''
+        bit = np.uint64(1 << (code & (WORD_BITS - 1)))
+        if value:
+            self.words[code >> WORD_SHIFT] |= bit
+        else:
+            self.words[code >> WORD_SHIFT] &= ~bit
+        self.layer_counts = None
+
+    def fill_in_property(self, valids):
+        '''Fill in (all) known subsets with a given upward-closed property.
+
+        Parameters
+        -------------
+        valids: Iterable[tuple]
+            The iterable whose tuples list the members of the subsets
+            with the desired property.
+        '''
+        self.fill_in_codes([self.encode_members(v) for v in valids])
+
+    def fill_in_codes(self, codes):
+        '''Mark the subsets with the given codes, and close upward.
+
+        Parameters
+        -----------
+        codes: Iterable[int]
+            The integer codes of the subsets with the property.
+        '''
+        set_bits(self.words, codes)
+        if self.status_updates:
+            print(f"Marked valids; closing over {self.n} items.")
+        superset_closure(self.words, self.n)
+        self.layer_counts = None
+
+    def count_property_all_layers(self):
+        '''Count the subsets with the property in every layer at once.
+
+        Returns the list of (layer, num, denom, fraction) tuples.'''
+        if self.layer_counts is None:
+            self.layer_counts = count_bits_by_popcount(self.words, self.n)
+        output = []
+        for layer, our_num in enumerate(self.layer_counts):
+            our_denom = nC(self.n, layer)
+            output.append((layer, our_num, our_denom,
+                           Rational(our_num, our_denom)))
+        return output
+
+    def count_property_by_layer(self, layer):
+        '''Count the number of subsets in a given layer
+        with the desired upward-closed property.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        return self.count_property_all_layers()[layer][1:]
+
+    def clear_property(self):
+        '''
+        Retain the set, but clear all property data out.
+        '''
+        self.words[:] = 0
+        self.layer_counts = None
@@ -1,5 +1,8 @@
 from sympy import Rational
 from sympy.functions.combinatorial.numbers import nC
+from my_combinatorial_ranking import gosper_masks
+from my_subset_graph_bitset import BinSubsetGraphBitset
+from my_subset_graph_again import item_bit_map, encode_seqs_as_ints
 # from copy import copy
 
 
@@ -82,11 +85,103 @@ def decode_bin_tuple_as_members(long_list, items):
     return tuple(output)
 
 
+class SubsetEntry(dict):
+    """
+    The dictionary a SubsetListView builds for one subset.  Writing its
+    "property" marks or unmarks the subset in the graph; its other keys
+    are built from the index, and changing them changes only this copy.
+
+    Parameters
+    ------------
+    graph: BinSubsetGraph
+        The graph the subset belongs to.
+    code: int (nonnegative)
+        The index of the subset.
+    fields: dict
+        The entry's keys and values.
+    """
+
+    def __init__(self, graph, code, fields):
+        super().__init__(fields)
+        self.graph = graph
+        self.code = code
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "property":
+            self.graph.set_property(self.code, value)
+
+
+class SubsetEntryList(list):
+    """
+    The flat list [bin_tuple, num_elts, parents, property] a
+    SubsetListView builds for one subset of a BinSubsetGraphCpct.
+    Writing position 3 marks or unmarks the subset in the graph.
+
+    Parameters
+    ------------
+    graph: BinSubsetGraphCpct
+        The graph the subset belongs to.
+    code: int (nonnegative)
+        The index of the subset.
+    fields: list
+        The entry's values.
+    """
+
+    def __init__(self, graph, code, fields):
+        super().__init__(fields)
+        self.graph = graph
+        self.code = code
+
+    def __setitem__(self, i, value):
+        super().__setitem__(i, value)
+        if i in (3, -1):
+            self.graph.set_property(self.code, value)
+
+
+class SubsetListView():
+    """
+    Stand-in for the list of per-subset entries the graph classes used to
+    store, building each entry from the bitset when asked.  Writing an
+    entry, or the property of one, marks or unmarks the subset (without
+    closing upward, as before); the rest of an entry follows from its
+    index.
+
+    Parameters
+    ------------
+    graph: BinSubsetGraph or BinSubsetGraphCpct
+        The graph whose entries to build.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return 2**self.graph.n
+
+    def _index(self, j):
+        if j < 0:
+            j += len(self)
+        if j < 0 or j >= len(self):
+            raise IndexError("Subset index out of range.")
+        return j
+
+    def __getitem__(self, j):
+        return self.graph.entry(self._index(j))
+
+    def __setitem__(self, j, entry):
+        self.graph.set_entry(self._index(j), entry)
+
+    def __iter__(self):
+        for j in range(len(self)):
+            yield self.graph.entry(j)
+
+
 class BinSubsetGraph():
     """
-    Get minimally-labeled subset system.
-    That said, considering a set of > 20 elements is likely to
-    cause memory errors!
+    Get minimally-labeled subset system, stored as a BinSubsetGraphBitset
+    (one bit of property per subset) with the old per-subset entries
+    built on demand by subset_list.  A 26-element set takes 8 MB.
 
     Parameters
     ------------
@@ -95,52 +190,66 @@ class BinSubsetGraph():
     status_updates: bool
         Determine whether standard output gives status updates
     group_size: int (positive)
-        Only active if status_updates is True
-        Determines the interval at which status updates given.
+        Kept for compatibility; there is nothing to build per subset.
     """
 
     def __init__(self, my_list, status_updates=False, group_size=10**4):
-        self.items = tuple(my_list)
-        self.n = len(my_list)
-        count = 0
-        num_groups = 0
-        self.subset_list = []
-        for j in range(2**self.n):
-            self.subset_list.append({
-                "bin_list": decode_int_to_bin_tuple(j, self.n),
-                "num_elts": 0,
-                "parents": [],
-                "property": False
-            })
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Started {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
-        # initialize num_elts, parents
-        count = 0
-        num_groups = 0
-        for j in range(2**self.n - 1):  # last term is full set, no parents
-            my_bin_tuple = self.subset_list[j]["bin_list"]
-            self.subset_list[j]["num_elts"] = my_bin_tuple.count(1)
-            for numbered_pair in enumerate(my_bin_tuple):
-                if not numbered_pair[1]:  # i.e., 0 there
-                    temp_list = list(self.subset_list[j]["bin_list"])
-                    temp_list[numbered_pair[0]] = 1
-                    self.subset_list[j]["parents"].append(
-                        encode_bin_tuple_to_int(temp_list, self.n)
-                    )
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Finished {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
-        # last term  has no parents, but still must update counter.
-        self.subset_list[2**self.n - 1]["num_elts"] = self.n
+        self.bitset = BinSubsetGraphBitset(my_list, status_updates)
+        self.items = self.bitset.items
+        self.n = self.bitset.n
+        self.item_bits = self.bitset.item_bits
+        self.subset_list = SubsetListView(self)
+        if status_updates:
+            print(f"Built the bitset for {2**self.n} subsets.")
+
+    def parents(self, j):
+        '''Return the indices of the subsets with one more element.
+
+        Parameters
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
+        '''
+        return [j | (1 << i) for i in range(self.n) if not (j >> i) & 1]
+
+    def entry(self, j):
+        '''Return the dictionary the subset with index j used to have.
+
+        Parameters
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
+        '''
+        return SubsetEntry(self, j, {
+            "bin_list": decode_int_to_bin_tuple(j, self.n),
+            "num_elts": j.bit_count(),
+            "parents": self.parents(j),
+            "property": self.bitset.has_code(j)
+        })
+
+    def set_entry(self, j, entry):
+        '''Store the property of an entry written to subset_list.
+
+        Parameters
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
+        entry: dict
+            The entry, with its "property".
+        '''
+        self.set_property(j, entry["property"])
+
+    def set_property(self, j, value=True):
+        '''Mark or unmark the subset with index j, without closing upward.
+
+        Parameters
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
+        value: bool
+            Whether the subset has the property.
+        '''
+        self.bitset.set_code(j, value)
 
     def count_property_by_layer(self, layer):
         '''Count the number of subsets in a given layer
@@ -151,13 +260,7 @@ class BinSubsetGraph():
         layer: int (nonnegative)
             the cardinality of subsets you wish to consider.
         '''
-        our_denom = nC(len(self.items), layer)
-        our_num = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]["num_elts"] == layer:
-                if self.subset_list[j]["property"]:
-                    our_num += 1
-        return (our_num, our_denom, Rational(our_num, our_denom))
+        return self.bitset.count_property_by_layer(layer)
 
     def fill_in_property(self, valids):
         '''Fill in (all) known subsets with a given upward-closed property.
@@ -168,32 +271,20 @@ class BinSubsetGraph():
             The iterable whose tuples list the members of the subsets
             with the desired property.
         '''
-        for valid in valids:
-            self.subset_list[encode_bin_tuple_to_int(
-                encode_members_as_bin_tuple(valid, self.items),
-                self.n
-            )]["property"] = True
-        # bubble up, starting with fewest elements
-        # currently using n passes, but still ensuring that
-        # each term only bubbles up once
-        for k in range(self.n):
-            for j in range(2**self.n):
-                if self.subset_list[j]["num_elts"] == k:
-                    if self.subset_list[j]["property"]:
-                        for parent in self.subset_list[j]["parents"]:
-                            self.subset_list[parent]["property"] = True
+        self.bitset.fill_in_codes(
+            encode_seqs_as_ints(valids, self.items, item_bits=self.item_bits)
+        )
 
     def clear_property(self):
         '''
         Retain the set, but clear all property data out.
         '''
-        for j in range(2**self.n):
-            self.subset_list[j]["property"] = False
+        self.bitset.clear_property()
 
 
 class BinSubsetGraphExtras(BinSubsetGraph):
-    """Get subset graph with explicit extras added (for testing).
-    Uncertain if this method can handle a 20-element set!
+    """Get subset graph with explicit extras added (for testing):
+    each entry also lists its index and its members.
 
     Parameters
     ------------
@@ -202,33 +293,31 @@ class BinSubsetGraphExtras(BinSubsetGraph):
     status_updates: bool
         Determine whether standard output gives status updates
     group_size: int (positive)
-        Only active if status_updates is True
-        Determines the interval at which status updates given.
+        Kept for compatibility; there is nothing to build per subset.
     """
 
-    def __init__(self, my_list, status_updates=False, group_size=10**4):
-        super().__init__(my_list, status_updates, group_size)
-        count = 0
-        num_groups = 0
-        for j in range(2**self.n):
-            self.subset_list[j]["index"] = j
-            self.subset_list[j]["members"] = decode_bin_tuple_as_members(
-                decode_int_to_bin_tuple(j, self.n), self.items
-            )
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print("Finished extras for "
-                          + f"{num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
+    def entry(self, j):
+        '''Return the dictionary the subset with index j used to have,
+        with its index and members.
 
+        Parameters
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
+        '''
+        output = super().entry(j)
+        output["index"] = j
+        output["members"] = decode_bin_tuple_as_members(
+            output["bin_list"], self.items
+        )
+        return output
 
-class BinSubsetGraphCpct():
+
+class BinSubsetGraphCpct(BinSubsetGraph):
     """
-    Get minimally-labeled subset system, internals as flat list.
-    Initial attempt to curtail size, sadly ineffective.
+    Get minimally-labeled subset system, with entries as flat lists
+    [bin_tuple, num_elts, parents, property].  Backed by the same bitset
+    as BinSubsetGraph.
 
     Parameters
     ------------
@@ -237,105 +326,41 @@ class BinSubsetGraphCpct():
     status_updates: bool
         Determine whether standard output gives status updates
     group_size: int (positive)
-        Only active if status_updates is True
-        Determines the interval at which status updates given.
+        Kept for compatibility; there is nothing to build per subset.
     """
 
-    def __init__(self, my_list, status_updates=False, group_size=10**4):
-        self.items = tuple(my_list)
-        self.n = len(my_list)
-        count = 0
-        num_groups = 0
-        self.subset_list = []
-        for j in range(2**self.n):
-            # append list [bin_tuple, num_elts, parents, property]
-            self.subset_list.append(
-                [decode_int_to_bin_tuple(j, self.n), 0, [], False]
-            )
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Started {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
-        # initialize num_elts, parents
-        count = 0
-        num_groups = 0
-        for j in range(2**self.n - 1):  # last term is full set, no parents
-            my_bin_tuple = self.subset_list[j][0]
-            self.subset_list[j][1] = my_bin_tuple.count(1)
-            for numbered_pair in enumerate(my_bin_tuple):
-                if not numbered_pair[1]:  # i.e., 0 there
-                    temp_list = list(self.subset_list[j][0])
-                    temp_list[numbered_pair[0]] = 1
-                    self.subset_list[j][2].append(
-                        encode_bin_tuple_to_int(temp_list, self.n)
-                    )
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Finished {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
-        # last term  has no parents, but still must update counter.
-        self.subset_list[2**self.n - 1][1] = self.n
-
-    def fill_in_property(self, valids):
-        '''Fill in (all) known subsets with a given upward-closed property.
+    def entry(self, j):
+        '''Return the list the subset with index j used to have.
 
         Parameters
-        -------------
-        valids: Iterable[tuple]
-            The iterable whose tuples list the members of the subsets
-            with the desired property.
-        '''
-        for valid in valids:
-            self.subset_list[encode_bin_tuple_to_int(
-                encode_members_as_bin_tuple(valid, self.items),
-                self.n
-            )][3] = True
-        # bubble up, starting with fewest elements
-        # currently using n passes, but still ensuring that
-        # each term only bubbles up once
-        for k in range(self.n):
-            for j in range(2**self.n):
-                if self.subset_list[j][1] == k:
-                    if self.subset_list[j][3]:
-                        for parent in self.subset_list[j][2]:
-                            self.subset_list[parent][3] = True
-
-    def clear_property(self):
-        '''
-        Retain the set, but clear all property data out.
+        -----------
+        j: int (nonnegative)
+            The index of the subset.
         '''
-        for j in range(2**self.n):
-            self.subset_list[j][3] = False
+        return SubsetEntryList(self, j, [decode_int_to_bin_tuple(j, self.n),
+                                         j.bit_count(),
+                                         self.parents(j),
+                                         self.bitset.has_code(j)])
 
-    def count_property_by_layer(self, layer):
-        '''Count the number of subsets in a given layer
-        with the desired upward-closed property.
+    def set_entry(self, j, entry):
+        '''Store the property of an entry written to subset_list.
 
         Parameters
         -----------
-        layer: int (nonnegative)
-            the cardinality of subsets you wish to consider.
+        j: int (nonnegative)
+            The index of the subset.
+        entry: list
+            The entry, with its property last.
         '''
-        our_denom = nC(len(self.items), layer)
-        our_num = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]["num_elts"] == layer:
-                if self.subset_list[j]["property"]:
-                    our_num += 1
-        return (our_num, our_denom, Rational(our_num, our_denom))
+        self.set_property(j, entry[3])
 
 
 def dict_constructor(the_bin_tuple, prop=False):
     '''Given a bin_tuple representing a subset
     and its membership in the property,
     create the dictionary item to be stored
-    in the table.
+    in the table.  Its parents are not stored: they are the
+    indices with one more bit set.
 
     Parameters
     -----------
@@ -344,19 +369,10 @@ def dict_constructor(the_bin_tuple, prop=False):
     prop: bool
        The indicator of whether or not the subset has the property.
     '''
-    num_terms = len(the_bin_tuple)
     num_elts = the_bin_tuple.count(1)
-    parents = []
-    for numbered_pair in enumerate(the_bin_tuple):
-        if not numbered_pair[1]:  # missing term
-            temp_list = list(the_bin_tuple)
-            temp_list[numbered_pair[0]] = 1
-            parents.append(encode_bin_tuple_to_int(temp_list,
-                                                   num_terms))
     return {
             "bin_list": the_bin_tuple,
             "num_elts": num_elts,
-            "parents": parents,
             "property": prop
     }
 
@@ -384,18 +400,20 @@ class BinSubsetGraphSparse():
                  group_size=10**4):
         self.items = tuple(my_list)
         self.n = len(my_list)
+        self.item_bits = item_bit_map(self.items)
         self.current_layer = start_layer
+        self.subset_list = [False] * 2**self.n
+        self._build_layer(start_layer, status_updates, group_size)
+
+    def _build_layer(self, layer, status_updates=False, group_size=10**4):
+        '''Create the entries of one layer, visiting only the indices
+        with that many bits set.'''
         count = 0
         num_groups = 0
-        self.subset_list = []
-        for j in range(2**self.n):
-            my_bin_tuple = decode_int_to_bin_tuple(j, self.n)
-            num_terms = my_bin_tuple.count(1)
-            # build only current and next layer and connections
-            if num_terms == start_layer:
-                self.subset_list.append(dict_constructor(my_bin_tuple, False))
-            else:  # still need a (falsy) entry to keep the counting straight
-                self.subset_list.append(False)
+        for j in gosper_masks(self.n, layer):
+            self.subset_list[j] = dict_constructor(
+                decode_int_to_bin_tuple(j, self.n), False
+            )
             if status_updates:
                 count += 1
                 if count >= group_size:
@@ -409,11 +427,9 @@ class BinSubsetGraphSparse():
         with the desired upward-closed property.'''
         our_denom = nC(len(self.items), self.current_layer)
         our_num = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]:  # otherwise, skip
-                if self.subset_list[j]["num_elts"] == self.current_layer:
-                    if self.subset_list[j]["property"]:
-                        our_num += 1
+        for j in gosper_masks(self.n, self.current_layer):
+            if self.subset_list[j]["property"]:
+                our_num += 1
         return (our_num, our_denom, Rational(our_num, our_denom))
 
     def fill_in_property_at_current_layer(self, valids):
@@ -427,16 +443,14 @@ class BinSubsetGraphSparse():
             The iterable whose tuples list the members of the subsets
             of the current cardinality with the desired property.
         '''
-        for valid in valids:
-            my_ind = encode_bin_tuple_to_int(
-                encode_members_as_bin_tuple(valid, self.items),
-                self.n
-            )
+        codes = encode_seqs_as_ints(valids, self.items,
+                                    item_bits=self.item_bits)
+        for my_ind in codes.tolist():
             try:
                 self.subset_list[my_ind]["property"] = True
             except TypeError as e:
-                my_string = f'Entry {valid},\n'
-                + f'indexed by {my_ind}, is not instantiated!'
+                my_string = f'Entry {decode_int_to_bin_tuple(my_ind, self.n)}'\
+                    + ' is not instantiated!'
                 print(my_string)
                 raise e
         return True
@@ -461,26 +475,25 @@ class BinSubsetGraphSparse():
         # add new terms
         count = 0
         num_groups = 0
-        for j in range(2**self.n):
-            if self.subset_list[j]:  # if nothing there, nothing to do
-                if self.subset_list[j]["num_elts"] == self.current_layer:
-                    # Aside: this is the only time that num_elts matters.
-                    # otherwise, will need to make a temp list to not
-                    # delete new terms.
-                    for parent in self.subset_list[j]["parents"]:
-                        # if someone else created it already,
-                        # only need to update a positive property
-                        if self.subset_list[parent]:
-                            if self.subset_list[j]["property"]:
-                                self.subset_list[parent]["property"] = True
-                        else:  # create element
-                            self.subset_list[parent] = dict_constructor(
-                                decode_int_to_bin_tuple(parent, self.n),
-                                self.subset_list[j]["property"]
-                            )
-                    # delete current-layer term when done with updating its
-                    # parents
-                    self.subset_list[j] = False
+        for j in gosper_masks(self.n, self.current_layer):
+            # the parents are the indices with one more bit set
+            for bit in range(self.n):
+                parent = j | (1 << bit)
+                if parent == j:
+                    continue
+                # if someone else created it already,
+                # only need to update a positive property
+                if self.subset_list[parent]:
+                    if self.subset_list[j]["property"]:
+                        self.subset_list[parent]["property"] = True
+                else:  # create element
+                    self.subset_list[parent] = dict_constructor(
+                        decode_int_to_bin_tuple(parent, self.n),
+                        self.subset_list[j]["property"]
+                    )
+            # delete current-layer term when done with updating its
+            # parents
+            self.subset_list[j] = False
             if status_updates:
                 count += 1
                 if count >= group_size:
@@ -510,20 +523,5 @@ class BinSubsetGraphSparse():
             Determines the interval at which status updates given.
         '''
         self.current_layer = cur_layer
-        count = 0
-        num_groups = 0
-        for j in range(2**self.n):
-            my_bin_tuple = decode_int_to_bin_tuple(j, self.n)
-            num_terms = my_bin_tuple.count(1)
-            # build only current and next layer and connections
-            if num_terms == cur_layer:
-                self.subset_list.append(dict_constructor(my_bin_tuple, False))
-            else:  # still need a (falsy) entry to keep the counting straight
-                self.subset_list.append(False)
-            if status_updates:
-                count += 1
-                if count >= group_size:
-                    num_groups += 1
-                    print(f"Finished {num_groups} groups"
-                          + f' of size {group_size}')
-                    count = 0
+        self.subset_list = [False] * 2**self.n
+        self._build_layer(cur_layer, status_updates, group_size)
@@ -0,0 +1,288 @@
+"""Give families of subsets as zero-suppressed decision diagrams (ZDDs),
+and count the upward closure of a family layer by layer.
+
+Nodes are stored once each in a unique table, as (level, lo, hi) triples:
+'lo' is the subfamily without the item at that level, 'hi' the subfamily
+(with that item removed) of sets containing it.  Node 0 is the empty
+family and node 1 the family holding only the empty set.  A node whose
+'hi' is 0 is never built (the zero-suppression rule), so items missing
+from every set cost nothing."""
+from sympy import Rational
+from sympy.functions.combinatorial.numbers import nC
+
+EMPTY = 0
+BASE = 1
+
+
+def heuristic_order(items, subsets):
+    """Order the items so that items appearing together in many subsets
+    sit close together, which tends to keep the diagram small.
+
+    Greedy: start from the item in the most subsets, then repeatedly
+    append the unplaced item sharing the most subsets with those placed
+    (ties broken by overall frequency, then by original position).
+
+    Parameters:
+    -----------
+    items: Iterable
+        The list of all the elements of the set.
+    subsets: Iterable[Iterable]
+        The subsets whose family we wish to store.
+    """
+    items = tuple(items)
+    position = {item: j for j, item in enumerate(items)}
+    degree = [0 for j in items]
+    shared = [dict() for j in items]
+    for subset in subsets:
+        inds = [position[item] for item in subset]
+        for a in inds:
+            degree[a] += 1
+            for b in inds:
+                if a != b:
+                    shared[a][b] = shared[a].get(b, 0) + 1
+    unplaced = set(range(len(items)))
+    attraction = [0 for j in items]
+    order = []
+    while unplaced:
+        best = max(unplaced,
+                   key=lambda j: (attraction[j], degree[j], -j))
+        unplaced.remove(best)
+        order.append(items[best])
+        for neighbor, weight in shared[best].items():
+            attraction[neighbor] += weight
+    return tuple(order)
+
+
+class ZDD():
+    """
+    Store families of subsets of a fixed, ordered set of items.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The items in the order to be used as diagram levels.
+        No repeats allowed.
+    """
+
+    def __init__(self, my_list):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        self.level_of = {item: j for j, item in enumerate(self.items)}
+        if len(self.level_of) != self.n:
+            raise ValueError("Given list contains repeats!")
+        # terminals sit below every real level
+        self.nodes = [(self.n, None, None), (self.n, None, None)]
+        self.unique = {}
+        self.union_cache = {}
+
+    def level(self, node):
+        '''Return the level of the top item of a node.'''
+        return self.nodes[node][0]
+
+    def make_node(self, level, lo, hi):
+        '''Return the (unique) node for the given triple.
+
+        Parameters
+        -----------
+        level: int (nonnegative)
+            The position of the item being decided.
+        lo: int
+            The node for the sets without that item.
+        hi: int
+            The node for the sets with that item (item removed).
+        '''
+        if hi == EMPTY:
+            return lo
+        key = (level, lo, hi)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self.nodes.append(key)
+            self.unique[key] = node
+        return node
+
+    def from_sets(self, subsets):
+        '''Build the node holding exactly the given family of subsets.
+
+        Parameters
+        -----------
+        subsets: Iterable[Iterable]
+            The subsets, each given by its members.
+        '''
+        level_tuples = set()
+        for subset in subsets:
+            levels = sorted(self.level_of[item] for item in subset)
+            level_tuples.add(tuple(levels))
+        return self._build(sorted(level_tuples), 0)
+
+    def _build(self, level_tuples, depth):
+        '''Build from sorted tuples of levels, all agreeing
+        on their first (depth) entries.'''
+        if not level_tuples:
+            return EMPTY
+        if len(level_tuples[0]) == depth:
+            # the (unique) exhausted tuple sorts first
+            rest = self._build(level_tuples[1:], depth)
+            return self.union(BASE, rest)
+        top = level_tuples[0][depth]
+        split = 0
+        while split < len(level_tuples) and \
+                level_tuples[split][depth] == top:
+            split += 1
+        hi = self._build(level_tuples[:split], depth + 1)
+        lo = self._build(level_tuples[split:], depth)
+        return self.make_node(top, lo, hi)
+
+    def union(self, f, g):
+        '''Return the node for the union of two families.
+
+        Parameters
+        -----------
+        f, g: int
+            The nodes of the two families.
+        '''
+        if f == EMPTY or f == g:
+            return g
+        if g == EMPTY:
+            return f
+        if f > g:
+            f, g = g, f
+        key = (f, g)
+        if key in self.union_cache:
+            return self.union_cache[key]
+        f_level, f_lo, f_hi = self.nodes[f]
+        g_level, g_lo, g_hi = self.nodes[g]
+        if f_level < g_level:
+            result = self.make_node(f_level, self.union(f_lo, g), f_hi)
+        elif g_level < f_level:
+            result = self.make_node(g_level, self.union(f, g_lo), g_hi)
+        else:
+            result = self.make_node(f_level, self.union(f_lo, g_lo),
+                                    self.union(f_hi, g_hi))
+        self.union_cache[key] = result
+        return result
+
+    def up_closure(self, f):
+        '''Return the node for all subsets of the items
+        containing some member of the family.
+
+        Parameters
+        -----------
+        f: int
+            The node of the family to close upward.
+        '''
+        cache = {}
+
+        def up(node, level):
+            # supersets, among items at or past the given level
+            if level == self.n or node == EMPTY:
+                return node
+            key = (node, level)
+            if key in cache:
+                return cache[key]
+            node_level, lo, hi = self.nodes[node]
+            if node_level > level:  # item at this level is free
+                lo, hi = node, EMPTY
+            without_item = up(lo, level + 1)
+            with_item = up(self.union(lo, hi), level + 1)
+            result = self.make_node(level, without_item, with_item)
+            cache[key] = result
+            return result
+
+        return up(f, 0)
+
+    def count_by_cardinality(self, f):
+        '''Return the list whose k-th entry is the number of
+        k-element sets in the family.
+
+        Parameters
+        -----------
+        f: int
+            The node of the family to count.
+        '''
+        polys = {EMPTY: [], BASE: [1]}
+        reachable = set()
+        stack = [f]
+        while stack:
+            node = stack.pop()
+            if node > BASE and node not in reachable:
+                reachable.add(node)
+                stack.extend(self.nodes[node][1:])
+        # children are always built before their parents, so filling in
+        # by increasing id never meets a missing child.
+        for node in sorted(reachable):
+            level, lo, hi = self.nodes[node]
+            lo_poly = polys[lo]
+            hi_poly = polys[hi]
+            poly = [0 for j in range(max(len(lo_poly), len(hi_poly) + 1))]
+            for k, c in enumerate(lo_poly):
+                poly[k] += c
+            for k, c in enumerate(hi_poly):
+                poly[k + 1] += c
+            polys[node] = poly
+        output = polys[f]
+        return output + [0 for j in range(self.n + 1 - len(output))]
+
+    def size(self):
+        '''Return the number of nonterminal nodes built so far.'''
+        return len(self.nodes) - 2
+
+
+class SolutionZDD():
+    """
+    Count the subsets of a set with an upward-closed property,
+    given the list of subsets known to have it, via a ZDD.
+
+    Parameters
+    ------------
+    my_list: Iterable
+        The list constaining all items in your set.  No repeats allowed.
+    valids: Iterable[tuple]
+        The iterable whose tuples list the members of the subsets
+        with the desired property.
+    order: Iterable or None
+        The order of the items in the diagram.  If None,
+        use heuristic_order.
+    status_updates: bool
+        Determine whether standard output gives status updates
+    """
+
+    def __init__(self, my_list, valids, order=None, status_updates=False):
+        self.items = tuple(my_list)
+        self.n = len(self.items)
+        valids = [tuple(valid) for valid in valids]
+        if order is None:
+            order = heuristic_order(self.items, valids)
+        self.zdd = ZDD(order)
+        self.family = self.zdd.from_sets(valids)
+        if status_updates:
+            print(f"Family of {len(valids)} subsets "
+                  + f"uses {self.zdd.size()} nodes.")
+        self.closure = self.zdd.up_closure(self.family)
+        if status_updates:
+            print(f"Upward closure done; {self.zdd.size()} nodes in total.")
+        self.layer_counts = self.zdd.count_by_cardinality(self.closure)
+
+    def count_property_all_layers(self):
+        '''Count the subsets with the property in every layer at once.
+
+        Returns the list of (layer, num, denom, fraction) tuples.'''
+        output = []
+        for layer, our_num in enumerate(self.layer_counts):
+            our_denom = nC(self.n, layer)
+            output.append((layer, our_num, our_denom,
+                           Rational(our_num, our_denom)))
+        return output
+
+    def count_property_by_layer(self, layer):
+        '''Count the number of subsets in a given layer
+        with the desired upward-closed property.
+
+        Parameters
+        -----------
+        layer: int (nonnegative)
+            the cardinality of subsets you wish to consider.
+        '''
+        if layer < 0 or layer > self.n:
+            raise ValueError(f"No layer {layer} in a {self.n}-element set.")
+        return self.count_property_all_layers()[layer][1:]
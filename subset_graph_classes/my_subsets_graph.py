@@ -1,16 +1,20 @@
 """Give a (multi)subset graph and search for upward-closed properties."""
+import numpy as np
 import sympy as sp
-from itertools import combinations
+from math import comb
 
 
 class DAGNode:
     """Create a simple node as appropriate for a DAG"""
 
-    def __init__(self, value, layer, *children):
-        """Initialize."""
+    __slots__ = ('value', 'layer', 'children', 'weight', 'property')
+
+    def __init__(self, value, layer, *children, weight=1):
+        """Initialize; weight counts the subsets the node stands for."""
         self.value = value
         self.layer = layer
         self.children = children
+        self.weight = weight
         self.property = False
 
     def set_property_direct(self, val):
@@ -29,63 +33,148 @@ class DAGNode:
         return f"{self.value!s} -> ({childstring})"
 
 
+class MultiSubsetNode(DAGNode):
+    """A DAGNode of a MultiSubsetGraph, whose property is the graph's
+    property column: reading or setting it reads or sets the column."""
+
+    __slots__ = ('graph', 'node_id')
+
+    def __init__(self, graph, node_id, value, layer, *children, weight=1):
+        """Initialize without touching the property column."""
+        self.graph = graph
+        self.node_id = node_id
+        self.value = value
+        self.layer = layer
+        self.children = children
+        self.weight = weight
+
+    def _get_property(self):
+        return bool(self.graph.properties[self.node_id])
+
+    def _set_property(self, val):
+        self.graph.properties[self.node_id] = val
+
+    property = property(_get_property, _set_property)
+
+
 class MultiSubsetGraph:
-    """Given an iterable, give its subset graph."""
+    """Given an iterable, give its subset graph.
+
+    Repeated values share nodes: a node's value lists its values in the
+    order they first appear in the iterable, and its weight counts the
+    subsets (of positions) with those values, so the layer counts stay
+    those of the subsets.  Nodes are numbered layer by layer and kept as
+    arrays: their weights, a CSR index of their children (the children of
+    node i are children[children_start[i]:children_start[i + 1]]) and a
+    property column, so closing the property upward takes one gather per
+    layer.  Nodes are found by value through a dict."""
 
     def __init__(self, my_list, debug_mode=False):
         self.tuple = tuple(my_list)
+        self.values = tuple(dict.fromkeys(self.tuple))
+        self.value_order = {value: j for j, value in enumerate(self.values)}
+        self.multiplicities = tuple(self.tuple.count(value)
+                                    for value in self.values)
         # layer 0
-        empty_node = DAGNode('EmptySet', 0, None)
-        self.nodes = [[empty_node,], ]
-        # layer 1
-        temp_list = []
-        for j in my_list:
-            temp_list.append(DAGNode((j,), 1, empty_node))
-        temp_tuple = tuple(temp_list)
-        self.nodes.append(temp_tuple)
-        # higher layers
-        for j in range(2, len(my_list) + 1):
+        self.node_values = [()]
+        self.index = {(): 0}
+        self.layer_starts = [0, 1]
+        weights = [1]
+        children_start = [0, 0]
+        children = []
+        # higher layers, each multiset built once by appending a value
+        # no earlier than its last one
+        for j in range(1, len(self.tuple) + 1):
             if debug_mode:
                 print(j)
-            temp_list = []
-            for combo in combinations(my_list, j):
-                new_children_list = []
-                for sub_combo in combinations(combo, j - 1):
-                    for possible_child in self.nodes[j - 1]:
-                        if possible_child.value == sub_combo:
-                            new_children_list.append(possible_child)
-                            break  # this shortcut may not work for multisets
-                temp_list.append(DAGNode(combo, j, *new_children_list))
-            temp_tuple = tuple(temp_list)
-            self.nodes.append(temp_tuple)
+            for node_id in range(self.layer_starts[j - 1],
+                                 self.layer_starts[j]):
+                key = self.node_values[node_id]
+                start = self.value_order[key[-1]] if key else 0
+                for q in range(start, len(self.values)):
+                    value = self.values[q]
+                    if key.count(value) < self.multiplicities[q]:
+                        new_key = key + (value,)
+                        weight, new_children = self._links(new_key)
+                        self.index[new_key] = len(self.node_values)
+                        self.node_values.append(new_key)
+                        weights.append(weight)
+                        children.extend(new_children)
+                        children_start.append(len(children))
+            self.layer_starts.append(len(self.node_values))
+        self.layer_starts = np.array(self.layer_starts, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.int64)
+        self.children_start = np.array(children_start, dtype=np.int64)
+        self.children = np.array(children, dtype=np.int64)
+        self.properties = np.zeros(len(self.node_values), dtype=bool)
+        self._nodes = None
+
+    def _links(self, key):
+        """The weight and children ids of a (canonically ordered)
+        multiset's node."""
+        weight = 1
+        new_children = []
+        for value in reversed(tuple(dict.fromkeys(key))):
+            weight *= comb(self.multiplicities[self.value_order[value]],
+                           key.count(value))
+            # dropping the last copy keeps the canonical order
+            last = len(key) - 1 - key[::-1].index(value)
+            new_children.append(self.index[key[:last] + key[last + 1:]])
+        return weight, new_children
+
+    @property
+    def nodes(self):
+        """The layers as tuples of MultiSubsetNode objects, built once on
+        first use.  Their properties are the property column, so setting
+        one is seen by the arrays and the other way around."""
+        if self._nodes is None:
+            built = []
+            output = []
+            for j in range(len(self.layer_starts) - 1):
+                layer = []
+                for node_id in range(self.layer_starts[j],
+                                     self.layer_starts[j + 1]):
+                    kids = self.children[self.children_start[node_id]:
+                                         self.children_start[node_id + 1]]
+                    node = MultiSubsetNode(
+                        self, node_id,
+                        self.node_values[node_id] if j else 'EmptySet',
+                        j, *[built[k] for k in kids] if j else [None],
+                        weight=int(self.weights[node_id])
+                    )
+                    built.append(node)
+                    layer.append(node)
+                output.append(tuple(layer))
+            self._nodes = tuple(output)
+        return self._nodes
+
+    def canonical_value(self, valid):
+        """Order a multiset of values as the node values are."""
+        return tuple(sorted(valid, key=self.value_order.__getitem__))
 
     def count_property_by_layer(self, layer):
         our_denom = sp.functions.combinatorial.numbers.nC(
             len(self.tuple), layer
         )
-        our_num = 0
-        for node in self.nodes[layer]:
-            if node.property:
-                our_num += 1
+        low, high = self.layer_starts[layer], self.layer_starts[layer + 1]
+        our_num = int(self.weights[low:high][self.properties[low:high]].sum())
         return (our_num, our_denom, sp.Rational(our_num, our_denom))
 
     def fill_in_property(
             self, valids, is_layer_promise=False, layer_promise=1
             ):
         """Fill in the property, starter, then upwards closing."""
-        if is_layer_promise:
-            for node in self.nodes[layer_promise]:
-                if any(node.value == valid for valid in valids):
-                    node.set_property_direct(True)
-            for j in range(layer_promise + 1, len(self.tuple) + 1):
-                for node in self.nodes[j]:
-                    node.property_from_children()
-        else:
-            for j in range(1, len(self.tuple)):
-                for node in self.nodes[j]:
-                    if any(node.value == valid for valid in valids):
-                        node.set_property_direct(True)
-            # take a second pass to update
-            for j in range(1, len(self.tuple) + 1):
-                for node in self.nodes[j]:
-                    node.property_from_children()
+        for valid in valids:
+            node_id = self.index.get(self.canonical_value(valid))
+            if node_id is not None and node_id > 0 and \
+                    (not is_layer_promise
+                     or len(self.node_values[node_id]) == layer_promise):
+                self.properties[node_id] = True
+        start = layer_promise + 1 if is_layer_promise else 1
+        for j in range(start, len(self.tuple) + 1):
+            low, high = self.layer_starts[j], self.layer_starts[j + 1]
+            offsets = self.children_start[low:high + 1]
+            gathered = self.properties[self.children[offsets[0]:offsets[-1]]]
+            self.properties[low:high] |= np.logical_or.reduceat(
+                gathered, offsets[:-1] - offsets[0]
+            )
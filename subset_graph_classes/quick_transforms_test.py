@@ -1,6 +1,7 @@
 from my_subset_graph_again import encode_seq_to_str, encode_seq_as_bin_tuple, \
     encode_bin_tuple_as_str, encode_str_to_int, decode_int_to_str, \
-    decode_str_to_seq, decode_str_to_bin_tuple, decode_bin_tuple_as_seq
+    decode_str_to_seq, decode_str_to_bin_tuple, decode_bin_tuple_as_seq, \
+    encode_seqs_as_ints, decode_ints_to_seqs
 from itertools import combinations
 
 test_items_one = ('a', 'b', 'c', 'd', 'e')
@@ -68,6 +69,23 @@ def test_str_to_seq_compatibility():
     return True
 
 
+def test_batch_encoding_compatibility():
+    combos = [combo for j in range(0, 6)
+              for combo in combinations(test_items_one, j)]
+    codes = encode_seqs_as_ints(combos, test_items_one, msb_first=True)
+    for combo, code in zip(combos, codes.tolist()):
+        one_at_a_time = encode_str_to_int(
+            encode_seq_to_str(combo, test_items_one), num_items_one)
+        if code != one_at_a_time:
+            print("Trouble!")
+            print(f"Batch: {code}, One at a time: {one_at_a_time}")
+            return False
+    if decode_ints_to_seqs(codes, test_items_one, msb_first=True) != combos:
+        print("Trouble decoding the batch!")
+        return False
+    return True
+
+
 if __name__ == '__main__':
     print("Testing seq-to-str compatibility:")
     print(test_seq_to_str_compatability())
@@ -77,3 +95,5 @@ if __name__ == '__main__':
     print(test_str_to_int_reversibility())
     print("Testing str-to-seq compatibility:")
     print(test_str_to_int_reversibility())
+    print("Testing batch encoding compatibility:")
+    print(test_batch_encoding_compatibility())
@@ -0,0 +1,34 @@
+from my_subset_graph_again import BinSubsetGraphSparseAgain, \
+    BinSubsetGraphSolvingLayer, upper_shadow
+from itertools import combinations
+import numpy as np
+
+test_items = tuple(range(9))
+test_solutions = [(0, 1, 2), (2, 5, 7), (3, 4, 8), (1, 6, 8)]
+
+
+def brute_force_count(solutions, layer):
+    return sum(any(set(solution) <= set(combo) for solution in solutions)
+               for combo in combinations(test_items, layer))
+
+
+def test_upper_shadow():
+    n = 10
+    for k in range(n):
+        masks = np.array(sorted(sum(1 << c for c in combo)
+                                for combo in combinations(range(n), k)),
+                         dtype=np.uint64)[::3]
+        expected = sorted({mask | (1 << j) for mask in masks.tolist()
+                           for j in range(n) if not mask >> j & 1})
+        assert upper_shadow(masks, n).tolist() == expected
+
+
+def test_layer_engines_count():
+    for engine in (BinSubsetGraphSparseAgain, BinSubsetGraphSolvingLayer):
+        graph = engine(test_items, 3)
+        graph.fill_in_property_at_current_layer(test_solutions)
+        for layer in range(3, len(test_items) + 1):
+            assert graph.count_property_at_current_layer()[0] \
+                == brute_force_count(test_solutions, layer)
+            if layer < len(test_items):
+                graph.raise_layer_with_properties()
@@ -0,0 +1,78 @@
+from my_subset_graph_new import BinSubsetGraph, BinSubsetGraphExtras, \
+    BinSubsetGraphCpct, BinSubsetGraphSparse
+from my_subset_graph_bitset import BinSubsetGraphBitset
+from itertools import combinations
+from sympy import Rational
+
+test_items = ('a', 'b', 'c', 'd', 'e', 'f', 'g', 'h')
+test_solutions = [('a', 'b'), ('c', 'd', 'e'), ('b', 'f', 'h')]
+
+
+def brute_force_count(solutions, layer):
+    return sum(any(set(solution) <= set(combo) for solution in solutions)
+               for combo in combinations(test_items, layer))
+
+
+def test_full_graphs_count():
+    for graph_class in (BinSubsetGraph, BinSubsetGraphExtras,
+                        BinSubsetGraphCpct, BinSubsetGraphBitset):
+        graph = graph_class(test_items)
+        graph.fill_in_property(test_solutions)
+        for layer in range(len(test_items) + 1):
+            num = brute_force_count(test_solutions, layer)
+            denom = len(list(combinations(test_items, layer)))
+            assert graph.count_property_by_layer(layer) \
+                == (num, denom, Rational(num, denom))
+
+
+def test_sparse_graph_counts():
+    graph = BinSubsetGraphSparse(test_items, 2)
+    graph.fill_in_property_at_current_layer([('a', 'b')])
+    assert graph.count_property_at_current_layer()[0] \
+        == brute_force_count(test_solutions, 2)
+    graph.raise_layer_with_properties()
+    graph.fill_in_property_at_current_layer([('c', 'd', 'e'),
+                                             ('b', 'f', 'h')])
+    for layer in range(3, len(test_items) + 1):
+        assert graph.count_property_at_current_layer()[0] \
+            == brute_force_count(test_solutions, layer)
+        if layer < len(test_items):
+            graph.raise_layer_with_properties()
+
+
+def test_entries():
+    graph = BinSubsetGraphExtras(test_items)
+    graph.fill_in_property(test_solutions)
+    entry = graph.subset_list[0b111]
+    assert entry["bin_list"] == (1, 1, 1, 0, 0, 0, 0, 0)
+    assert entry["num_elts"] == 3
+    assert entry["members"] == ('a', 'b', 'c')
+    assert entry["property"]
+    assert not graph.subset_list[0b110]["property"]
+    assert graph.subset_list[-1]["parents"] == []
+    cpct = BinSubsetGraphCpct(test_items)
+    assert cpct.subset_list[0b101][:3] == [
+        (1, 0, 1, 0, 0, 0, 0, 0), 2,
+        [0b111, 0b1101, 0b10101, 0b100101, 0b1000101, 0b10000101]
+    ]
+
+
+def test_subset_list_writes():
+    graph = BinSubsetGraph(test_items)
+    # marking a subset through its entry, as the old classes allowed
+    graph.subset_list[0b11]["property"] = True
+    assert graph.subset_list[0b11]["property"]
+    assert graph.count_property_by_layer(2)[0] == 1
+    # writing a whole entry, without closing upward
+    entry = graph.subset_list[0b1100]
+    entry["property"] = False
+    graph.subset_list[0b1100] = dict(entry, property=True)
+    assert graph.count_property_by_layer(2)[0] == 2
+    assert graph.count_property_by_layer(3)[0] == 0
+    graph.subset_list[0b11]["property"] = False
+    assert graph.count_property_by_layer(2)[0] == 1
+    cpct = BinSubsetGraphCpct(test_items)
+    cpct.subset_list[0b111][3] = True
+    cpct.subset_list[0b1011] = [None, None, None, True]
+    assert cpct.count_property_by_layer(3)[0] == 2
+    assert cpct.subset_list[0b111][3] and cpct.subset_list[0b1011][-1]
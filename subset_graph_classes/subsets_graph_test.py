@@ -0,0 +1,36 @@
+from my_subsets_graph import MultiSubsetGraph
+from itertools import combinations
+from collections import Counter
+
+test_list = (1, 2, 2, 3, 5, 5, 5)
+test_solutions = [(2, 2), (1, 5), (3, 5, 5)]
+
+
+def brute_force_count(solutions, layer):
+    # subsets of positions, as the layer counts are
+    return sum(any(not Counter(solution) - Counter(combo)
+                   for solution in solutions)
+               for combo in combinations(test_list, layer))
+
+
+def test_counts_with_repeats():
+    graph = MultiSubsetGraph(test_list)
+    graph.fill_in_property(test_solutions)
+    for layer in range(len(test_list) + 1):
+        assert graph.count_property_by_layer(layer)[0] \
+            == brute_force_count(test_solutions, layer)
+
+
+def test_nodes_follow_the_property_column():
+    graph = MultiSubsetGraph(test_list)
+    assert graph.nodes is graph.nodes
+    node = graph.nodes[2][0]
+    node.set_property_direct(True)
+    assert graph.nodes[2][0].property
+    assert graph.count_property_by_layer(2)[0] == node.weight
+    graph.fill_in_property([(3, 5)])
+    assert all(node.property for node in graph.nodes[len(test_list)])
+    for layer in graph.nodes[1:]:
+        for node in layer:
+            node.property_from_children()
+            assert node.property == bool(graph.properties[node.node_id])